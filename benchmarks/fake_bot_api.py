@@ -0,0 +1,262 @@
+"""Local stand-in for the Telegram Bot API used in load tests.
+
+Serves the methods the bot calls (getMe, getUpdates, sendMessage,
+deleteMessage, deleteMessages) under `/bot<token>/<method>`, with
+configurable latency, server errors and 429 responses. Updates are injected
+in-process with `FakeBotAPI.inject_message`, and deletions are matched back
+to their injection time to measure end-to-end deletion latency.
+
+Point the bot at it with `TELEGRAM_API_URL=http://127.0.0.1:<port>`.
+
+Usage (standalone, serves an empty update stream):
+    python -m benchmarks.fake_bot_api --port 8081 --latency-ms 50
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import time
+from collections import Counter, OrderedDict, deque
+from dataclasses import dataclass
+
+from aiohttp import web
+
+# Methods that always succeed so polling itself stays stable under faults
+FAULT_EXEMPT_METHODS = frozenset({"getMe", "getUpdates", "deleteWebhook"})
+
+
+@dataclass(slots=True)
+class FaultSettings:
+    """Injected latency and failures of the fake API."""
+
+    latency: float = 0.0
+    error_rate: float = 0.0
+    flood_rate: float = 0.0
+    retry_after: int = 1
+
+
+class FakeBotAPI:
+    """In-process fake Bot API server.
+
+    Memory stays bounded for long runs: at most `max_tracked` injected
+    messages are remembered for latency matching, and per-interval samples
+    are reset by `take_interval_stats`.
+    """
+
+    def __init__(
+        self,
+        faults: FaultSettings | None = None,
+        max_tracked: int = 100_000,
+        seed: int = 0,
+    ) -> None:
+        self.faults = faults or FaultSettings()
+        self.max_tracked = max_tracked
+        self._rng = random.Random(seed)  # noqa: S311
+        self._updates: deque[dict] = deque()
+        self._new_updates = asyncio.Event()
+        self._next_update_id = 1
+        self._next_message_id = 1
+        # (chat_id, message_id) -> (injected_at, is_spam)
+        self._injected: OrderedDict[tuple[int, int], tuple[float, bool]] = OrderedDict()
+        self.method_calls: Counter[str] = Counter()
+        # Texts of the last sent messages, for checking replies in tests
+        self.sent_texts: deque[str] = deque(maxlen=100)
+        self.faults_injected: Counter[str] = Counter()
+        self.delivered = 0
+        self.deleted_spam = 0
+        self.deleted_ham = 0
+        self._deletion_latencies: list[float] = []
+        self._runner: web.AppRunner | None = None
+
+    @property
+    def backlog(self) -> int:
+        """Updates injected but not yet fetched by the bot."""
+        return len(self._updates)
+
+    def inject_message(
+        self,
+        *,
+        chat_id: int,
+        user_id: int,
+        text: str,
+        is_spam: bool,
+    ) -> None:
+        """Queue a group text message update for the bot."""
+        message_id = self._next_message_id
+        self._next_message_id += 1
+        self._updates.append(
+            {
+                "update_id": self._next_update_id,
+                "message": {
+                    "message_id": message_id,
+                    "date": int(time.time()),
+                    "chat": {
+                        "id": chat_id,
+                        "type": "supergroup",
+                        "title": f"load test {chat_id}",
+                    },
+                    "from": {
+                        "id": user_id,
+                        "is_bot": False,
+                        "first_name": f"user{user_id}",
+                    },
+                    "text": text,
+                },
+            },
+        )
+        self._next_update_id += 1
+        self._injected[chat_id, message_id] = (time.perf_counter(), is_spam)
+        if len(self._injected) > self.max_tracked:
+            self._injected.popitem(last=False)
+        self._new_updates.set()
+
+    def take_interval_stats(self) -> list[float]:
+        """Return deletion latencies since the previous call and reset them."""
+        latencies, self._deletion_latencies = self._deletion_latencies, []
+        return latencies
+
+    def _record_deletion(self, chat_id: int, message_id: int) -> None:
+        injected = self._injected.pop((chat_id, message_id), None)
+        if injected is None:
+            return
+        injected_at, is_spam = injected
+        self._deletion_latencies.append(time.perf_counter() - injected_at)
+        if is_spam:
+            self.deleted_spam += 1
+        else:
+            self.deleted_ham += 1
+
+    async def _get_updates(self, params: dict) -> list[dict]:
+        offset = int(params.get("offset", 0))
+        timeout = float(params.get("timeout", 0))
+        limit = int(params.get("limit", 100))
+        while self._updates and self._updates[0]["update_id"] < offset:
+            self._updates.popleft()
+        if not self._updates and timeout:
+            self._new_updates.clear()
+            try:
+                await asyncio.wait_for(self._new_updates.wait(), timeout)
+            except TimeoutError:
+                return []
+        # Updates stay queued until confirmed by a later offset, like Telegram
+        batch = [self._updates[i] for i in range(min(limit, len(self._updates)))]
+        if batch:
+            self.delivered = max(self.delivered, batch[-1]["update_id"])
+        return batch
+
+    def _call(self, method: str, params: dict) -> object:
+        if method == "getMe":
+            return {
+                "id": 123456,
+                "is_bot": True,
+                "first_name": "Fake",
+                "username": "fake_bot",
+            }
+        if method == "sendMessage":
+            self.sent_texts.append(params.get("text", ""))
+            message_id = self._next_message_id
+            self._next_message_id += 1
+            return {
+                "message_id": message_id,
+                "date": int(time.time()),
+                "chat": {"id": int(params["chat_id"]), "type": "private"},
+                "text": params.get("text", ""),
+            }
+        if method == "deleteMessage":
+            self._record_deletion(int(params["chat_id"]), int(params["message_id"]))
+        elif method == "deleteMessages":
+            for message_id in json.loads(params["message_ids"]):
+                self._record_deletion(int(params["chat_id"]), int(message_id))
+        return True
+
+    def _fault(self, method: str) -> web.Response | None:
+        if method in FAULT_EXEMPT_METHODS:
+            return None
+        roll = self._rng.random()
+        if roll < self.faults.flood_rate:
+            self.faults_injected["429"] += 1
+            retry_after = self.faults.retry_after
+            return web.json_response(
+                {
+                    "ok": False,
+                    "error_code": 429,
+                    "description": f"Too Many Requests: retry after {retry_after}",
+                    "parameters": {"retry_after": retry_after},
+                },
+                status=429,
+            )
+        if roll < self.faults.flood_rate + self.faults.error_rate:
+            self.faults_injected["500"] += 1
+            return web.json_response(
+                {
+                    "ok": False,
+                    "error_code": 500,
+                    "description": "Internal Server Error",
+                },
+                status=500,
+            )
+        return None
+
+    async def handle(self, request: web.Request) -> web.Response:
+        """Serve one Bot API call."""
+        method = request.match_info["method"]
+        self.method_calls[method] += 1
+        params = dict(request.query)
+        if request.can_read_body:
+            params.update(await request.post())
+
+        if method == "getUpdates":
+            return web.json_response(
+                {"ok": True, "result": await self._get_updates(params)},
+            )
+        if self.faults.latency:
+            await asyncio.sleep(self._rng.uniform(0, 2 * self.faults.latency))
+        if (response := self._fault(method)) is not None:
+            return response
+        return web.json_response({"ok": True, "result": self._call(method, params)})
+
+    async def start(self, host: str = "127.0.0.1", port: int = 8081) -> str:
+        """Start serving and return the base URL for TELEGRAM_API_URL."""
+        app = web.Application()
+        app.router.add_route("*", "/bot{token}/{method}", self.handle)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, host, port).start()
+        return f"http://{host}:{port}"
+
+    async def stop(self) -> None:
+        """Stop serving."""
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8081)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--flood-rate", type=float, default=0.0)
+    parser.add_argument("--retry-after", type=int, default=1)
+    args = parser.parse_args()
+
+    api = FakeBotAPI(
+        FaultSettings(
+            latency=args.latency_ms / 1000,
+            error_rate=args.error_rate,
+            flood_rate=args.flood_rate,
+            retry_after=args.retry_after,
+        ),
+    )
+    url = await api.start(args.host, args.port)
+    print(f"Fake Bot API listening on {url}")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await api.stop()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,210 @@
+"""End-to-end load test of SpamDetectionBot against the fake Bot API.
+
+Runs the real `SpamDetectionBot.start()` polling a local `FakeBotAPI`, while
+a generator injects group messages at a target rate with a spam/ham mix.
+Every interval it reports sustained throughput (updates fetched by the bot
+per second), the fetch backlog, end-to-end deletion latency and process RSS.
+A growing backlog means the target rate is above what the bot sustains.
+
+Spam and ham texts are read from a FastText-format dataset when available.
+
+Usage:
+    python -m benchmarks.load_test --rate 200 --duration 60 --spam-ratio 0.3
+"""
+
+import argparse
+import asyncio
+import contextlib
+import random
+import resource
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from dialogue_kitogram.src.bot_database import BotMessageDatabase
+from dialogue_kitogram.src.core.base_storage import BotStorage
+from dialogue_kitogram.src.memory_storage import MemoryBotStorage
+from dialogue_kitogram.src.telegram_bot import SpamDetectionBot
+
+from .fake_bot_api import FakeBotAPI, FaultSettings
+
+DEFAULT_DATASET = Path("dialogue_kitogram/data/train_data.txt")
+FAKE_TOKEN = "123456:load-test"  # noqa: S105
+FALLBACK_SPAM = [
+    "Срочно работа! З/п от 5000 руб в день, без опыта. Писать в лс",
+    "Заработок на крипте от 1000$ в неделю, подробности в профиле",
+]
+FALLBACK_HAM = [
+    "Привет, кто-нибудь знает, во сколько завтра встреча?",
+    "Спасибо, всё работает",
+]
+
+
+def load_texts(path: Path, limit: int) -> tuple[list[str], list[str]]:
+    """Read up to `limit` spam and ham texts from a FastText dataset."""
+    spam: list[str] = []
+    ham: list[str] = []
+    if path.exists():
+        with path.open("r", encoding="utf-8") as f:
+            for line in f:
+                label, _, text = line.partition(" ")
+                text = text.replace("\t", "\n").strip()
+                if not text:
+                    continue
+                if label == "__label__spam" and len(spam) < limit:
+                    spam.append(text)
+                elif label != "__label__spam" and len(ham) < limit:
+                    ham.append(text)
+                if len(spam) >= limit and len(ham) >= limit:
+                    break
+    return spam or FALLBACK_SPAM, ham or FALLBACK_HAM
+
+
+def rss_bytes() -> int:
+    """Return current resident memory, or the peak where /proc is missing."""
+    with contextlib.suppress(OSError):
+        pages = int(Path("/proc/self/statm").read_text().split()[1])
+        return pages * resource.getpagesize()
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and KiB elsewhere
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def percentile(values: list[float], q: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * q))]
+
+
+async def generate(
+    api: FakeBotAPI,
+    args: argparse.Namespace,
+    spam: list[str],
+    ham: list[str],
+) -> None:
+    """Inject messages at `args.rate` per second for `args.duration` seconds."""
+    rng = random.Random(args.seed)  # noqa: S311
+    started = time.perf_counter()
+    sent = 0
+    while (elapsed := time.perf_counter() - started) < args.duration:
+        # Catch up in bursts so the long-run rate matches the target
+        due = int(elapsed * args.rate)
+        for i in range(sent, due):
+            is_spam = rng.random() < args.spam_ratio
+            # Spam campaigns repeat texts verbatim; conversation rarely does, so
+            # make ham unique to keep it from tripping duplicate-flood detection
+            text = rng.choice(spam) if is_spam else f"{rng.choice(ham)} ({i})"
+            api.inject_message(
+                chat_id=-(1 + rng.randrange(args.chats)),
+                user_id=rng.randrange(1, args.users + 1),
+                text=text,
+                is_spam=is_spam,
+            )
+        sent = max(sent, due)
+        await asyncio.sleep(0.01)
+
+
+async def report(api: FakeBotAPI, bot: SpamDetectionBot, interval: float) -> None:
+    """Print one line of load statistics every `interval` seconds."""
+    started = time.perf_counter()
+    baseline_rss = rss_bytes()
+    last_delivered = 0
+    print(
+        f"{'t':>6} {'upd/s':>8} {'backlog':>8} {'active':>6} {'shed':>6} "
+        f"{'del p50':>9} {'del p99':>9} {'rss MiB':>8} {'growth':>8}",
+    )
+    while True:
+        await asyncio.sleep(interval)
+        latencies = api.take_interval_stats()
+        delivered = api.delivered
+        rss = rss_bytes()
+        load = bot.scheduler.stats()
+        p50 = statistics.median(latencies) * 1e3 if latencies else 0.0
+        p99 = percentile(latencies, 0.99) * 1e3 if latencies else 0.0
+        print(
+            f"{time.perf_counter() - started:6.0f} "
+            f"{(delivered - last_delivered) / interval:8.0f} "
+            f"{api.backlog:8d} {load['active']:6d} {load['shed']:6d} "
+            f"{p50:7.1f}ms {p99:7.1f}ms "
+            f"{rss / 2**20:8.1f} {(rss - baseline_rss) / 2**20:+8.1f}",
+        )
+        last_delivered = delivered
+
+
+async def run(args: argparse.Namespace, storage: BotStorage) -> None:
+    api = FakeBotAPI(
+        FaultSettings(
+            latency=args.latency_ms / 1000,
+            error_rate=args.error_rate,
+            flood_rate=args.flood_rate,
+            retry_after=args.retry_after,
+        ),
+        seed=args.seed,
+    )
+    url = await api.start(port=args.port)
+    spam, ham = load_texts(args.dataset, args.texts)
+
+    bot = SpamDetectionBot(FAKE_TOKEN, storage=storage, api_url=url)
+    await storage.init_database()
+    for chat in range(1, args.chats + 1):
+        await storage.add_allowed_chat(
+            chat_id=-chat,
+            title=f"load test {chat}",
+            added_by_admin_id=1,
+        )
+
+    polling = asyncio.create_task(bot.start())
+    reporter = asyncio.create_task(report(api, bot, args.interval))
+    try:
+        await generate(api, args, spam, ham)
+        # Let the bot drain what was injected
+        await asyncio.sleep(args.interval)
+    finally:
+        reporter.cancel()
+        await bot.dp.stop_polling()
+        await polling
+        # Handlers run as tasks; let in-flight ones finish before closing
+        for _ in range(100):
+            if not bot.scheduler.stats()["active"]:
+                break
+            await asyncio.sleep(0.1)
+        await bot.stop()
+        await api.stop()
+
+    deleted = api.deleted_spam + api.deleted_ham
+    print(
+        f"\nFetched {api.delivered} updates, deleted {deleted} messages "
+        f"({api.deleted_ham} ham), API calls {dict(api.method_calls)}, "
+        f"injected faults {dict(api.faults_injected)}",
+    )
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rate", type=float, default=100, help="Messages/second")
+    parser.add_argument("--duration", type=float, default=30, help="Seconds")
+    parser.add_argument("--spam-ratio", type=float, default=0.3)
+    parser.add_argument("--chats", type=int, default=20)
+    parser.add_argument("--users", type=int, default=5000)
+    parser.add_argument("--interval", type=float, default=5, help="Report period")
+    parser.add_argument("--storage", choices=("sqlite", "memory"), default="sqlite")
+    parser.add_argument("--dataset", type=Path, default=DEFAULT_DATASET)
+    parser.add_argument("--texts", type=int, default=5000, help="Texts per label")
+    parser.add_argument("--port", type=int, default=8081)
+    parser.add_argument("--latency-ms", type=float, default=20.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--flood-rate", type=float, default=0.0)
+    parser.add_argument("--retry-after", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    if args.storage == "memory":
+        await run(args, MemoryBotStorage())
+        return
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        await run(args, BotMessageDatabase(str(Path(tmp_dir) / "load.db")))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
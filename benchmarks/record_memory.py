@@ -0,0 +1,111 @@
+"""Per-row memory of detection records compared with the dicts they replace.
+
+Fills a temporary database, fetches the rows once, then measures with
+tracemalloc how much memory keeping them costs as `dict`s (what storage
+returned before) and as `DetectionRecord`s. Field values are shared between
+both, so the numbers are the per-row container overhead, except that records
+also hold a parsed `datetime` instead of the timestamp string.
+
+Usage:
+    python -m benchmarks.record_memory --rows 100000
+"""
+
+import argparse
+import asyncio
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections.abc import Callable
+from datetime import UTC, datetime
+from pathlib import Path
+
+import aiosqlite
+
+from dialogue_kitogram.src.bot_database import DETECTION_SELECT, BotMessageDatabase
+from dialogue_kitogram.src.core.records import DetectionRecord, parse_timestamp
+from dialogue_kitogram.src.export import EXPORT_COLUMNS
+
+
+async def fill(db: BotMessageDatabase, rows: int) -> list[tuple]:
+    """Insert `rows` detections and return them as raw query rows."""
+    await db.init_database()
+    async with aiosqlite.connect(db.db_path) as conn:
+        await conn.executemany(
+            """
+            INSERT INTO bot_messages
+            (message_id, chat_id, user_id, username, text_content,
+             spam_probability, detection_timestamp)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            """,
+            (
+                (
+                    i,
+                    -(i % 20),
+                    i % 500,
+                    f"user{i % 500}",
+                    f"Срочно работа! З/п {i} руб! Писать в лс",
+                    0.97,
+                    datetime.now(tz=UTC),
+                )
+                for i in range(rows)
+            ),
+        )
+        await conn.commit()
+        async with conn.execute(DETECTION_SELECT) as cursor:
+            return [row[:10] for row in await cursor.fetchall()]
+
+
+def as_dict(row: tuple) -> dict:
+    return dict(zip(EXPORT_COLUMNS, row, strict=True))
+
+
+def as_record(row: tuple) -> DetectionRecord:
+    return DetectionRecord(
+        *row[:7],
+        detection_timestamp=parse_timestamp(row[7]),
+        was_deleted=bool(row[8]),
+        was_manual=bool(row[9]),
+    )
+
+
+def measure(rows: list[tuple], build: Callable[[tuple], object]) -> dict:
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    started = time.perf_counter()
+    built = [build(row) for row in rows]
+    elapsed = time.perf_counter() - started
+    retained = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    return {
+        "per_row": retained / len(rows),
+        "shallow": sys.getsizeof(built[0]),
+        "per_second": len(rows) / elapsed,
+    }
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=100_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db = BotMessageDatabase(str(Path(tmp_dir) / "records.db"))
+        rows = await fill(db, args.rows)
+
+    results = {
+        "dict": measure(rows, as_dict),
+        "DetectionRecord": measure(rows, as_record),
+    }
+    for name, result in results.items():
+        print(
+            f"{name:<16} {result['per_row']:7.0f} B/row retained, "
+            f"{result['shallow']:4d} B object, "
+            f"{result['per_second']:10.0f} rows/s built",
+        )
+    saved = 1 - results["DetectionRecord"]["per_row"] / results["dict"]["per_row"]
+    print(f"Records use {saved:.0%} less memory per row")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
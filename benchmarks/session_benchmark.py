@@ -0,0 +1,115 @@
+"""Compare aiogram's default session with the tuned, instrumented one.
+
+Both sessions send the same burst of concurrent `deleteMessage` calls to a
+local `FakeBotAPI` with injected latency, server errors and short flood
+waits. The report shows throughput, latency percentiles of whole calls
+(including retries) and how many calls failed.
+
+Usage:
+    python -m benchmarks.session_benchmark --calls 5000 --concurrency 200 \\
+        --latency-ms 20 --error-rate 0.02
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+
+from aiogram import Bot
+from aiogram.client.session.aiohttp import AiohttpSession
+from aiogram.client.session.base import BaseSession
+from aiogram.client.telegram import TelegramAPIServer
+
+from dialogue_kitogram.src.session import InstrumentedAiohttpSession, SessionSettings
+
+from .fake_bot_api import FakeBotAPI, FaultSettings
+
+FAKE_TOKEN = "123456:session-benchmark"  # noqa: S105
+
+
+async def benchmark(session: BaseSession, calls: int, concurrency: int) -> dict:
+    bot = Bot(token=FAKE_TOKEN, session=session)
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: list[float] = []
+    failures = 0
+
+    async def call(i: int) -> None:
+        nonlocal failures
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                await bot.delete_message(-1, i)
+            except Exception:
+                failures += 1
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    try:
+        await asyncio.gather(*(call(i) for i in range(calls)))
+    finally:
+        await session.close()
+    return {
+        "elapsed": time.perf_counter() - started,
+        "latencies": sorted(latencies),
+        "failures": failures,
+    }
+
+
+def report(name: str, calls: int, result: dict) -> None:
+    latencies = result["latencies"]
+    p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+    print(
+        f"{name:<8} {calls / result['elapsed']:8.0f} calls/s "
+        f"p50={statistics.median(latencies) * 1e3:7.1f} ms "
+        f"p99={p99 * 1e3:7.1f} ms "
+        f"failed={result['failures']} ({result['failures'] / calls:.2%})",
+    )
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--calls", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--port", type=int, default=8082)
+    parser.add_argument("--latency-ms", type=float, default=20.0)
+    parser.add_argument("--error-rate", type=float, default=0.02)
+    parser.add_argument("--flood-rate", type=float, default=0.0)
+    parser.add_argument("--retry-after", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    api = FakeBotAPI(
+        FaultSettings(
+            latency=args.latency_ms / 1000,
+            error_rate=args.error_rate,
+            flood_rate=args.flood_rate,
+            retry_after=args.retry_after,
+        ),
+        seed=args.seed,
+    )
+    server = TelegramAPIServer.from_base(await api.start(port=args.port))
+    try:
+        default = await benchmark(
+            AiohttpSession(api=server),
+            args.calls,
+            args.concurrency,
+        )
+        report("default", args.calls, default)
+
+        tuned_session = InstrumentedAiohttpSession(
+            SessionSettings.from_env(),
+            api=server,
+        )
+        tuned = await benchmark(tuned_session, args.calls, args.concurrency)
+        report("tuned", args.calls, tuned)
+        for method, call in tuned_session.stats().items():
+            print(
+                f"  {method}: attempts={call['count']} "
+                f"retries={call['retries']} errors={call['errors']}",
+            )
+    finally:
+        await api.stop()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,111 @@
+"""Compare storage backends on the bot's write/read mix.
+
+The mix mirrors a busy deployment: most operations record detections, with
+occasional admin reads (/stats, /recent, /allowed) and allow-list checks.
+
+Usage:
+    python -m benchmarks.storage_benchmark --operations 5000
+"""
+
+import argparse
+import asyncio
+import random
+import statistics
+import tempfile
+import time
+from collections import defaultdict
+from pathlib import Path
+
+from dialogue_kitogram.src.bot_database import BotMessageDatabase
+from dialogue_kitogram.src.core.base_storage import BotStorage
+from dialogue_kitogram.src.memory_storage import MemoryBotStorage
+
+# Operation name -> share of the mix
+OPERATION_MIX = {
+    "record_bot_message": 0.80,
+    "is_chat_allowed": 0.10,
+    "get_stats": 0.04,
+    "get_recent_detections": 0.04,
+    "list_allowed_chats": 0.02,
+}
+
+
+async def run_operation(storage: BotStorage, name: str, i: int) -> None:
+    if name == "record_bot_message":
+        await storage.record_bot_message(
+            message_id=i,
+            chat_id=-(i % 20),
+            user_id=i % 500,
+            username=f"user{i % 500}",
+            text_content=f"Срочно работа! З/п {i} руб! Писать в лс",
+            spam_probability=0.96,
+        )
+    elif name == "is_chat_allowed":
+        await storage.is_chat_allowed(-(i % 20))
+    elif name == "get_stats":
+        await storage.get_stats()
+    elif name == "get_recent_detections":
+        await storage.get_recent_detections(limit=5)
+    elif name == "list_allowed_chats":
+        await storage.list_allowed_chats()
+
+
+async def benchmark(storage: BotStorage, operations: int, seed: int) -> dict:
+    await storage.init_database()
+    for chat in range(20):
+        await storage.add_allowed_chat(
+            chat_id=-chat,
+            title=f"chat {chat}",
+            added_by_admin_id=1,
+        )
+    rng = random.Random(seed)  # noqa: S311
+    names = rng.choices(
+        list(OPERATION_MIX),
+        weights=list(OPERATION_MIX.values()),
+        k=operations,
+    )
+    latencies: dict[str, list[float]] = defaultdict(list)
+    started = time.perf_counter()
+    for i, name in enumerate(names):
+        op_started = time.perf_counter()
+        await run_operation(storage, name, i)
+        latencies[name].append(time.perf_counter() - op_started)
+    elapsed = time.perf_counter() - started
+    return {"elapsed": elapsed, "latencies": latencies}
+
+
+def report(backend: str, operations: int, result: dict) -> None:
+    print(f"\n{backend}: {operations / result['elapsed']:.0f} ops/s")
+    for name, values in sorted(result["latencies"].items()):
+        values.sort()
+        p99 = values[min(len(values) - 1, int(len(values) * 0.99))]
+        print(
+            f"  {name:<24} n={len(values):<6} "
+            f"p50={statistics.median(values) * 1e3:.3f} ms "
+            f"p99={p99 * 1e3:.3f} ms",
+        )
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--operations", type=int, default=5000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        sqlite = BotMessageDatabase(str(Path(tmp_dir) / "bench.db"))
+        report(
+            "sqlite",
+            args.operations,
+            await benchmark(sqlite, args.operations, args.seed),
+        )
+    memory = MemoryBotStorage()
+    report(
+        "memory",
+        args.operations,
+        await benchmark(memory, args.operations, args.seed),
+    )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,392 @@
+"""Admin commands for chat policies, raid mode and the bot's internals."""
+
+import asyncio
+import shutil
+import tempfile
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from aiogram import Dispatcher
+from aiogram.enums import ChatType
+from aiogram.filters import Command
+from aiogram.types import BufferedInputFile, FSInputFile, Message
+from loguru import logger
+
+from .config import get_admin_user_ids
+from .export import EXPORT_FORMATS, export_detections
+from .model_registry import ModelRegistry
+from .policy import ChatPolicy, parse_policy_setting
+from .shadow import ShadowEvaluator
+
+if TYPE_CHECKING:
+    from .telegram_bot import SpamDetectionBot
+
+# Longest /profile session in seconds
+MAX_PROFILE_SECONDS = 300
+# Innermost stack lines of the last stall shown by /lag
+LAG_STACK_LINES = 12
+POLICY_USAGE = (
+    "Usage: /policy [chat_id] <setting> <value>\n"
+    "Settings: threshold, min_words, dry_run, heuristics"
+)
+
+
+async def require_admin_dm(message: Message) -> bool:
+    """Reply "Not authorized." unless an admin sent `message` in a DM."""
+    admin_ids = set(get_admin_user_ids())
+    if message.chat.type == ChatType.PRIVATE and message.from_user.id in admin_ids:
+        return True
+    await message.reply("Not authorized.")
+    return False
+
+
+def format_policy(chat_id: int, policy: ChatPolicy) -> str:
+    return (
+        f"⚙️ Policy for chat {chat_id}:\n"
+        f"Threshold: {policy.spam_threshold}\n"
+        f"Min words: {policy.min_word_count}\n"
+        f"Dry run: {'✅' if policy.dry_run else '❌'}\n"
+        f"Heuristics: {'✅' if policy.heuristics_enabled else '❌'}"
+    )
+
+
+def format_shadow(shadow: ShadowEvaluator) -> str:
+    stats = shadow.stats()
+    response = (
+        f"🕵️ Shadow model stats:\n"
+        f"Scored: {stats['scored']}\n"
+        f"Agreement: {stats['agreement_rate']:.2%}\n"
+        f"Shadow-only spam: {stats['shadow_only_spam']}\n"
+        f"Primary-only spam: {stats['primary_only_spam']}\n"
+        f"Dropped (overload): {stats['dropped']}\n"
+        f"Errors: {stats['errors']}\n"
+        f"Queue depth: {stats['queue_depth']}"
+    )
+    if shadow.recent_disagreements:
+        response += "\n\nRecent disagreements:\n"
+        for sample, shadow_probability in shadow.recent_disagreements:
+            response += (
+                f"{sample.primary_probability:.2%} → {shadow_probability:.2%}: "
+                f"{sample.text[:50]}\n"
+            )
+    return response
+
+
+def format_load(stats: dict, cache: dict) -> str:
+    response = (
+        f"⏱ Update processing:\n"
+        f"Active: {stats['active']}/{stats['max_concurrency']}\n"
+        f"Shed (overload): {stats['shed']}\n"
+    )
+    for name, queue in stats["priorities"].items():
+        response += (
+            f"{name}: pending {queue['pending']}, "
+            f"processed {queue['processed']}, "
+            f"avg wait {queue['avg_wait'] * 1000:.1f} ms, "
+            f"max wait {queue['max_wait'] * 1000:.1f} ms\n"
+        )
+    response += (
+        f"Response cache: {cache['hits']} hits, {cache['misses']} misses "
+        f"({cache['hit_rate']:.0%}), {cache['entries']} entries\n"
+    )
+    return response
+
+
+def format_timings(stats: dict, api_stats: dict) -> str:
+    response = "⏱ Handler timings (wall p50/p99/max, avg CPU):\n"
+    for name, timing in stats.items():
+        response += (
+            f"{name}: n={timing['count']}, "
+            f"{timing['p50_wall'] * 1000:.1f}/"
+            f"{timing['p99_wall'] * 1000:.1f}/"
+            f"{timing['max_wall'] * 1000:.1f} ms, "
+            f"CPU {timing['avg_cpu'] * 1000:.1f} ms\n"
+        )
+    if api_stats:
+        response += "\n🌐 Bot API calls (p50/p99/max, retries, errors):\n"
+    for name, call in api_stats.items():
+        errors = ", ".join(
+            f"{error} {count}" for error, count in call["errors"].items()
+        )
+        response += (
+            f"{name}: n={call['count']}, "
+            f"{call['p50'] * 1000:.1f}/"
+            f"{call['p99'] * 1000:.1f}/"
+            f"{call['max'] * 1000:.1f} ms, "
+            f"retries {call['retries']}"
+            + (f", errors: {errors}" if errors else "")
+            + "\n"
+        )
+    return response
+
+
+def format_models(stats: dict) -> str:
+    routes = ", ".join(
+        f"{language} → {model_name}" for language, model_name in stats["routes"].items()
+    )
+    budget = stats["memory_budget"]
+    response = (
+        "🧠 Models\n"
+        f"Routes: {routes or 'none, default model only'}\n"
+        f"Memory: {stats['memory_used'] / 2**20:.1f} MiB"
+        + (f" of {budget / 2**20:.1f} MiB\n" if budget else "\n")
+        + "Languages: "
+        + ", ".join(
+            f"{language} {count}" for language, count in stats["languages"].items()
+        )
+        + "\n\n"
+    )
+    for route, model in stats["models"].items():
+        response += (
+            f"{route}: {'loaded' if model['loaded'] else 'not loaded'}, "
+            f"n={model['predictions']}, "
+            f"avg {model['avg_latency'] * 1000:.2f} ms, "
+            f"max {model['max_latency'] * 1000:.2f} ms, "
+            f"loads {model['loads']} ({model['load_seconds']:.1f}s), "
+            f"evictions {model['evictions']}, "
+            f"failures {model['load_failures']}\n"
+        )
+    return response
+
+
+def format_lag(stats: dict) -> str:
+    response = (
+        f"🐢 Event loop lag (p50/p99/max): "
+        f"{stats['p50'] * 1000:.1f}/"
+        f"{stats['p99'] * 1000:.1f}/"
+        f"{stats['max'] * 1000:.1f} ms\n"
+        f"Stalls: {stats['stalls']}, stacks captured: {stats['captures']}, "
+        f"rate-limited: {stats['suppressed']}\n"
+    )
+    if stats["last_stack"]:
+        # The innermost frames show the blocking call
+        frames = stats["last_stack"].splitlines()[-LAG_STACK_LINES:]
+        response += (
+            f"\nLast stall, blocked "
+            f"{stats['last_stack_blocked'] * 1000:.0f} ms:\n" + "\n".join(frames)
+        )
+    return response
+
+
+class AdminCommands:
+    """Handlers of the admin commands that are not about single messages."""
+
+    def __init__(self, app: "SpamDetectionBot") -> None:
+        self.app = app
+        self._background_tasks: set[asyncio.Task] = set()
+
+    def register(self, dp: Dispatcher) -> None:
+        """Register the handlers. Call before any catch-all message handler."""
+        handlers = {
+            "policy": self.policy_command,
+            "raid": self.raid_command,
+            "shadow": self.shadow_command,
+            "load": self.load_command,
+            "export": self.export_command,
+            "timings": self.timings_command,
+            "profile": self.profile_command,
+            "models": self.models_command,
+            "lag": self.lag_command,
+        }
+        for command, handler in handlers.items():
+            dp.message.register(handler, Command(command))
+
+    async def policy_command(self, message: Message) -> None:
+        """Show or change the moderation policy of a chat. Admins only.
+
+        Usage in DM: /policy <chat_id> [<setting> <value>]
+        In group: /policy [<setting> <value>] (current chat)
+        Settings: threshold, min_words, dry_run, heuristics
+        """
+        if message.from_user.id not in set(get_admin_user_ids()):
+            await message.reply("Not authorized.")
+            return
+        args = (message.text or "").split()[1:]
+        target_chat_id = message.chat.id
+        if message.chat.type == ChatType.PRIVATE:
+            if not args:
+                await message.reply("Usage: /policy <chat_id> [<setting> <value>]")
+                return
+            try:
+                target_chat_id = int(args.pop(0))
+            except ValueError:
+                await message.reply("chat_id must be an integer")
+                return
+
+        if args:
+            error = await self._update_policy(target_chat_id, args)
+            if error:
+                await message.reply(error)
+                return
+        policy = self.app.policies.get(target_chat_id)
+        if policy is None:
+            await message.reply("Chat is not in allowed list.")
+            return
+        await message.reply(format_policy(target_chat_id, policy))
+
+    async def _update_policy(self, chat_id: int, args: list[str]) -> str | None:
+        """Apply a `<setting> <value>` pair. Returns an error message on failure."""
+        if self.app.policies.get(chat_id) is None:
+            return "Chat is not in allowed list."
+        try:
+            key, raw = args
+        except ValueError:
+            return POLICY_USAGE
+        try:
+            column, value = parse_policy_setting(key, raw)
+        except ValueError as e:
+            return str(e)
+        await self.app.db.update_chat_policy(chat_id, column, value=value)
+        await self.app.policies.refresh(self.app.db, chat_id)
+        return None
+
+    async def raid_command(self, message: Message) -> None:
+        """Show or toggle raid mode of the current chat. Admins only.
+
+        Usage in group: /raid [on|off]
+        """
+        admin_ids = set(get_admin_user_ids())
+        if (
+            message.chat.type == ChatType.PRIVATE
+            or message.from_user.id not in admin_ids
+        ):
+            await message.reply("Not authorized.")
+            return
+        args = (message.text or "").split()[1:]
+        raid = self.app.raid
+        if args and args[0].lower() in {"on", "off"}:
+            raid.set_raid(message.chat.id, active=args[0].lower() == "on")
+        active = raid.is_raid(message.chat.id)
+        await message.reply(f"Raid mode: {'🚨 on' if active else 'off'}")
+
+    async def shadow_command(self, message: Message) -> None:
+        """Show shadow model agreement stats. Only admins via DM."""
+        if not await require_admin_dm(message):
+            return
+        if self.app.shadow is None:
+            await message.reply("Shadow model is not configured.")
+            return
+        await message.reply(format_shadow(self.app.shadow))
+
+    async def load_command(self, message: Message) -> None:
+        """Show update processing load and queue wait times. Admins via DM."""
+        if not await require_admin_dm(message):
+            return
+        await message.reply(
+            format_load(self.app.scheduler.stats(), self.app.responses.stats()),
+        )
+
+    async def export_command(self, message: Message) -> None:
+        """Export detection history as a file. Only admins via DM.
+
+        Usage: /export [csv|jsonl|parquet|fasttext] [chat_id]
+        """
+        if not await require_admin_dm(message):
+            return
+        args = (message.text or "").split()[1:]
+        fmt = args[0].lower() if args else "csv"
+        if fmt not in EXPORT_FORMATS:
+            await message.reply(
+                f"Usage: /export [{'|'.join(EXPORT_FORMATS)}] [chat_id]",
+            )
+            return
+        try:
+            target_chat_id = int(args[1]) if len(args) > 1 else None
+        except ValueError:
+            await message.reply("chat_id must be an integer")
+            return
+
+        suffix = {"fasttext": "txt"}.get(fmt, fmt)
+        # Keep file system calls off the event loop
+        tmp_dir = await asyncio.to_thread(tempfile.mkdtemp)
+        try:
+            output = Path(tmp_dir) / f"detections.{suffix}"
+            try:
+                count = await export_detections(
+                    self.app.db,
+                    output,
+                    fmt,
+                    chat_id=target_chat_id,
+                )
+            except RuntimeError as e:
+                await message.reply(str(e))
+                return
+            await message.reply_document(
+                FSInputFile(output),
+                caption=f"Exported {count} detections.",
+            )
+        finally:
+            await asyncio.to_thread(shutil.rmtree, tmp_dir, ignore_errors=True)
+
+    async def timings_command(self, message: Message) -> None:
+        """Show wall and CPU time per handler. Only admins via DM."""
+        if not await require_admin_dm(message):
+            return
+        stats = self.app.timings.stats()
+        api_stats = self.app.http.stats()
+        if not stats and not api_stats:
+            await message.reply("No handler timings yet.")
+            return
+        await message.reply(format_timings(stats, api_stats))
+
+    async def profile_command(self, message: Message) -> None:
+        """Profile the bot for N seconds and send the report. Admins via DM.
+
+        Usage: /profile [seconds]
+        """
+        if not await require_admin_dm(message):
+            return
+        args = (message.text or "").split()[1:]
+        try:
+            seconds = float(args[0]) if args else 30.0
+        except ValueError:
+            await message.reply("Usage: /profile [seconds]")
+            return
+        if not 0 < seconds <= MAX_PROFILE_SECONDS:
+            await message.reply(
+                f"Duration must be between 0 and {MAX_PROFILE_SECONDS} seconds",
+            )
+            return
+        if self.app.profiling.active:
+            await message.reply("A profiling session is already running.")
+            return
+
+        await message.reply(f"Profiling for {seconds:g} seconds...")
+        # Run in the background so the handler does not hold a slot
+        task = asyncio.create_task(self._send_profile(message, seconds))
+        self._background_tasks.add(task)
+        task.add_done_callback(self._background_tasks.discard)
+
+    async def _send_profile(self, message: Message, seconds: float) -> None:
+        """Run a profiling session and send its report to the requester."""
+        try:
+            summary, raw = await self.app.profiling.run(seconds)
+            await message.reply_document(
+                BufferedInputFile(summary.encode("utf-8"), filename="profile.txt"),
+                caption="Top functions by cumulative and own time.",
+            )
+            await message.reply_document(
+                BufferedInputFile(raw, filename="profile.prof"),
+                caption="Raw pstats data (e.g. for snakeviz).",
+            )
+        except Exception as e:
+            logger.exception("Profiling failed: {}", e)
+
+    async def models_command(self, message: Message) -> None:
+        """Show per-language model routing and stats. Only admins via DM."""
+        if not await require_admin_dm(message):
+            return
+        if not isinstance(self.app.spam_model, ModelRegistry):
+            await message.reply("Model routing is not in use.")
+            return
+        await message.reply(format_models(self.app.spam_model.stats()))
+
+    async def lag_command(self, message: Message) -> None:
+        """Show event-loop lag and the last blocking stack. Admins via DM."""
+        if not await require_admin_dm(message):
+            return
+        stats = self.app.watchdog.stats()
+        if not stats["running"]:
+            await message.reply("Event loop watchdog is disabled.")
+            return
+        await message.reply(format_lag(stats))
@@ -0,0 +1,231 @@
+"""Re-score stored detections with another model version.
+
+Pages through `bot_messages` in id order, scores each chunk with batched
+inference in worker processes and stores the probabilities in
+`detection_rescores`, keyed by model version. Like the bot, the scores are
+lowered by the heuristic penalties of each detection's chat policy, so they
+compare directly with the recorded probabilities. A checkpoint is saved with
+every chunk, so an interrupted run resumes where it stopped. Reads are short,
+writes wait for the bot's transactions and the rate can be capped, so the
+job can run next to the live bot on the same database.
+
+Usage:
+    python -m dialogue_kitogram.src.backfill --model antispam_v2.bin
+    python -m dialogue_kitogram.src.backfill --model antispam_v2.bin \\
+        --bot-id 123456 --workers 2 --max-rows-per-second 500
+"""
+
+import argparse
+import asyncio
+import hashlib
+import multiprocessing
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from functools import cache
+from pathlib import Path
+
+from .bot_database import BotMessageDatabase
+from .config import get_min_word_count, get_spam_threshold
+from .core.base_model import ModelConfig
+from .fastspam.ft_model import FastTextSpamModel
+from .policy import PolicyTable, heuristic_penalty
+
+
+@dataclass(slots=True)
+class BackfillStats:
+    """Counters of one backfill run."""
+
+    model_version: str
+    resumed_from: int = 0
+    rows: int = 0
+    scored: int = 0
+    empty: int = 0
+    last_detection_id: int = 0
+    seconds: float = 0.0
+
+
+def model_version(model_path: Path) -> str:
+    """Name a model file by its stem and a hash of its contents."""
+    digest = hashlib.blake2b(digest_size=4)
+    with model_path.open("rb") as f:
+        while chunk := f.read(2**20):
+            digest.update(chunk)
+    return f"{model_path.stem}-{digest.hexdigest()}"
+
+
+@cache
+def _worker_model(model_path: str) -> FastTextSpamModel:
+    model = FastTextSpamModel(ModelConfig(model_name=model_path))
+    model.load()
+    return model
+
+
+def score_chunk(
+    model_path: str,
+    ids: list[int],
+    texts: list[str],
+    penalties: list[float],
+) -> list[tuple[int, float]]:
+    """Score texts with one batched call and subtract their heuristic penalties.
+
+    Runs in a worker process.
+    """
+    if not texts:
+        return []
+    scores = _worker_model(model_path).predict_proba_batch(texts)
+    return [
+        (detection_id, score - penalty)
+        for detection_id, score, penalty in zip(ids, scores, penalties, strict=True)
+    ]
+
+
+async def backfill(  # noqa: PLR0913
+    db: BotMessageDatabase,
+    model_path: Path,
+    *,
+    version: str | None = None,
+    chunk_size: int = 1000,
+    workers: int | None = None,
+    max_rows_per_second: float = 0.0,
+    busy_timeout: float = 30.0,
+    limit: int | None = None,
+) -> BackfillStats:
+    """Score detections of `db.bot_id` not yet scored by this model version.
+
+    At most two chunks per worker are in flight, and results are written in
+    id order, so the checkpoint never passes an unscored row.
+    `max_rows_per_second` (0 = unlimited) caps the read rate; `limit` stops
+    after that many rows, leaving the rest for the next run.
+    """
+    version = version or await asyncio.to_thread(model_version, model_path)
+    # Chats removed from the allow-list fall back to the global defaults
+    policies = PolicyTable(
+        default_threshold=get_spam_threshold(),
+        default_min_word_count=get_min_word_count(),
+    )
+    await policies.load(db)
+    last_id, _ = await db.get_backfill_checkpoint(version)
+    stats = BackfillStats(model_version=version, resumed_from=last_id)
+    workers = workers or os.cpu_count() or 1
+    loop = asyncio.get_running_loop()
+    started = time.perf_counter()
+
+    async def collect(future: asyncio.Future, chunk_last_id: int) -> None:
+        scores = await future
+        await db.save_rescores(version, scores, chunk_last_id, busy_timeout)
+        stats.scored += len(scores)
+        stats.last_detection_id = chunk_last_id
+
+    # Forking would copy the threads of open aiosqlite connections
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context("spawn"),
+    ) as pool:
+        pending: deque[tuple[asyncio.Future, int]] = deque()
+        while limit is None or stats.rows < limit:
+            size = chunk_size if limit is None else min(chunk_size, limit - stats.rows)
+            rows = await db.get_detections_after(last_id, size)
+            if not rows:
+                break
+            scored_rows = [row for row in rows if row.text_content]
+            ids = [row.id for row in scored_rows]
+            texts = [row.text_content for row in scored_rows]
+            penalties = [
+                heuristic_penalty(
+                    row.text_content,
+                    policies.get(row.chat_id) or policies.default,
+                )
+                for row in scored_rows
+            ]
+            stats.rows += len(rows)
+            stats.empty += len(rows) - len(texts)
+            last_id = rows[-1].id
+            future = loop.run_in_executor(
+                pool,
+                score_chunk,
+                str(model_path),
+                ids,
+                texts,
+                penalties,
+            )
+            pending.append((future, last_id))
+            if len(pending) >= 2 * workers:
+                await collect(*pending.popleft())
+            if max_rows_per_second > 0:
+                ahead = stats.rows / max_rows_per_second - (
+                    time.perf_counter() - started
+                )
+                if ahead > 0:
+                    await asyncio.sleep(ahead)
+        while pending:
+            await collect(*pending.popleft())
+
+    stats.seconds = time.perf_counter() - started
+    return stats
+
+
+async def _run(args: argparse.Namespace) -> None:
+    db = BotMessageDatabase(bot_id=args.bot_id)
+    await db.init_database()
+    model_path = ModelConfig(model_name=args.model).model_path
+    stats = await backfill(
+        db,
+        model_path,
+        version=args.model_version,
+        chunk_size=args.chunk_size,
+        workers=args.workers,
+        max_rows_per_second=args.max_rows_per_second,
+        busy_timeout=args.busy_timeout,
+    )
+    rate = stats.rows / stats.seconds if stats.seconds else 0.0
+    print(
+        f"Model version {stats.model_version}: read {stats.rows} rows after "
+        f"id {stats.resumed_from}, scored {stats.scored} "
+        f"({stats.empty} without text) in {stats.seconds:.2f}s, {rate:.0f} rows/s",
+    )
+    summary = await db.get_rescore_summary(stats.model_version, args.threshold)
+    print(
+        f"{summary['rescored']} detections scored by this version: "
+        f"avg probability {summary['avg_new_probability']:.3f} "
+        f"(recorded {summary['avg_recorded_probability']:.3f}), "
+        f"{summary['still_spam']} above {args.threshold}, "
+        f"{summary['manual_caught']}/{summary['manual_total']} manual reports",
+    )
+
+
+def main() -> None:
+    """Command-line entry point."""
+    parser = argparse.ArgumentParser(description="Re-score stored detections.")
+    parser.add_argument(
+        "--model",
+        required=True,
+        help="Model file; relative paths are in the model data dir",
+    )
+    parser.add_argument(
+        "--model-version",
+        help="Key of the scores (default: file stem and content hash)",
+    )
+    parser.add_argument("--bot-id", type=int, default=0)
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    parser.add_argument("--workers", type=int, help="Worker processes")
+    parser.add_argument(
+        "--max-rows-per-second",
+        type=float,
+        default=0.0,
+        help="Throttle reads (0 = unlimited)",
+    )
+    parser.add_argument(
+        "--busy-timeout",
+        type=float,
+        default=30.0,
+        help="Seconds to wait for the bot's writes before failing",
+    )
+    parser.add_argument("--threshold", type=float, default=get_spam_threshold())
+    asyncio.run(_run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,17 +1,60 @@
 """Database module for storing bot message records."""
 
+from collections.abc import AsyncIterator
 from datetime import UTC, datetime
 
 import aiosqlite
 
 from .config import get_db_path
+from .core.base_storage import CHAT_POLICY_COLUMNS, BotStorage
+from .core.records import AllowedChatRecord, DetectionRecord, parse_timestamp
+from .text_store import compress_text, decompress_text, text_hash, train_dictionary
 
+# Columns read into a DetectionRecord, followed by the shared text if any
+DETECTION_SELECT = """
+    SELECT b.id, b.message_id, b.chat_id, b.user_id, b.username,
+           b.text_content, b.spam_probability, b.detection_timestamp,
+           b.was_deleted, b.was_manual, t.compressed, t.dictionary_id
+    FROM bot_messages b
+    LEFT JOIN message_texts t ON t.text_hash = b.text_hash
+"""
+# Columns read into an AllowedChatRecord, in field order
+ALLOWED_CHAT_COLUMNS = """
+    chat_id, title, added_by_admin_id, added_at,
+    spam_threshold, min_word_count, dry_run, heuristics_enabled
+"""
 
-class BotMessageDatabase:
-    """SQLite database for storing bot message detection records."""
+ALLOWED_CHATS_DDL = """
+    CREATE TABLE IF NOT EXISTS allowed_chats (
+        bot_id INTEGER NOT NULL DEFAULT 0,
+        chat_id INTEGER NOT NULL,
+        title TEXT,
+        added_by_admin_id INTEGER,
+        added_at DATETIME NOT NULL,
+        spam_threshold REAL,
+        min_word_count INTEGER,
+        dry_run BOOLEAN NOT NULL DEFAULT 0,
+        heuristics_enabled BOOLEAN NOT NULL DEFAULT 1,
+        PRIMARY KEY (bot_id, chat_id)
+    )
+"""
 
-    def __init__(self, db_path: str | None = None) -> None:
+
+class BotMessageDatabase(BotStorage):
+    """SQLite database for storing bot message detection records.
+
+    Several bots can share one database file: detections, allowed chats and
+    shadow disagreements are scoped by `bot_id`, while deduplicated message
+    texts are shared. The primary bot uses scope 0.
+    """
+
+    def __init__(self, db_path: str | None = None, bot_id: int = 0) -> None:
         self.db_path = db_path or get_db_path()
+        self.bot_id = bot_id
+        # Compression dictionaries by id; new texts use the latest one
+        self._dictionaries: dict[int, bytes] = {}
+        self._current_dictionary_id: int | None = None
+        self._dictionaries_loaded = False
 
     async def init_database(self) -> None:
         """Initialize the database and create tables if they don't exist."""
@@ -27,15 +70,57 @@ async def init_database(self) -> None:
                     spam_probability REAL NOT NULL,
                     detection_timestamp DATETIME NOT NULL,
                     was_deleted BOOLEAN NOT NULL DEFAULT TRUE,
-                    was_manual BOOLEAN NOT NULL DEFAULT FALSE
+                    was_manual BOOLEAN NOT NULL DEFAULT FALSE,
+                    bot_id INTEGER NOT NULL DEFAULT 0
+                )
+            """)
+            await db.execute(ALLOWED_CHATS_DDL)
+            await db.execute("""
+                CREATE TABLE IF NOT EXISTS shadow_disagreements (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    bot_id INTEGER NOT NULL DEFAULT 0,
+                    chat_id INTEGER NOT NULL,
+                    message_id INTEGER NOT NULL,
+                    primary_probability REAL NOT NULL,
+                    shadow_probability REAL NOT NULL,
+                    threshold REAL NOT NULL,
+                    text_preview TEXT,
+                    detected_at DATETIME NOT NULL
+                )
+            """)
+            await db.execute("""
+                CREATE TABLE IF NOT EXISTS message_texts (
+                    text_hash BLOB PRIMARY KEY,
+                    compressed BLOB NOT NULL,
+                    dictionary_id INTEGER,
+                    original_size INTEGER NOT NULL,
+                    occurrences INTEGER NOT NULL DEFAULT 1
+                )
+            """)
+            await db.execute("""
+                CREATE TABLE IF NOT EXISTS compression_dictionaries (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    data BLOB NOT NULL,
+                    created_at DATETIME NOT NULL
                 )
             """)
+            # Scores of past detections by other model versions (backfill)
             await db.execute("""
-                CREATE TABLE IF NOT EXISTS allowed_chats (
-                    chat_id INTEGER PRIMARY KEY,
-                    title TEXT,
-                    added_by_admin_id INTEGER,
-                    added_at DATETIME NOT NULL
+                CREATE TABLE IF NOT EXISTS detection_rescores (
+                    model_version TEXT NOT NULL,
+                    detection_id INTEGER NOT NULL,
+                    spam_probability REAL NOT NULL,
+                    PRIMARY KEY (model_version, detection_id)
+                ) WITHOUT ROWID
+            """)
+            await db.execute("""
+                CREATE TABLE IF NOT EXISTS backfill_checkpoints (
+                    bot_id INTEGER NOT NULL,
+                    model_version TEXT NOT NULL,
+                    last_detection_id INTEGER NOT NULL,
+                    rows_scored INTEGER NOT NULL,
+                    updated_at DATETIME NOT NULL,
+                    PRIMARY KEY (bot_id, model_version)
                 )
             """)
             await db.commit()
@@ -46,11 +131,143 @@ async def init_database(self) -> None:
                 column_names = {row[1] for row in columns}
             if "was_manual" not in column_names:
                 await db.execute(
-                    "ALTER TABLE bot_messages ADD COLUMN was_manual BOOLEAN NOT NULL DEFAULT 0",
+                    "ALTER TABLE bot_messages "
+                    "ADD COLUMN was_manual BOOLEAN NOT NULL DEFAULT 0",
                 )
                 await db.commit()
+            # Texts of new rows live in message_texts; legacy rows keep text_content
+            if "text_hash" not in column_names:
+                await db.execute("ALTER TABLE bot_messages ADD COLUMN text_hash BLOB")
+                await db.commit()
+            # Rows written before multi-bot support belong to the primary bot
+            if "bot_id" not in column_names:
+                await db.execute(
+                    "ALTER TABLE bot_messages "
+                    "ADD COLUMN bot_id INTEGER NOT NULL DEFAULT 0",
+                )
+                await db.commit()
+            await db.execute(
+                "CREATE INDEX IF NOT EXISTS idx_bot_messages_bot_id "
+                "ON bot_messages (bot_id, id)",
+            )
+            # Per-chat /stats and /recent
+            await db.execute(
+                "CREATE INDEX IF NOT EXISTS idx_bot_messages_chat "
+                "ON bot_messages (bot_id, chat_id, detection_timestamp)",
+            )
+            async with db.execute("PRAGMA table_info(shadow_disagreements)") as cursor:
+                shadow_columns = {row[1] for row in await cursor.fetchall()}
+            if "bot_id" not in shadow_columns:
+                await db.execute(
+                    "ALTER TABLE shadow_disagreements "
+                    "ADD COLUMN bot_id INTEGER NOT NULL DEFAULT 0",
+                )
+            await db.commit()
+
+            # Ensure migration: add per-chat policy columns to allowed_chats
+            async with db.execute("PRAGMA table_info(allowed_chats)") as cursor:
+                columns = await cursor.fetchall()
+                column_names = {row[1] for row in columns}
+            policy_column_ddl = {
+                "spam_threshold": "spam_threshold REAL",
+                "min_word_count": "min_word_count INTEGER",
+                "dry_run": "dry_run BOOLEAN NOT NULL DEFAULT 0",
+                "heuristics_enabled": "heuristics_enabled BOOLEAN NOT NULL DEFAULT 1",
+            }
+            for column, ddl in policy_column_ddl.items():
+                if column not in column_names:
+                    await db.execute(f"ALTER TABLE allowed_chats ADD COLUMN {ddl}")
+            await db.commit()
+
+            # Ensure migration: key allowed_chats by (bot_id, chat_id). SQLite
+            # cannot change a primary key in place, so rebuild the table.
+            if "bot_id" not in column_names:
+                await db.execute(
+                    "ALTER TABLE allowed_chats RENAME TO allowed_chats_unscoped",
+                )
+                await db.execute(ALLOWED_CHATS_DDL)
+                await db.execute("""
+                    INSERT INTO allowed_chats
+                    (chat_id, title, added_by_admin_id, added_at, spam_threshold,
+                     min_word_count, dry_run, heuristics_enabled)
+                    SELECT chat_id, title, added_by_admin_id, added_at,
+                           spam_threshold, min_word_count, dry_run,
+                           heuristics_enabled
+                    FROM allowed_chats_unscoped
+                """)
+                await db.execute("DROP TABLE allowed_chats_unscoped")
+                await db.commit()
 
-    async def record_bot_message(
+            await self._load_dictionaries(db)
+
+    async def _load_dictionaries(self, db: aiosqlite.Connection) -> None:
+        async with db.execute(
+            "SELECT id, data FROM compression_dictionaries ORDER BY id",
+        ) as cursor:
+            rows = await cursor.fetchall()
+        self._dictionaries = {row[0]: row[1] for row in rows}
+        self._current_dictionary_id = rows[-1][0] if rows else None
+        self._dictionaries_loaded = True
+
+    async def _dictionary(
+        self,
+        db: aiosqlite.Connection,
+        dictionary_id: int | None,
+    ) -> bytes | None:
+        if dictionary_id is None:
+            return None
+        if dictionary_id not in self._dictionaries:
+            # Trained by another process since we loaded
+            await self._load_dictionaries(db)
+        return self._dictionaries[dictionary_id]
+
+    async def _store_text(self, db: aiosqlite.Connection, text: str) -> bytes:
+        """Store a text once in message_texts and return its hash."""
+        if not self._dictionaries_loaded:
+            await self._load_dictionaries(db)
+        key = text_hash(text)
+        dictionary_id = self._current_dictionary_id
+        compressed = compress_text(
+            text,
+            self._dictionaries.get(dictionary_id) if dictionary_id else None,
+        )
+        await db.execute(
+            """
+            INSERT INTO message_texts
+            (text_hash, compressed, dictionary_id, original_size, occurrences)
+            VALUES (?, ?, ?, ?, 1)
+            ON CONFLICT(text_hash) DO UPDATE SET occurrences = occurrences + 1
+            """,
+            (key, compressed, dictionary_id, len(text.encode("utf-8"))),
+        )
+        return key
+
+    async def _detection(
+        self,
+        db: aiosqlite.Connection,
+        row: tuple,
+    ) -> DetectionRecord:
+        """Build a record from a `DETECTION_SELECT` row, restoring its text."""
+        text_content = row[5]
+        if text_content is None and row[10] is not None:
+            text_content = decompress_text(
+                row[10],
+                await self._dictionary(db, row[11]),
+            )
+        return DetectionRecord(
+            id=row[0],
+            message_id=row[1],
+            chat_id=row[2],
+            user_id=row[3],
+            username=row[4],
+            text_content=text_content,
+            spam_probability=row[6],
+            detection_timestamp=parse_timestamp(row[7]),
+            was_deleted=bool(row[8]),
+            was_manual=bool(row[9]),
+        )
+
+    async def record_bot_message(  # noqa: PLR0913
         self,
         *,
         message_id: int,
@@ -64,55 +281,251 @@ async def record_bot_message(
     ) -> None:
         """Record a detected bot message in the database."""
         async with aiosqlite.connect(self.db_path) as db:
+            key = await self._store_text(db, text_content)
             await db.execute(
                 """
                 INSERT INTO bot_messages
-                (message_id, chat_id, user_id, username, text_content,
-                 spam_probability, detection_timestamp, was_deleted, was_manual)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                (message_id, chat_id, user_id, username, text_hash,
+                 spam_probability, detection_timestamp, was_deleted, was_manual,
+                 bot_id)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
             """,
                 (
                     message_id,
                     chat_id,
                     user_id,
                     username,
-                    text_content,
+                    key,
                     spam_probability,
                     datetime.now(tz=UTC),
                     was_deleted,
                     1 if was_manual else 0,
+                    self.bot_id,
                 ),
             )
             await db.commit()
 
-    async def get_recent_detections(self, limit: int = 10) -> list[dict]:
-        """Get recent bot message detections."""
-        async with aiosqlite.connect(self.db_path) as db:
-            db.row_factory = aiosqlite.Row
-            async with db.execute(
-                """
-                SELECT * FROM bot_messages
-                ORDER BY detection_timestamp DESC
+    async def get_recent_detections(
+        self,
+        limit: int = 10,
+        chat_id: int | None = None,
+    ) -> list[DetectionRecord]:
+        """Get recent bot message detections, optionally of one chat only."""
+        where = "WHERE b.bot_id = ?"
+        params: list[object] = [self.bot_id]
+        if chat_id is not None:
+            where += " AND b.chat_id = ?"
+            params.append(chat_id)
+        async with (
+            aiosqlite.connect(self.db_path) as db,
+            db.execute(
+                f"""
+                {DETECTION_SELECT}
+                {where}
+                ORDER BY b.detection_timestamp DESC
                 LIMIT ?
-            """,
-                (limit,),
-            ) as cursor:
-                rows = await cursor.fetchall()
-                return [dict(row) for row in rows]
+                """,
+                [*params, limit],
+            ) as cursor,
+        ):
+            return [await self._detection(db, row) for row in await cursor.fetchall()]
+
+    async def iter_detections(
+        self,
+        *,
+        chat_id: int | None = None,
+        since: datetime | None = None,
+        until: datetime | None = None,
+        manual: bool | None = None,
+        chunk_size: int = 1000,
+    ) -> AsyncIterator[DetectionRecord]:
+        """Stream detections in id order, fetching `chunk_size` rows at a time.
+
+        Each chunk is a short keyset query like `get_detections_after`, so
+        memory use does not depend on the size of the table and a long export
+        does not hold a read transaction that blocks the bot's writes.
+        `manual` selects manual (True) or automatic (False) detections; None
+        returns both.
+        """
+        conditions = ["b.bot_id = ?"]
+        params: list[object] = [self.bot_id]
+        if chat_id is not None:
+            conditions.append("b.chat_id = ?")
+            params.append(chat_id)
+        if since is not None:
+            conditions.append("b.detection_timestamp >= ?")
+            params.append(since)
+        if until is not None:
+            conditions.append("b.detection_timestamp < ?")
+            params.append(until)
+        if manual is not None:
+            conditions.append("b.was_manual = ?")
+            params.append(1 if manual else 0)
+        conditions.append("b.id > ?")
+        where = f"WHERE {' AND '.join(conditions)}"
+        last_id = 0
+        while True:
+            async with (
+                aiosqlite.connect(self.db_path) as db,
+                db.execute(
+                    f"""
+                    {DETECTION_SELECT}
+                    {where}
+                    ORDER BY b.id
+                    LIMIT ?
+                    """,
+                    [*params, last_id, chunk_size],
+                ) as cursor,
+            ):
+                rows = [
+                    await self._detection(db, row) for row in await cursor.fetchall()
+                ]
+            # Yield only after the connection is closed
+            for row in rows:
+                yield row
+            if len(rows) < chunk_size:
+                return
+            last_id = rows[-1].id
+
+    async def get_detections_after(
+        self,
+        after_id: int,
+        limit: int = 1000,
+    ) -> list[DetectionRecord]:
+        """Get up to `limit` detections with ids above `after_id`, in id order.
+
+        Each call is a short read, so a long job paging through the table
+        does not hold a transaction open while the bot writes.
+        """
+        async with (
+            aiosqlite.connect(self.db_path) as db,
+            db.execute(
+                f"""
+                {DETECTION_SELECT}
+                WHERE b.bot_id = ? AND b.id > ?
+                ORDER BY b.id
+                LIMIT ?
+                """,
+                (self.bot_id, after_id, limit),
+            ) as cursor,
+        ):
+            return [await self._detection(db, row) for row in await cursor.fetchall()]
+
+    async def get_backfill_checkpoint(self, model_version: str) -> tuple[int, int]:
+        """Get (last detection id, rows scored) of a backfill, (0, 0) if new."""
+        async with (
+            aiosqlite.connect(self.db_path) as db,
+            db.execute(
+                """
+                SELECT last_detection_id, rows_scored FROM backfill_checkpoints
+                WHERE bot_id = ? AND model_version = ?
+                """,
+                (self.bot_id, model_version),
+            ) as cursor,
+        ):
+            row = await cursor.fetchone()
+            return (row[0], row[1]) if row else (0, 0)
+
+    async def save_rescores(
+        self,
+        model_version: str,
+        scores: list[tuple[int, float]],
+        last_detection_id: int,
+        busy_timeout: float = 30.0,
+    ) -> None:
+        """Store (detection id, probability) scores and advance the checkpoint.
 
-    async def get_stats(self) -> dict:
-        """Get statistics about detected bot messages."""
+        Both are written in one transaction, so a resumed backfill never skips
+        rows. `busy_timeout` is how long to wait for the bot's writes to finish.
+        """
+        async with aiosqlite.connect(self.db_path, timeout=busy_timeout) as db:
+            await db.executemany(
+                """
+                INSERT OR REPLACE INTO detection_rescores
+                (model_version, detection_id, spam_probability)
+                VALUES (?, ?, ?)
+                """,
+                [
+                    (model_version, detection_id, probability)
+                    for detection_id, probability in scores
+                ],
+            )
+            await db.execute(
+                """
+                INSERT INTO backfill_checkpoints
+                (bot_id, model_version, last_detection_id, rows_scored, updated_at)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT(bot_id, model_version) DO UPDATE SET
+                    last_detection_id = excluded.last_detection_id,
+                    rows_scored = rows_scored + excluded.rows_scored,
+                    updated_at = excluded.updated_at
+                """,
+                (
+                    self.bot_id,
+                    model_version,
+                    last_detection_id,
+                    len(scores),
+                    datetime.now(tz=UTC),
+                ),
+            )
+            await db.commit()
+
+    async def get_rescore_summary(self, model_version: str, threshold: float) -> dict:
+        """Compare a model version's scores with the recorded detections.
+
+        The stored scores already include the chats' heuristic penalties and,
+        like the bot, a score counts as spam when it is above `threshold`.
+        """
         async with (
             aiosqlite.connect(self.db_path) as db,
-            db.execute("""
+            db.execute(
+                """
+                SELECT
+                    COUNT(*),
+                    AVG(r.spam_probability),
+                    AVG(b.spam_probability),
+                    COUNT(CASE WHEN r.spam_probability > ? THEN 1 END),
+                    COUNT(CASE WHEN b.was_manual = 1
+                               AND r.spam_probability > ? THEN 1 END),
+                    COUNT(CASE WHEN b.was_manual = 1 THEN 1 END)
+                FROM detection_rescores r
+                JOIN bot_messages b ON b.id = r.detection_id
+                WHERE r.model_version = ? AND b.bot_id = ?
+                """,
+                (threshold, threshold, model_version, self.bot_id),
+            ) as cursor,
+        ):
+            row = await cursor.fetchone()
+            return {
+                "rescored": row[0],
+                "avg_new_probability": row[1] or 0.0,
+                "avg_recorded_probability": row[2] or 0.0,
+                "still_spam": row[3],
+                "manual_caught": row[4],
+                "manual_total": row[5],
+            }
+
+    async def get_stats(self, chat_id: int | None = None) -> dict:
+        """Get statistics about detected bot messages, optionally of one chat."""
+        where = "WHERE was_manual = 0 AND bot_id = ?"
+        params: list[object] = [self.bot_id]
+        if chat_id is not None:
+            where += " AND chat_id = ?"
+            params.append(chat_id)
+        async with (
+            aiosqlite.connect(self.db_path) as db,
+            db.execute(
+                f"""
                 SELECT
                     COUNT(*) as total_detections,
                     COUNT(CASE WHEN was_deleted = 1 THEN 1 END) as deleted_messages,
                     AVG(spam_probability) as avg_spam_probability,
                     MAX(spam_probability) as max_spam_probability
                 FROM bot_messages
-                WHERE was_manual = 0
-            """) as cursor,
+                {where}
+            """,  # noqa: S608
+                params,
+            ) as cursor,
         ):
             row = await cursor.fetchone()
             return {
@@ -122,6 +535,154 @@ async def get_stats(self) -> dict:
                 "max_spam_probability": row[3] if row and row[3] else 0.0,
             }
 
+    async def get_text_occurrences(self, text: str) -> int:
+        """Get how many detections share exactly this text."""
+        async with (
+            aiosqlite.connect(self.db_path) as db,
+            db.execute(
+                "SELECT occurrences FROM message_texts WHERE text_hash = ?",
+                (text_hash(text),),
+            ) as cursor,
+        ):
+            row = await cursor.fetchone()
+            return row[0] if row else 0
+
+    async def train_text_dictionary(
+        self,
+        *,
+        sample_size: int = 20000,
+        extra_texts: list[str] | None = None,
+    ) -> int:
+        """Train a compression dictionary from stored texts and make it current.
+
+        Existing texts keep the dictionary they were compressed with.
+        Returns the id of the new dictionary.
+        """
+        texts = list(extra_texts or [])
+        async with aiosqlite.connect(self.db_path) as db:
+            async with db.execute(
+                """
+                SELECT DISTINCT text_content FROM bot_messages
+                WHERE text_content IS NOT NULL
+                LIMIT ?
+                """,
+                (sample_size,),
+            ) as cursor:
+                texts.extend(row[0] for row in await cursor.fetchall())
+            async with db.execute(
+                "SELECT compressed, dictionary_id FROM message_texts LIMIT ?",
+                (sample_size,),
+            ) as cursor:
+                rows = await cursor.fetchall()
+            for compressed, dictionary_id in rows:
+                dictionary = await self._dictionary(db, dictionary_id)
+                texts.append(decompress_text(compressed, dictionary))
+
+            cursor = await db.execute(
+                "INSERT INTO compression_dictionaries (data, created_at) VALUES (?, ?)",
+                (train_dictionary(texts), datetime.now(tz=UTC)),
+            )
+            await db.commit()
+            dictionary_id = cursor.lastrowid
+            await self._load_dictionaries(db)
+            return dictionary_id
+
+    async def migrate_text_content(self, batch_size: int = 1000) -> int:
+        """Move inline text_content of legacy rows into message_texts.
+
+        Runs in batches with a commit after each one. Returns the number of
+        rows migrated.
+        """
+        migrated = 0
+        async with aiosqlite.connect(self.db_path) as db:
+            while True:
+                async with db.execute(
+                    """
+                    SELECT id, text_content FROM bot_messages
+                    WHERE text_content IS NOT NULL
+                    LIMIT ?
+                    """,
+                    (batch_size,),
+                ) as cursor:
+                    rows = await cursor.fetchall()
+                if not rows:
+                    return migrated
+                for row_id, text in rows:
+                    key = await self._store_text(db, text)
+                    await db.execute(
+                        """
+                        UPDATE bot_messages SET text_hash = ?, text_content = NULL
+                        WHERE id = ?
+                        """,
+                        (key, row_id),
+                    )
+                await db.commit()
+                migrated += len(rows)
+
+    async def get_text_storage_report(self) -> dict:
+        """Report how much space message texts take compared to raw text."""
+        async with aiosqlite.connect(self.db_path) as db:
+            async with db.execute(
+                """
+                SELECT COUNT(*),
+                       COALESCE(SUM(original_size * occurrences), 0),
+                       COALESCE(SUM(LENGTH(compressed)), 0)
+                FROM message_texts
+                """,
+            ) as cursor:
+                distinct_texts, content_raw, content_stored = await cursor.fetchone()
+            async with db.execute(
+                """
+                SELECT COUNT(*),
+                       COALESCE(SUM(LENGTH(CAST(text_content AS BLOB))), 0)
+                FROM bot_messages
+                """,
+            ) as cursor:
+                messages, inline_bytes = await cursor.fetchone()
+        return {
+            "messages": messages,
+            "distinct_texts": distinct_texts,
+            "raw_bytes": content_raw + inline_bytes,
+            "stored_bytes": content_stored + inline_bytes,
+        }
+
+    async def vacuum(self) -> None:
+        """Rebuild the database file to reclaim free pages."""
+        async with aiosqlite.connect(self.db_path) as db:
+            await db.execute("VACUUM")
+
+    async def record_shadow_disagreement(  # noqa: PLR0913
+        self,
+        *,
+        chat_id: int,
+        message_id: int,
+        primary_probability: float,
+        shadow_probability: float,
+        threshold: float,
+        text_preview: str,
+    ) -> None:
+        """Record a message where the shadow model disagreed with the primary."""
+        async with aiosqlite.connect(self.db_path) as db:
+            await db.execute(
+                """
+                INSERT INTO shadow_disagreements
+                (bot_id, chat_id, message_id, primary_probability,
+                 shadow_probability, threshold, text_preview, detected_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                (
+                    self.bot_id,
+                    chat_id,
+                    message_id,
+                    primary_probability,
+                    shadow_probability,
+                    threshold,
+                    text_preview,
+                    datetime.now(tz=UTC),
+                ),
+            )
+            await db.commit()
+
     async def add_allowed_chat(
         self,
         *,
@@ -133,14 +694,15 @@ async def add_allowed_chat(
         async with aiosqlite.connect(self.db_path) as db:
             await db.execute(
                 """
-                INSERT INTO allowed_chats (chat_id, title, added_by_admin_id, added_at)
-                VALUES (?, ?, ?, ?)
-                ON CONFLICT(chat_id) DO UPDATE SET
+                INSERT INTO allowed_chats
+                (bot_id, chat_id, title, added_by_admin_id, added_at)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT(bot_id, chat_id) DO UPDATE SET
                     title=excluded.title,
                     added_by_admin_id=excluded.added_by_admin_id,
                     added_at=excluded.added_at
                 """,
-                (chat_id, title, added_by_admin_id, datetime.now(tz=UTC)),
+                (self.bot_id, chat_id, title, added_by_admin_id, datetime.now(tz=UTC)),
             )
             await db.commit()
 
@@ -148,8 +710,8 @@ async def remove_allowed_chat(self, chat_id: int) -> bool:
         """Remove an allowed chat. Returns True if a row was deleted."""
         async with aiosqlite.connect(self.db_path) as db:
             cursor = await db.execute(
-                "DELETE FROM allowed_chats WHERE chat_id = ?",
-                (chat_id,),
+                "DELETE FROM allowed_chats WHERE bot_id = ? AND chat_id = ?",
+                (self.bot_id, chat_id),
             )
             await db.commit()
             return cursor.rowcount > 0
@@ -159,23 +721,77 @@ async def is_chat_allowed(self, chat_id: int) -> bool:
         async with (
             aiosqlite.connect(self.db_path) as db,
             db.execute(
-                "SELECT 1 FROM allowed_chats WHERE chat_id = ? LIMIT 1",
-                (chat_id,),
+                "SELECT 1 FROM allowed_chats WHERE bot_id = ? AND chat_id = ? LIMIT 1",
+                (self.bot_id, chat_id),
             ) as cursor,
         ):
             row = await cursor.fetchone()
             return row is not None
 
-    async def list_allowed_chats(self) -> list[dict]:
-        """List all allowed chats."""
+    async def get_allowed_chat(self, chat_id: int) -> AllowedChatRecord | None:
+        """Get an allowed chat entry with its policy, or None if not allowed."""
+        async with (
+            aiosqlite.connect(self.db_path) as db,
+            db.execute(
+                f"""
+                SELECT {ALLOWED_CHAT_COLUMNS}
+                FROM allowed_chats
+                WHERE bot_id = ? AND chat_id = ?
+                """,  # noqa: S608
+                (self.bot_id, chat_id),
+            ) as cursor,
+        ):
+            row = await cursor.fetchone()
+            return _allowed_chat(row) if row else None
+
+    async def update_chat_policy(
+        self,
+        chat_id: int,
+        column: str,
+        *,
+        value: float | bool | None,
+    ) -> bool:
+        """Update one policy column of an allowed chat.
+
+        Returns True if the chat exists in the allowed list.
+        """
+        if column not in CHAT_POLICY_COLUMNS:
+            msg = f"Unknown chat policy column: {column}"
+            raise ValueError(msg)
         async with aiosqlite.connect(self.db_path) as db:
-            db.row_factory = aiosqlite.Row
-            async with db.execute(
-                """
-                SELECT chat_id, title, added_by_admin_id, added_at
+            cursor = await db.execute(
+                f"UPDATE allowed_chats SET {column} = ? "  # noqa: S608
+                "WHERE bot_id = ? AND chat_id = ?",
+                (value, self.bot_id, chat_id),
+            )
+            await db.commit()
+            return cursor.rowcount > 0
+
+    async def list_allowed_chats(self) -> list[AllowedChatRecord]:
+        """List all allowed chats with their policies."""
+        async with (
+            aiosqlite.connect(self.db_path) as db,
+            db.execute(
+                f"""
+                SELECT {ALLOWED_CHAT_COLUMNS}
                 FROM allowed_chats
+                WHERE bot_id = ?
                 ORDER BY added_at DESC
-                """,
-            ) as cursor:
-                rows = await cursor.fetchall()
-                return [dict(row) for row in rows]
+                """,  # noqa: S608
+                (self.bot_id,),
+            ) as cursor,
+        ):
+            return [_allowed_chat(row) for row in await cursor.fetchall()]
+
+
+def _allowed_chat(row: tuple) -> AllowedChatRecord:
+    return AllowedChatRecord(
+        chat_id=row[0],
+        title=row[1],
+        added_by_admin_id=row[2],
+        added_at=parse_timestamp(row[3]),
+        spam_threshold=row[4],
+        min_word_count=row[5],
+        dry_run=bool(row[6]),
+        heuristics_enabled=bool(row[7]),
+    )
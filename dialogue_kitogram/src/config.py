@@ -19,12 +19,55 @@ def load_config() -> None:
         _loaded = True
 
 
+def get_env_int(name: str, default: int) -> int:
+    """Get an integer from environment, falling back to default if invalid."""
+    load_config()
+    try:
+        return int(os.getenv(name, str(default)))
+    except (ValueError, TypeError):
+        return default
+
+
+def get_env_float(name: str, default: float) -> float:
+    """Get a float from environment, falling back to default if invalid."""
+    load_config()
+    try:
+        return float(os.getenv(name, str(default)))
+    except (ValueError, TypeError):
+        return default
+
+
+def get_env_bool(name: str, *, default: bool) -> bool:
+    """Get a boolean flag from environment (1/true/yes/on)."""
+    load_config()
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return value.strip().lower() in {"1", "true", "yes", "on"}
+
+
 def get_telegram_token() -> str | None:
     """Get Telegram bot token from environment."""
     load_config()
     return os.getenv("TELEGRAM_BOT_TOKEN")
 
 
+def get_extra_telegram_tokens() -> list[str]:
+    """Get tokens of additional bots served by this process.
+
+    TELEGRAM_EXTRA_BOT_TOKENS accepts comma or space separated tokens.
+    """
+    load_config()
+    raw = os.getenv("TELEGRAM_EXTRA_BOT_TOKENS", "")
+    return [token for token in raw.replace(",", " ").split() if token]
+
+
+def get_telegram_api_url() -> str | None:
+    """Get base URL of an alternative Bot API server, e.g. a local fake one."""
+    load_config()
+    return os.getenv("TELEGRAM_API_URL") or None
+
+
 def get_spam_threshold() -> float:
     """Get spam detection threshold from environment."""
     load_config()
@@ -34,12 +77,28 @@ def get_spam_threshold() -> float:
         return 0.95
 
 
+def get_min_word_count() -> int:
+    """Get the default word count above which long-message heuristics apply."""
+    return get_env_int("MIN_WORD_COUNT_FOR_SPAM_CHECK", 5)
+
+
 def get_db_path() -> str:
     """Get database path from environment."""
     load_config()
     return os.getenv("DB_PATH", "bot_messages.db")
 
 
+def get_storage_backend() -> str:
+    """Get storage backend name from environment ("sqlite" or "memory")."""
+    load_config()
+    return os.getenv("STORAGE_BACKEND", "sqlite")
+
+
+def get_memory_storage_capacity() -> int:
+    """Get the number of detections retained by the in-memory backend."""
+    return max(1, get_env_int("MEMORY_STORAGE_CAPACITY", 100_000))
+
+
 def get_log_level() -> str:
     """Get log level from environment."""
     load_config()
@@ -52,6 +111,63 @@ def get_log_file_path() -> str:
     return os.getenv("LOG_FILE_PATH", "logs/bot.log")
 
 
+def get_shadow_model_path() -> str | None:
+    """Get path of the optional shadow (candidate) model from environment.
+
+    Relative paths are resolved against the model data directory.
+    Returns None when shadow mode is disabled.
+    """
+    load_config()
+    return os.getenv("SHADOW_MODEL_PATH") or None
+
+
+def get_shadow_queue_size() -> int:
+    """Get the bounded queue size for shadow model scoring."""
+    return max(1, get_env_int("SHADOW_QUEUE_SIZE", 1000))
+
+
+def get_model_routes() -> dict[str, str]:
+    """Get per-language spam model files from env `MODEL_ROUTES`.
+
+    Format: "uk=antispam_uk.bin,en=antispam_en.bin" (comma or space
+    separated). Relative paths are resolved against the model data directory.
+    Languages without a route use the default model.
+    """
+    load_config()
+    raw = os.getenv("MODEL_ROUTES", "")
+    routes: dict[str, str] = {}
+    for item in raw.replace(",", " ").split():
+        language, _, model_name = item.partition("=")
+        if language.strip() and model_name.strip():
+            routes[language.strip().lower()] = model_name.strip()
+    return routes
+
+
+def get_model_memory_budget_mb() -> float:
+    """Get the memory budget for loaded spam models in MiB (0 = unlimited)."""
+    return max(0.0, get_env_float("MODEL_MEMORY_BUDGET_MB", 0.0))
+
+
+def get_model_retry_seconds() -> float:
+    """Get the delay before loading a failed per-language model again."""
+    return max(0.0, get_env_float("MODEL_RETRY_SECONDS", 300.0))
+
+
+def get_max_concurrent_updates() -> int:
+    """Get the maximum number of updates processed concurrently."""
+    return max(1, get_env_int("MAX_CONCURRENT_UPDATES", 32))
+
+
+def get_max_pending_low_priority() -> int:
+    """Get the queue depth at which low-priority updates are shed."""
+    return max(0, get_env_int("MAX_PENDING_LOW_PRIORITY", 1000))
+
+
+def get_max_pending_normal_priority() -> int:
+    """Get the queue depth at which normal-priority updates are shed."""
+    return max(0, get_env_int("MAX_PENDING_NORMAL_PRIORITY", 1000))
+
+
 # Load configuration when module is imported
 load_config()
 
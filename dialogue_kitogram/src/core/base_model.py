@@ -54,3 +54,7 @@ def fit(self) -> None: ...
     def load(self) -> None: ...
     @abstractmethod
     def predict_proba(self, text: str) -> float: ...
+
+    def predict_proba_batch(self, texts: list[str]) -> list[float]:
+        """Score several texts; models may override with a batched path."""
+        return [self.predict_proba(text) for text in texts]
@@ -0,0 +1,101 @@
+from abc import ABC, abstractmethod
+from collections.abc import AsyncIterator
+from datetime import datetime
+
+from .records import AllowedChatRecord, DetectionRecord
+
+# Per-chat policy columns on `allowed_chats` that admins may update
+CHAT_POLICY_COLUMNS = frozenset(
+    {"spam_threshold", "min_word_count", "dry_run", "heuristics_enabled"},
+)
+
+
+class BotStorage(ABC):
+    """Abstract storage for detections, allowed chats and stats.
+
+    Rows are returned as `DetectionRecord` and `AllowedChatRecord` objects
+    with fields named after the `bot_messages` and `allowed_chats` columns.
+    """
+
+    @abstractmethod
+    async def init_database(self) -> None: ...
+
+    @abstractmethod
+    async def record_bot_message(  # noqa: PLR0913
+        self,
+        *,
+        message_id: int,
+        chat_id: int,
+        user_id: int | None,
+        username: str | None,
+        text_content: str,
+        spam_probability: float,
+        was_deleted: bool = True,
+        was_manual: bool = False,
+    ) -> None: ...
+
+    @abstractmethod
+    async def get_recent_detections(
+        self,
+        limit: int = 10,
+        chat_id: int | None = None,
+    ) -> list[DetectionRecord]: ...
+
+    @abstractmethod
+    def iter_detections(
+        self,
+        *,
+        chat_id: int | None = None,
+        since: datetime | None = None,
+        until: datetime | None = None,
+        manual: bool | None = None,
+        chunk_size: int = 1000,
+    ) -> AsyncIterator[DetectionRecord]: ...
+
+    @abstractmethod
+    async def get_stats(self, chat_id: int | None = None) -> dict: ...
+
+    @abstractmethod
+    async def get_text_occurrences(self, text: str) -> int: ...
+
+    @abstractmethod
+    async def record_shadow_disagreement(  # noqa: PLR0913
+        self,
+        *,
+        chat_id: int,
+        message_id: int,
+        primary_probability: float,
+        shadow_probability: float,
+        threshold: float,
+        text_preview: str,
+    ) -> None: ...
+
+    @abstractmethod
+    async def add_allowed_chat(
+        self,
+        *,
+        chat_id: int,
+        title: str | None,
+        added_by_admin_id: int,
+    ) -> None: ...
+
+    @abstractmethod
+    async def remove_allowed_chat(self, chat_id: int) -> bool: ...
+
+    @abstractmethod
+    async def is_chat_allowed(self, chat_id: int) -> bool: ...
+
+    @abstractmethod
+    async def get_allowed_chat(self, chat_id: int) -> AllowedChatRecord | None: ...
+
+    @abstractmethod
+    async def update_chat_policy(
+        self,
+        chat_id: int,
+        column: str,
+        *,
+        value: float | bool | None,
+    ) -> bool: ...
+
+    @abstractmethod
+    async def list_allowed_chats(self) -> list[AllowedChatRecord]: ...
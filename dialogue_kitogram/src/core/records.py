@@ -0,0 +1,37 @@
+from dataclasses import dataclass
+from datetime import datetime
+
+
+def parse_timestamp(value: str | datetime) -> datetime:
+    """Parse a timestamp as stored by sqlite3's default datetime adapter."""
+    return datetime.fromisoformat(value) if isinstance(value, str) else value
+
+
+@dataclass(frozen=True, slots=True)
+class DetectionRecord:
+    """One row of `bot_messages` with its text restored."""
+
+    id: int
+    message_id: int
+    chat_id: int
+    user_id: int | None
+    username: str | None
+    text_content: str | None
+    spam_probability: float
+    detection_timestamp: datetime
+    was_deleted: bool
+    was_manual: bool
+
+
+@dataclass(frozen=True, slots=True)
+class AllowedChatRecord:
+    """One row of `allowed_chats`; NULL policy values follow the defaults."""
+
+    chat_id: int
+    title: str | None
+    added_by_admin_id: int | None
+    added_at: datetime
+    spam_threshold: float | None = None
+    min_word_count: int | None = None
+    dry_run: bool = False
+    heuristics_enabled: bool = True
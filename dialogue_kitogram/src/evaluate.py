@@ -0,0 +1,274 @@
+"""Offline evaluation and threshold sweep on a labelled dataset.
+
+Scores a FastText-format dataset in batches, then computes
+precision/recall/F1 at every distinct threshold, ROC and PR curves, with and
+without the newline/word-count heuristics the bot applies.
+
+Usage:
+    python -m dialogue_kitogram.src.evaluate dialogue_kitogram/data/test.txt
+    python -m dialogue_kitogram.src.evaluate data.txt --curves curves.csv
+"""
+
+import argparse
+import time
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+
+from .config import get_min_word_count, get_spam_threshold
+from .core.base_model import ModelConfig, SpamModel
+from .fastspam.ft_model import FastTextSpamModel
+from .policy import HEURISTIC_PENALTY
+
+SPAM_LABEL = "__label__spam"
+
+
+@dataclass(slots=True)
+class Dataset:
+    """Texts with binary labels (1 = spam) and heuristic features."""
+
+    texts: list[str]
+    labels: np.ndarray
+    has_newline: np.ndarray
+    word_counts: np.ndarray
+
+
+@dataclass(slots=True)
+class Curves:
+    """Metrics at each distinct score, in decreasing score order.
+
+    Point `i` flags the messages scoring at least `thresholds[i]`.
+    """
+
+    thresholds: np.ndarray
+    precision: np.ndarray
+    recall: np.ndarray
+    f1: np.ndarray
+    fpr: np.ndarray
+    roc_auc: float
+    average_precision: float
+
+
+def load_dataset(paths: list[Path]) -> Dataset:
+    """Read FastText-format files; any label other than spam counts as ham."""
+    texts: list[str] = []
+    labels: list[int] = []
+    for path in paths:
+        with path.open("r", encoding="utf-8") as f:
+            for line in f:
+                label, _, text = line.strip().partition(" ")
+                if not label.startswith("__label__") or not text:
+                    continue
+                # Training files store newlines as tabs
+                texts.append(text.replace("\t", "\n"))
+                labels.append(1 if label == SPAM_LABEL else 0)
+    return Dataset(
+        texts=texts,
+        labels=np.asarray(labels, dtype=np.int8),
+        has_newline=np.fromiter(
+            ("\n" in text for text in texts),
+            dtype=bool,
+            count=len(texts),
+        ),
+        word_counts=np.fromiter(
+            (len(text.split()) for text in texts),
+            dtype=np.int32,
+            count=len(texts),
+        ),
+    )
+
+
+def score_texts(
+    model: SpamModel,
+    texts: list[str],
+    batch_size: int = 4096,
+) -> np.ndarray:
+    """Score texts in batches, preserving order."""
+    batches = (texts[i : i + batch_size] for i in range(0, len(texts), batch_size))
+    return np.fromiter(
+        (score for batch in batches for score in model.predict_proba_batch(batch)),
+        dtype=np.float64,
+        count=len(texts),
+    )
+
+
+def apply_heuristics(
+    scores: np.ndarray,
+    dataset: Dataset,
+    min_word_count: int,
+    *,
+    newline: bool = True,
+    word_count: bool = True,
+) -> np.ndarray:
+    """Apply the bot's probability penalties to all scores at once."""
+    adjusted = scores.copy()
+    if newline:
+        adjusted -= HEURISTIC_PENALTY * dataset.has_newline
+    if word_count:
+        adjusted -= HEURISTIC_PENALTY * (dataset.word_counts > min_word_count)
+    return adjusted
+
+
+def compute_curves(scores: np.ndarray, labels: np.ndarray) -> Curves:
+    """Compute metrics at every distinct score with one sort and cumsum."""
+    order = np.argsort(-scores, kind="stable")
+    sorted_scores = scores[order]
+    sorted_labels = labels[order]
+    # Last position of each run of equal scores
+    ends = np.flatnonzero(np.diff(sorted_scores, append=-np.inf))
+
+    tp = np.cumsum(sorted_labels, dtype=np.int64)[ends]
+    fp = (ends + 1) - tp
+    positives = max(int(labels.sum()), 1)
+    negatives = max(len(labels) - int(labels.sum()), 1)
+
+    precision = tp / (tp + fp)
+    recall = tp / positives
+    with np.errstate(invalid="ignore", divide="ignore"):
+        f1 = np.nan_to_num(2 * precision * recall / (precision + recall))
+    fpr = fp / negatives
+
+    roc_x = np.concatenate(([0.0], fpr))
+    roc_y = np.concatenate(([0.0], recall))
+    roc_auc = float(np.sum(np.diff(roc_x) * (roc_y[1:] + roc_y[:-1]) / 2))
+    average_precision = float(np.sum(np.diff(recall, prepend=0.0) * precision))
+    return Curves(
+        thresholds=sorted_scores[ends],
+        precision=precision,
+        recall=recall,
+        f1=f1,
+        fpr=fpr,
+        roc_auc=roc_auc,
+        average_precision=average_precision,
+    )
+
+
+def metrics_at(curves: Curves, threshold: float) -> dict:
+    """Return metrics for a fixed threshold.
+
+    A message counts as spam when its score is > the threshold, as in the bot,
+    so the operating point is the lowest curve point above the threshold.
+    """
+    # Scores decrease, so the last one > threshold is the operating point
+    index = int(np.searchsorted(-curves.thresholds, -threshold, side="left")) - 1
+    if index < 0:
+        return {
+            "threshold": threshold,
+            "precision": 1.0,
+            "recall": 0.0,
+            "f1": 0.0,
+            "fpr": 0.0,
+        }
+    return {
+        "threshold": threshold,
+        "precision": float(curves.precision[index]),
+        "recall": float(curves.recall[index]),
+        "f1": float(curves.f1[index]),
+        "fpr": float(curves.fpr[index]),
+    }
+
+
+def best_f1(curves: Curves) -> dict:
+    """Return metrics at the threshold with the highest F1."""
+    index = int(np.argmax(curves.f1))
+    # The bot flags scores > threshold, so report the next lower score
+    if index + 1 < len(curves.thresholds):
+        threshold = curves.thresholds[index + 1]
+    else:
+        threshold = np.nextafter(curves.thresholds[index], -np.inf)
+    return metrics_at(curves, float(threshold))
+
+
+def write_curves(path: Path, named_curves: dict[str, Curves]) -> None:
+    """Write all curves to one CSV with a `variant` column."""
+    with path.open("w", encoding="utf-8") as f:
+        f.write("variant,threshold,precision,recall,f1,fpr\n")
+        for name, curves in named_curves.items():
+            table = np.column_stack(
+                (
+                    curves.thresholds,
+                    curves.precision,
+                    curves.recall,
+                    curves.f1,
+                    curves.fpr,
+                ),
+            )
+            np.savetxt(f, table, fmt=f"{name},%.6f,%.6f,%.6f,%.6f,%.6f")
+
+
+def _format(name: str, metrics: dict) -> str:
+    return (
+        f"  {name:<28} threshold={metrics['threshold']:.3f} "
+        f"P={metrics['precision']:.3f} R={metrics['recall']:.3f} "
+        f"F1={metrics['f1']:.3f} FPR={metrics['fpr']:.4f}"
+    )
+
+
+def main() -> None:
+    """Command-line entry point."""
+    parser = argparse.ArgumentParser(description="Evaluate the spam model.")
+    parser.add_argument("datasets", type=Path, nargs="+", help="FastText files")
+    parser.add_argument("--model", help="Model file name in the data dir")
+    parser.add_argument("--threshold", type=float, default=get_spam_threshold())
+    parser.add_argument("--min-words", type=int, default=get_min_word_count())
+    parser.add_argument("--batch-size", type=int, default=4096)
+    parser.add_argument("--curves", type=Path, help="Write threshold curves CSV")
+    args = parser.parse_args()
+
+    dataset = load_dataset(args.datasets)
+    if not len(dataset.texts):
+        parser.error("No labelled lines found")
+    cfg = ModelConfig(model_name=args.model) if args.model else ModelConfig()
+    model = FastTextSpamModel(cfg)
+    model.load()
+
+    started = time.perf_counter()
+    scores = score_texts(model, dataset.texts, args.batch_size)
+    scored_in = time.perf_counter() - started
+
+    started = time.perf_counter()
+    variants = {
+        "raw": scores,
+        "newline penalty": apply_heuristics(
+            scores,
+            dataset,
+            args.min_words,
+            word_count=False,
+        ),
+        "word count penalty": apply_heuristics(
+            scores,
+            dataset,
+            args.min_words,
+            newline=False,
+        ),
+        "both penalties (bot)": apply_heuristics(scores, dataset, args.min_words),
+    }
+    named_curves = {
+        name: compute_curves(values, dataset.labels)
+        for name, values in variants.items()
+    }
+    computed_in = time.perf_counter() - started
+
+    spam = int(dataset.labels.sum())
+    print(
+        f"Messages: {len(dataset.texts)} ({spam} spam, "
+        f"{len(dataset.texts) - spam} ham)\n"
+        f"Scored in {scored_in:.2f}s "
+        f"({len(dataset.texts) / scored_in:.0f} msg/s), "
+        f"metrics in {computed_in:.3f}s",
+    )
+    for name, curves in named_curves.items():
+        print(
+            f"\n{name}: ROC AUC={curves.roc_auc:.4f} AP={curves.average_precision:.4f}",
+        )
+        print(_format("at SPAM_THRESHOLD", metrics_at(curves, args.threshold)))
+        print(_format("best F1", best_f1(curves)))
+
+    if args.curves:
+        write_curves(args.curves, named_curves)
+        print(f"\nCurves written to {args.curves}")
+
+
+if __name__ == "__main__":
+    main()
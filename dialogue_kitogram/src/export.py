@@ -0,0 +1,244 @@
+"""Streaming export of detection history to CSV, JSONL, Parquet or FastText.
+
+Usage:
+    python -m dialogue_kitogram.src.export --format csv --output detections.csv
+    python -m dialogue_kitogram.src.export --format fasttext --manual \\
+        --output dialogue_kitogram/data/detections.txt
+"""
+
+import argparse
+import asyncio
+import csv
+import io
+import json
+from collections.abc import AsyncIterator, Callable, Iterable
+from datetime import UTC, datetime
+from pathlib import Path
+
+from .bot_database import BotMessageDatabase
+from .core.base_storage import BotStorage
+from .core.records import DetectionRecord
+from .fastspam.ft_model import normalize_text
+
+EXPORT_FORMATS = ("csv", "jsonl", "parquet", "fasttext")
+EXPORT_COLUMNS = (
+    "id",
+    "message_id",
+    "chat_id",
+    "user_id",
+    "username",
+    "text_content",
+    "spam_probability",
+    "detection_timestamp",
+    "was_deleted",
+    "was_manual",
+)
+
+
+def _values(row: DetectionRecord) -> list:
+    """Return export column values, with flags as 0/1 like the database."""
+    values = (getattr(row, column) for column in EXPORT_COLUMNS)
+    return [int(value) if isinstance(value, bool) else value for value in values]
+
+
+async def _batches(
+    rows: AsyncIterator[DetectionRecord],
+    size: int,
+) -> AsyncIterator[list[DetectionRecord]]:
+    batch: list[DetectionRecord] = []
+    async for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _csv_text(rows: Iterable[Iterable]) -> str:
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(rows)
+    return buffer.getvalue()
+
+
+def _csv_chunk(batch: list[DetectionRecord]) -> tuple[str, int]:
+    return _csv_text(_values(row) for row in batch), len(batch)
+
+
+def _jsonl_chunk(batch: list[DetectionRecord]) -> tuple[str, int]:
+    lines = [
+        json.dumps(
+            dict(zip(EXPORT_COLUMNS, _values(row), strict=True)),
+            ensure_ascii=False,
+            default=str,
+        )
+        + "\n"
+        for row in batch
+    ]
+    return "".join(lines), len(lines)
+
+
+def _fasttext_chunk(batch: list[DetectionRecord]) -> tuple[str, int]:
+    lines = []
+    for row in batch:
+        # Only deleted messages and manual reports are spam examples; dry-run
+        # detections are unconfirmed guesses of the model
+        if not (row.was_deleted or row.was_manual):
+            continue
+        text = normalize_text(row.text_content or "")
+        if text:
+            lines.append(f"__label__spam {text}\n")
+    return "".join(lines), len(lines)
+
+
+async def _write_text(
+    rows: AsyncIterator[DetectionRecord],
+    output: Path,
+    chunk_size: int,
+    format_chunk: Callable[[list[DetectionRecord]], tuple[str, int]],
+    header: str = "",
+) -> int:
+    """Write formatted chunks. File I/O runs in a thread, off the event loop."""
+    count = 0
+    f = await asyncio.to_thread(output.open, "w", encoding="utf-8", newline="")
+    try:
+        if header:
+            await asyncio.to_thread(f.write, header)
+        async for batch in _batches(rows, chunk_size):
+            text, written = format_chunk(batch)
+            await asyncio.to_thread(f.write, text)
+            count += written
+    finally:
+        await asyncio.to_thread(f.close)
+    return count
+
+
+async def _write_parquet(
+    rows: AsyncIterator[DetectionRecord],
+    output: Path,
+    chunk_size: int,
+) -> int:
+    try:
+        import pyarrow as pa  # noqa: PLC0415
+        import pyarrow.parquet as pq  # noqa: PLC0415
+    except ImportError as e:
+        msg = "Parquet export requires pyarrow: pip install pyarrow"
+        raise RuntimeError(msg) from e
+
+    schema = pa.schema(
+        [
+            ("id", pa.int64()),
+            ("message_id", pa.int64()),
+            ("chat_id", pa.int64()),
+            ("user_id", pa.int64()),
+            ("username", pa.string()),
+            ("text_content", pa.string()),
+            ("spam_probability", pa.float64()),
+            ("detection_timestamp", pa.string()),
+            ("was_deleted", pa.bool_()),
+            ("was_manual", pa.bool_()),
+        ],
+    )
+    count = 0
+    writer = await asyncio.to_thread(pq.ParquetWriter, str(output), schema)
+    try:
+        async for batch in _batches(rows, chunk_size):
+            columns = {
+                column: [getattr(row, column) for row in batch]
+                for column in EXPORT_COLUMNS
+            }
+            columns["detection_timestamp"] = [
+                None if value is None else str(value)
+                for value in columns["detection_timestamp"]
+            ]
+            record_batch = pa.record_batch(columns, schema=schema)
+            await asyncio.to_thread(writer.write_batch, record_batch)
+            count += len(batch)
+    finally:
+        await asyncio.to_thread(writer.close)
+    return count
+
+
+async def export_detections(  # noqa: PLR0913
+    db: BotStorage,
+    output: Path,
+    fmt: str,
+    *,
+    chat_id: int | None = None,
+    since: datetime | None = None,
+    until: datetime | None = None,
+    manual: bool | None = None,
+    chunk_size: int = 1000,
+) -> int:
+    """Stream matching detections into `output`. Returns the number of rows.
+
+    The FastText format labels every row spam, so it only includes detections
+    that were deleted or reported manually.
+    """
+    if fmt not in EXPORT_FORMATS:
+        msg = f"Unknown export format {fmt!r}, expected one of {EXPORT_FORMATS}"
+        raise ValueError(msg)
+    rows = db.iter_detections(
+        chat_id=chat_id,
+        since=since,
+        until=until,
+        manual=manual,
+        chunk_size=chunk_size,
+    )
+    if fmt == "csv":
+        header = _csv_text([EXPORT_COLUMNS])
+        return await _write_text(rows, output, chunk_size, _csv_chunk, header)
+    if fmt == "jsonl":
+        return await _write_text(rows, output, chunk_size, _jsonl_chunk)
+    if fmt == "fasttext":
+        return await _write_text(rows, output, chunk_size, _fasttext_chunk)
+    return await _write_parquet(rows, output, chunk_size)
+
+
+def _parse_datetime(value: str) -> datetime:
+    parsed = datetime.fromisoformat(value)
+    # Stored timestamps are UTC; treat naive input as UTC as well
+    if parsed.tzinfo is None:
+        return parsed.replace(tzinfo=UTC)
+    return parsed.astimezone(UTC)
+
+
+def main() -> None:
+    """Command-line entry point."""
+    parser = argparse.ArgumentParser(description="Export detection history.")
+    parser.add_argument("--format", choices=EXPORT_FORMATS, default="csv")
+    parser.add_argument("--output", type=Path, required=True)
+    parser.add_argument("--db", help="Database path (default: DB_PATH)")
+    parser.add_argument(
+        "--bot-id",
+        type=int,
+        default=0,
+        help="Bot whose detections to export (default: 0, the primary bot)",
+    )
+    parser.add_argument("--chat-id", type=int)
+    parser.add_argument("--since", type=_parse_datetime, help="ISO date/time")
+    parser.add_argument("--until", type=_parse_datetime, help="ISO date/time")
+    kind = parser.add_mutually_exclusive_group()
+    kind.add_argument("--manual", action="store_true", help="Only manual deletions")
+    kind.add_argument("--auto", action="store_true", help="Only automatic ones")
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    manual = True if args.manual else (False if args.auto else None)
+    count = asyncio.run(
+        export_detections(
+            BotMessageDatabase(args.db, bot_id=args.bot_id),
+            args.output,
+            args.format,
+            chat_id=args.chat_id,
+            since=args.since,
+            until=args.until,
+            manual=manual,
+            chunk_size=args.chunk_size,
+        ),
+    )
+    print(f"Exported {count} detections to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -7,6 +7,11 @@
 from ..core.base_model import ModelConfig, SpamModel
 
 
+def normalize_text(text: str) -> str:
+    """Normalize text the way the model sees it: lowercase, single line."""
+    return text.lower().replace("\n", "\t").strip()
+
+
 class FastTextSpamModel(SpamModel):
     def __init__(
         self,
@@ -93,13 +98,33 @@ def predict_proba(self, text: str) -> float:
         if model is None:
             msg = "Model is not loaded"
             raise RuntimeError(msg)
-        labels, probs = model.predict(text.lower().replace("\n", "\t").strip(), k=2)
+        labels, probs = model.predict(normalize_text(text), k=2)
         # return (labels, probs)
         return max(
             (p for l, p in zip(labels, probs, strict=False) if l == "__label__spam"),
             default=0.0,
         )
 
+    def predict_proba_batch(self, texts: list[str]) -> list[float]:
+        if self._m is None:
+            self.load()
+        model = self._m
+        if model is None:
+            msg = "Model is not loaded"
+            raise RuntimeError(msg)
+        labels, probs = model.predict([normalize_text(text) for text in texts], k=2)
+        return [
+            max(
+                (
+                    p
+                    for label, p in zip(row_labels, row_probs, strict=False)
+                    if label == "__label__spam"
+                ),
+                default=0.0,
+            )
+            for row_labels, row_probs in zip(labels, probs, strict=True)
+        ]
+
 
 if __name__ == "__main__":
     cfg = ModelConfig()
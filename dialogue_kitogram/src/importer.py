@@ -0,0 +1,305 @@
+"""Chunked, parallel conversion of labelled datasets to FastText format.
+
+Reads parquet, CSV, TSV, JSONL or JSON arrays in record batches, converts each batch to
+single-line `__label__spam` / `__label__ham` lines in worker processes and
+writes the result into the model data directory.
+
+Usage:
+    python -m dialogue_kitogram.src.importer \\
+        hf://datasets/alt-gnome/telegram-spam/data/train-00000-of-00001.parquet \\
+        --output labeled_dataset_from_hf.txt
+    python -m dialogue_kitogram.src.importer messages.csv --label-column is_spam
+"""
+
+import argparse
+import csv
+import io
+import json
+import os
+import time
+from collections import deque
+from collections.abc import Iterator
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import dataclass, field
+from functools import partial
+from itertools import islice
+from pathlib import Path
+from typing import IO
+
+from .core.base_model import ModelConfig
+from .fastspam.ft_model import normalize_text
+
+IMPORT_FORMATS = ("parquet", "csv", "tsv", "jsonl", "json")
+SPAM_VALUES = frozenset({"1", "true", "spam", "__label__spam"})
+HAM_VALUES = frozenset({"0", "false", "ham", "not_spam", "__label__ham"})
+
+Batch = tuple[list, list]
+
+
+@dataclass(slots=True)
+class ImportStats:
+    """Counters of one import run."""
+
+    rows: int = 0
+    spam: int = 0
+    ham: int = 0
+    invalid_label: int = 0
+    empty: int = 0
+    bytes_written: int = 0
+    seconds: float = 0.0
+    invalid_examples: list[str] = field(default_factory=list)
+
+    @property
+    def written(self) -> int:
+        return self.spam + self.ham
+
+
+def _label_name(label: object) -> str | None:
+    """Map a raw label to "spam" or "ham", or None if it is not a label."""
+    value = str(label).strip().lower()
+    if value in SPAM_VALUES:
+        return "spam"
+    if value in HAM_VALUES:
+        return "ham"
+    # Numeric labels, e.g. 1.0 and 0.0 from float columns
+    try:
+        number = float(value)
+    except ValueError:
+        return None
+    return {1.0: "spam", 0.0: "ham"}.get(number)
+
+
+def convert_batch(batch: Batch) -> tuple[list[str], dict]:
+    """Convert raw (texts, labels) into FastText lines. Runs in a worker."""
+    texts, labels = batch
+    lines: list[str] = []
+    counts = {"spam": 0, "ham": 0, "invalid_label": 0, "empty": 0}
+    invalid: list[str] = []
+    for text, label in zip(texts, labels, strict=True):
+        name = _label_name(label)
+        if name is None:
+            counts["invalid_label"] += 1
+            if len(invalid) < 5:  # noqa: PLR2004
+                invalid.append(repr(label))
+            continue
+        # FastText reads one example per line, so no newline may survive
+        normalized = normalize_text(
+            str(text or "").replace("\r\n", "\n").replace("\r", "\n"),
+        )
+        if not normalized:
+            counts["empty"] += 1
+            continue
+        lines.append(f"__label__{name} {normalized}\n")
+        counts[name] += 1
+    counts["invalid_examples"] = invalid
+    return lines, counts
+
+
+def _open_source(source: str) -> IO[bytes]:
+    if "://" not in source:
+        return Path(source).open("rb")
+    try:
+        import fsspec  # noqa: PLC0415
+    except ImportError as e:
+        msg = "Reading remote datasets requires fsspec: pip install fsspec"
+        raise RuntimeError(msg) from e
+    return fsspec.open(source, "rb").open()
+
+
+def _parquet_batches(
+    f: IO[bytes],
+    text_column: str,
+    label_column: str,
+    batch_size: int,
+) -> Iterator[Batch]:
+    try:
+        import pyarrow.parquet as pq  # noqa: PLC0415
+    except ImportError as e:
+        msg = "Parquet import requires pyarrow: pip install pyarrow"
+        raise RuntimeError(msg) from e
+    parquet = pq.ParquetFile(f)
+    for record_batch in parquet.iter_batches(
+        batch_size=batch_size,
+        columns=[text_column, label_column],
+    ):
+        columns = record_batch.to_pydict()
+        yield columns[text_column], columns[label_column]
+
+
+def _csv_batches(
+    f: IO[bytes],
+    text_column: str,
+    label_column: str,
+    batch_size: int,
+    delimiter: str = ",",
+) -> Iterator[Batch]:
+    text_file = io.TextIOWrapper(f, encoding="utf-8", newline="")
+    try:
+        reader = csv.DictReader(text_file, delimiter=delimiter)
+        while rows := list(islice(reader, batch_size)):
+            yield (
+                [row[text_column] for row in rows],
+                [row[label_column] for row in rows],
+            )
+    finally:
+        # Leave closing the underlying file to the caller
+        text_file.detach()
+
+
+def _jsonl_batches(
+    f: IO[bytes],
+    text_column: str,
+    label_column: str,
+    batch_size: int,
+) -> Iterator[Batch]:
+    lines = (line for line in f if line.strip())
+    while chunk := list(islice(lines, batch_size)):
+        records = [json.loads(line) for line in chunk]
+        yield (
+            [record.get(text_column) for record in records],
+            [record.get(label_column) for record in records],
+        )
+
+
+def _json_batches(
+    f: IO[bytes],
+    text_column: str,
+    label_column: str,
+    batch_size: int,
+) -> Iterator[Batch]:
+    # A JSON array cannot be streamed with the standard library, so it is
+    # read whole; use JSONL for datasets that do not fit in memory
+    records = json.load(f)
+    if not isinstance(records, list):
+        msg = "A JSON dataset must be an array of records, use JSONL otherwise"
+        raise TypeError(msg)
+    for start in range(0, len(records), batch_size):
+        chunk = records[start : start + batch_size]
+        yield (
+            [record.get(text_column) for record in chunk],
+            [record.get(label_column) for record in chunk],
+        )
+
+
+def detect_format(source: str) -> str:
+    """Guess the input format from the file suffix."""
+    suffix = Path(source.split("?", 1)[0]).suffix.lower()
+    if suffix == ".parquet":
+        return "parquet"
+    if suffix in {".csv", ".tsv", ".json"}:
+        return suffix[1:]
+    if suffix in {".jsonl", ".ndjson"}:
+        return "jsonl"
+    msg = f"Cannot detect the format of {source}, pass one of {IMPORT_FORMATS}"
+    raise ValueError(msg)
+
+
+def import_dataset(  # noqa: PLR0913
+    source: str,
+    output: str,
+    *,
+    fmt: str | None = None,
+    text_column: str = "text",
+    label_column: str = "label",
+    batch_size: int = 10_000,
+    workers: int | None = None,
+) -> ImportStats:
+    """Convert `source` into FastText format at `output`.
+
+    Relative output paths are resolved against the model data directory. The
+    file is written under a temporary name and renamed when complete. At most
+    two batches per worker are in flight, so memory stays bounded.
+    """
+    fmt = fmt or detect_format(source)
+    if fmt not in IMPORT_FORMATS:
+        msg = f"Unknown import format {fmt!r}, expected one of {IMPORT_FORMATS}"
+        raise ValueError(msg)
+    readers = {
+        "parquet": _parquet_batches,
+        "csv": _csv_batches,
+        "tsv": partial(_csv_batches, delimiter="\t"),
+        "jsonl": _jsonl_batches,
+        "json": _json_batches,
+    }
+    output_path = Path(output)
+    if not output_path.is_absolute():
+        output_path = ModelConfig().data_dir / output_path
+    tmp_path = output_path.with_name(output_path.name + ".part")
+
+    stats = ImportStats()
+    workers = workers or os.cpu_count() or 1
+    started = time.perf_counter()
+
+    def collect(future: Future, out: IO[str]) -> None:
+        lines, counts = future.result()
+        out.writelines(lines)
+        stats.bytes_written += sum(len(line.encode("utf-8")) for line in lines)
+        stats.spam += counts["spam"]
+        stats.ham += counts["ham"]
+        stats.invalid_label += counts["invalid_label"]
+        stats.empty += counts["empty"]
+        stats.invalid_examples.extend(
+            counts["invalid_examples"][: 5 - len(stats.invalid_examples)],
+        )
+
+    with (
+        _open_source(source) as f,
+        ProcessPoolExecutor(max_workers=workers) as pool,
+        tmp_path.open("w", encoding="utf-8") as out,
+    ):
+        pending: deque[Future] = deque()
+        for batch in readers[fmt](f, text_column, label_column, batch_size):
+            stats.rows += len(batch[0])
+            pending.append(pool.submit(convert_batch, batch))
+            if len(pending) >= 2 * workers:
+                collect(pending.popleft(), out)
+        while pending:
+            collect(pending.popleft(), out)
+
+    tmp_path.replace(output_path)
+    stats.seconds = time.perf_counter() - started
+    return stats
+
+
+def main() -> None:
+    """Command-line entry point."""
+    parser = argparse.ArgumentParser(description="Import a labelled dataset.")
+    parser.add_argument("source", help="Local path or fsspec URL (e.g. hf://...)")
+    parser.add_argument(
+        "--output",
+        default="labeled_dataset_from_hf.txt",
+        help="Output file; relative paths go into the model data dir",
+    )
+    parser.add_argument("--format", choices=IMPORT_FORMATS)
+    parser.add_argument("--text-column", default="text")
+    parser.add_argument("--label-column", default="label")
+    parser.add_argument("--batch-size", type=int, default=10_000)
+    parser.add_argument("--workers", type=int, help="Worker processes")
+    args = parser.parse_args()
+
+    stats = import_dataset(
+        args.source,
+        args.output,
+        fmt=args.format,
+        text_column=args.text_column,
+        label_column=args.label_column,
+        batch_size=args.batch_size,
+        workers=args.workers,
+    )
+    print(
+        f"Read {stats.rows} rows, wrote {stats.written} "
+        f"({stats.spam} spam, {stats.ham} ham) in {stats.seconds:.2f}s: "
+        f"{stats.rows / stats.seconds:.0f} rows/s, "
+        f"{stats.bytes_written / stats.seconds / 2**20:.1f} MiB/s",
+    )
+    if stats.empty:
+        print(f"Skipped {stats.empty} empty texts")
+    if stats.invalid_label:
+        print(
+            f"Skipped {stats.invalid_label} rows with invalid labels, e.g. "
+            + ", ".join(stats.invalid_examples),
+        )
+
+
+if __name__ == "__main__":
+    main()
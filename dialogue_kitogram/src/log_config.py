@@ -1,12 +1,16 @@
 """Logging configuration using loguru."""
 
 import os
+import random
 import sys
+from dataclasses import dataclass
 from pathlib import Path
 
 from dotenv import load_dotenv
 from loguru import logger
 
+from .config import get_env_bool
+
 # Load environment variables first
 env_file = Path(".env")
 if env_file.exists():
@@ -20,23 +24,67 @@
 )
 
 
+@dataclass(slots=True)
+class LogSampling:
+    """Fraction of non-spam ("ham") message logs to keep.
+
+    Detections are always logged. Set by `setup_logging`.
+    """
+
+    ham_rate: float = 1.0
+
+
+_sampling = LogSampling()
+
+
+def should_log_ham() -> bool:
+    """Return True if a per-message log for a non-spam message should be emitted.
+
+    Check this before calling the logger so skipped messages are never formatted.
+    """
+    rate = _sampling.ham_rate
+    return rate >= 1.0 or random.random() < rate  # noqa: S311
+
+
 def setup_logging() -> None:
-    """Configure loguru logging with the provided cool config."""
+    """Configure loguru logging with the provided cool config.
+
+    Optional environment settings:
+    - LOG_ENQUEUE: write through a background queue so sinks never block the
+      event loop
+    - LOG_JSON: write the file sink as JSON lines
+    - LOG_ROTATION / LOG_RETENTION / LOG_COMPRESSION: file rotation policy,
+      e.g. "50 MB" or "00:00", "14 days", "gz"
+    - LOG_STDOUT_LEVEL: stdout level (default DEBUG)
+    - LOG_HAM_SAMPLE_RATE: fraction of non-spam message logs to keep
+    """
     log_file_path = os.getenv("LOG_FILE_PATH", "logs/bot.log")
     log_level = os.getenv("LOG_LEVEL", "INFO")
+    stdout_level = os.getenv("LOG_STDOUT_LEVEL", "DEBUG")
+    enqueue = get_env_bool("LOG_ENQUEUE", default=False)
+    serialize = get_env_bool("LOG_JSON", default=False)
+    try:
+        _sampling.ham_rate = min(1.0, float(os.getenv("LOG_HAM_SAMPLE_RATE", "1.0")))
+    except (ValueError, TypeError):
+        _sampling.ham_rate = 1.0
 
     # Create logs directory if it doesn't exist
     Path(log_file_path).parent.mkdir(exist_ok=True)
 
     # Configure Loguru
     logger.remove()
-    logger.add(sys.stdout, format=log_format, level="DEBUG")
+    logger.add(sys.stdout, format=log_format, level=stdout_level, enqueue=enqueue)
     logger.add(
         log_file_path,
         format=log_format,
         level=log_level,
         encoding="utf-8",
         mode="a",
+        enqueue=enqueue,
+        serialize=serialize,
+        rotation=os.getenv("LOG_ROTATION") or None,
+        retention=os.getenv("LOG_RETENTION") or None,
+        compression=os.getenv("LOG_COMPRESSION") or None,
     )
 
 
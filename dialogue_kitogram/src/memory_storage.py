@@ -0,0 +1,258 @@
+"""In-memory storage backend for load tests and ephemeral deployments."""
+
+from collections import Counter, OrderedDict, deque
+from collections.abc import AsyncIterator
+from dataclasses import dataclass, replace
+from datetime import UTC, datetime
+
+from .core.base_storage import CHAT_POLICY_COLUMNS, BotStorage
+from .core.records import AllowedChatRecord, DetectionRecord
+
+
+@dataclass(slots=True)
+class _DetectionTotals:
+    """Cumulative counters of automatic detections."""
+
+    detections: int = 0
+    deleted: int = 0
+    probability_sum: float = 0.0
+    max_probability: float = 0.0
+
+    def add(self, spam_probability: float, *, was_deleted: bool) -> None:
+        self.detections += 1
+        self.deleted += 1 if was_deleted else 0
+        self.probability_sum += spam_probability
+        self.max_probability = max(self.max_probability, spam_probability)
+
+    def as_stats(self) -> dict:
+        return {
+            "total_detections": self.detections,
+            "deleted_messages": self.deleted,
+            "avg_spam_probability": (
+                self.probability_sum / self.detections if self.detections else 0.0
+            ),
+            "max_spam_probability": self.max_probability,
+        }
+
+
+class MemoryBotStorage(BotStorage):
+    """Bounded in-memory storage.
+
+    Detections live in a preallocated ring buffer of `capacity` rows; once
+    full, the oldest rows are overwritten. Stats are cumulative counters, so
+    they keep counting evicted detections like the SQLite backend would.
+    Per-chat counters are kept for the `capacity` chats with the most recent
+    detections; older chats' counters are dropped. Records are immutable, so
+    they are returned without copying. Nothing survives a restart.
+    """
+
+    def __init__(self, capacity: int = 100_000, shadow_capacity: int = 1000) -> None:
+        self.capacity = capacity
+        self._rows: list[DetectionRecord | None] = [None] * capacity
+        # Retained detections per distinct text
+        self._text_counts: Counter[str] = Counter()
+        self._next_id = 1
+        self._allowed_chats: dict[int, AllowedChatRecord] = {}
+        self._shadow_disagreements: deque[dict] = deque(maxlen=shadow_capacity)
+        self._totals = _DetectionTotals()
+        # Per-chat counters, least recently detected chat first
+        self._chat_totals: OrderedDict[int, _DetectionTotals] = OrderedDict()
+
+    async def init_database(self) -> None:
+        """Nothing to initialize; present for interface compatibility."""
+
+    async def record_bot_message(  # noqa: PLR0913
+        self,
+        *,
+        message_id: int,
+        chat_id: int,
+        user_id: int | None,
+        username: str | None,
+        text_content: str,
+        spam_probability: float,
+        was_deleted: bool = True,
+        was_manual: bool = False,
+    ) -> None:
+        """Record a detected bot message, evicting the oldest if full."""
+        row_id = self._next_id
+        self._next_id += 1
+        slot = (row_id - 1) % self.capacity
+        evicted = self._rows[slot]
+        if evicted is not None:
+            self._text_counts[evicted.text_content] -= 1
+            if not self._text_counts[evicted.text_content]:
+                del self._text_counts[evicted.text_content]
+        self._text_counts[text_content] += 1
+        self._rows[slot] = DetectionRecord(
+            id=row_id,
+            message_id=message_id,
+            chat_id=chat_id,
+            user_id=user_id,
+            username=username,
+            text_content=text_content,
+            spam_probability=spam_probability,
+            detection_timestamp=datetime.now(tz=UTC),
+            was_deleted=was_deleted,
+            was_manual=was_manual,
+        )
+        if not was_manual:
+            self._totals.add(spam_probability, was_deleted=was_deleted)
+            chat_totals = self._chat_totals.get(chat_id)
+            if chat_totals is None:
+                chat_totals = self._chat_totals[chat_id] = _DetectionTotals()
+                if len(self._chat_totals) > self.capacity:
+                    self._chat_totals.popitem(last=False)
+            else:
+                self._chat_totals.move_to_end(chat_id)
+            chat_totals.add(spam_probability, was_deleted=was_deleted)
+
+    def _retained_ids(self) -> range:
+        last_id = self._next_id - 1
+        first_id = max(1, last_id - self.capacity + 1)
+        return range(first_id, last_id + 1)
+
+    def _row(self, row_id: int) -> DetectionRecord:
+        row = self._rows[(row_id - 1) % self.capacity]
+        if row is None:
+            msg = f"Row {row_id} is not retained"
+            raise KeyError(msg)
+        return row
+
+    async def get_recent_detections(
+        self,
+        limit: int = 10,
+        chat_id: int | None = None,
+    ) -> list[DetectionRecord]:
+        """Get recent bot message detections, optionally of one chat only."""
+        if limit <= 0:
+            return []
+        if chat_id is None:
+            newest_ids = self._retained_ids()[-limit:]
+            return [self._row(row_id) for row_id in reversed(newest_ids)]
+        recent = []
+        # Scan from the newest row until enough rows of the chat are found
+        for row_id in reversed(self._retained_ids()):
+            row = self._row(row_id)
+            if row.chat_id == chat_id:
+                recent.append(row)
+                if len(recent) == limit:
+                    break
+        return recent
+
+    async def iter_detections(
+        self,
+        *,
+        chat_id: int | None = None,
+        since: datetime | None = None,
+        until: datetime | None = None,
+        manual: bool | None = None,
+        chunk_size: int = 1000,  # noqa: ARG002
+    ) -> AsyncIterator[DetectionRecord]:
+        """Iterate retained detections in id order."""
+        for row_id in self._retained_ids():
+            row = self._row(row_id)
+            if chat_id is not None and row.chat_id != chat_id:
+                continue
+            if since is not None and row.detection_timestamp < since:
+                continue
+            if until is not None and row.detection_timestamp >= until:
+                continue
+            if manual is not None and row.was_manual != manual:
+                continue
+            yield row
+
+    async def get_stats(self, chat_id: int | None = None) -> dict:
+        """Get statistics about detected bot messages, optionally of one chat."""
+        if chat_id is None:
+            return self._totals.as_stats()
+        return self._chat_totals.get(chat_id, _DetectionTotals()).as_stats()
+
+    async def get_text_occurrences(self, text: str) -> int:
+        """Get how many retained detections share exactly this text."""
+        return self._text_counts[text]
+
+    async def record_shadow_disagreement(  # noqa: PLR0913
+        self,
+        *,
+        chat_id: int,
+        message_id: int,
+        primary_probability: float,
+        shadow_probability: float,
+        threshold: float,
+        text_preview: str,
+    ) -> None:
+        """Record a message where the shadow model disagreed with the primary."""
+        self._shadow_disagreements.append(
+            {
+                "chat_id": chat_id,
+                "message_id": message_id,
+                "primary_probability": primary_probability,
+                "shadow_probability": shadow_probability,
+                "threshold": threshold,
+                "text_preview": text_preview,
+                "detected_at": datetime.now(tz=UTC),
+            },
+        )
+
+    async def add_allowed_chat(
+        self,
+        *,
+        chat_id: int,
+        title: str | None,
+        added_by_admin_id: int,
+    ) -> None:
+        """Add or update an allowed chat entry, keeping its policy."""
+        now = datetime.now(tz=UTC)
+        row = self._allowed_chats.get(chat_id)
+        if row is None:
+            row = AllowedChatRecord(
+                chat_id=chat_id,
+                title=title,
+                added_by_admin_id=added_by_admin_id,
+                added_at=now,
+            )
+        else:
+            row = replace(
+                row,
+                title=title,
+                added_by_admin_id=added_by_admin_id,
+                added_at=now,
+            )
+        self._allowed_chats[chat_id] = row
+
+    async def remove_allowed_chat(self, chat_id: int) -> bool:
+        """Remove an allowed chat. Returns True if it was present."""
+        return self._allowed_chats.pop(chat_id, None) is not None
+
+    async def is_chat_allowed(self, chat_id: int) -> bool:
+        """Check if a chat is in the allowed list."""
+        return chat_id in self._allowed_chats
+
+    async def get_allowed_chat(self, chat_id: int) -> AllowedChatRecord | None:
+        """Get an allowed chat entry with its policy, or None if not allowed."""
+        return self._allowed_chats.get(chat_id)
+
+    async def update_chat_policy(
+        self,
+        chat_id: int,
+        column: str,
+        *,
+        value: float | bool | None,
+    ) -> bool:
+        """Update one policy column of an allowed chat."""
+        if column not in CHAT_POLICY_COLUMNS:
+            msg = f"Unknown chat policy column: {column}"
+            raise ValueError(msg)
+        row = self._allowed_chats.get(chat_id)
+        if row is None:
+            return False
+        self._allowed_chats[chat_id] = replace(row, **{column: value})
+        return True
+
+    async def list_allowed_chats(self) -> list[AllowedChatRecord]:
+        """List all allowed chats with their policies."""
+        return sorted(
+            self._allowed_chats.values(),
+            key=lambda row: row.added_at,
+            reverse=True,
+        )
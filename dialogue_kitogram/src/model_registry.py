@@ -0,0 +1,307 @@
+"""Routing of messages to per-language spam models."""
+
+import threading
+import time
+from collections import Counter, OrderedDict
+from collections.abc import Callable
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, replace
+from pathlib import Path
+
+from loguru import logger
+
+from .config import (
+    get_model_memory_budget_mb,
+    get_model_retry_seconds,
+    get_model_routes,
+)
+from .core.base_model import ModelConfig, SpamModel
+from .fastspam.ft_model import FastTextSpamModel
+
+DEFAULT_ROUTE = "default"
+# Letters used in Ukrainian but not in Russian, and the other way round
+UKRAINIAN_LETTERS = frozenset("іїєґІЇЄҐ")
+RUSSIAN_LETTERS = frozenset("ыэъёЫЭЪЁ")
+# Characters inspected per message, enough to tell the script
+DETECTION_SAMPLE = 200
+
+
+def detect_language(text: str) -> str:
+    """Guess "ru", "uk" or "en" from the script of a text, or "" if unsure.
+
+    Cyrillic and Latin letters are counted in the first `DETECTION_SAMPLE`
+    characters, so Latin look-alikes mixed into Cyrillic spam do not flip the
+    result. Letters specific to Ukrainian or Russian decide between the two.
+    """
+    cyrillic = latin = ukrainian = russian = 0
+    for char in text[:DETECTION_SAMPLE]:
+        if "\u0400" <= char <= "\u04ff":
+            cyrillic += 1
+            if char in UKRAINIAN_LETTERS:
+                ukrainian += 1
+            elif char in RUSSIAN_LETTERS:
+                russian += 1
+        elif char.isascii() and char.isalpha():
+            latin += 1
+    if cyrillic > latin:
+        return "uk" if ukrainian > russian else "ru"
+    if latin:
+        return "en"
+    return ""
+
+
+@dataclass(slots=True)
+class ModelStats:
+    """Load and prediction counters of one routed model."""
+
+    loads: int = 0
+    load_failures: int = 0
+    evictions: int = 0
+    load_seconds: float = 0.0
+    predictions: int = 0
+    latency_total: float = 0.0
+    latency_max: float = 0.0
+
+
+class ModelRegistry(SpamModel):
+    """Spam model that routes each message to a per-language model.
+
+    `routes` maps a language from `detect_language` to a model file in the
+    data directory. Routed models are loaded in a background thread on first
+    use and kept in LRU order; once a loaded model would exceed
+    `memory_budget` bytes (estimated from model file sizes, 0 = unlimited),
+    the least recently used routed models are evicted. The default model is
+    always loaded and scores every message without a route, whose model is
+    still loading or failed to load. A failed model is loaded again once
+    `retry_interval` seconds have passed.
+    """
+
+    def __init__(
+        self,
+        cfg: ModelConfig,
+        routes: dict[str, str] | None = None,
+        memory_budget: int = 0,
+        model_factory: Callable[[ModelConfig], SpamModel] = FastTextSpamModel,
+        retry_interval: float = 300.0,
+    ) -> None:
+        super().__init__(cfg)
+        self.routes = dict(routes or {})
+        self.memory_budget = memory_budget
+        self.retry_interval = retry_interval
+        self._factory = model_factory
+        self._default: SpamModel | None = None
+        self._default_size = 0
+        # Loaded routed models with their sizes, least recently used first
+        self._loaded: OrderedDict[str, tuple[SpamModel, int]] = OrderedDict()
+        # Monotonic time of the last failed load per language
+        self._unavailable: dict[str, float] = {}
+        # One load at a time, so concurrent loads do not overshoot the budget
+        self._loader = ThreadPoolExecutor(
+            max_workers=1,
+            thread_name_prefix="model-load",
+        )
+        self._loading: dict[str, Future[SpamModel | None]] = {}
+        self._lock = threading.Lock()
+        self._stats: dict[str, ModelStats] = {}
+        self.languages: Counter[str] = Counter()
+
+    @classmethod
+    def from_env(cls, cfg: ModelConfig | None = None) -> "ModelRegistry":
+        """Build a registry from the `MODEL_*` environment settings."""
+        return cls(
+            cfg or ModelConfig(),
+            routes=get_model_routes(),
+            memory_budget=int(get_model_memory_budget_mb() * 2**20),
+            retry_interval=get_model_retry_seconds(),
+        )
+
+    def fit(self) -> None:
+        """Train the default model, then every routed model.
+
+        The default model trains on the configured training files. Each routed
+        model trains on the file named like the model with a `.txt` suffix,
+        e.g. `antispam_uk.bin` on `antispam_uk.txt`. Routed models are loaded
+        again on first use.
+        """
+        model = self._factory(self.cfg)
+        model.fit()
+        self._default_size = _file_size(self.cfg)
+        self._default = model
+        for language, model_name in self.routes.items():
+            logger.info("Training {} model {}", language, model_name)
+            self._factory(self._route_config(model_name)).fit()
+        with self._lock:
+            self._loaded.clear()
+            self._unavailable.clear()
+
+    def load(self) -> None:
+        """Load the default model; routed models load on first use."""
+        started = time.perf_counter()
+        model = self._factory(self.cfg)
+        model.load()
+        stats = self._stats.setdefault(DEFAULT_ROUTE, ModelStats())
+        stats.loads += 1
+        stats.load_seconds += time.perf_counter() - started
+        self._default_size = _file_size(self.cfg)
+        self._default = model
+
+    def _route(self, language: str, *, wait: bool) -> tuple[str, SpamModel]:
+        """Return the route name and model that should score `language`.
+
+        A routed model that is not loaded yet is loaded in a background
+        thread. Unless `wait` is set, the default model scores the message
+        meanwhile, so a load never blocks the caller's event loop.
+        """
+        if language in self.routes and not self._failed_recently(language):
+            with self._lock:
+                entry = self._loaded.get(language)
+                if entry is not None:
+                    self._loaded.move_to_end(language)
+                    return language, entry[0]
+                future = self._loading.get(language)
+                if future is None:
+                    future = self._loader.submit(self._load_route, language)
+                    self._loading[language] = future
+            model = future.result() if wait else None
+            if model is not None:
+                return language, model
+        if self._default is None:
+            msg = "Default model is not loaded, call load() first"
+            raise RuntimeError(msg)
+        return DEFAULT_ROUTE, self._default
+
+    def _failed_recently(self, language: str) -> bool:
+        failed_at = self._unavailable.get(language)
+        return (
+            failed_at is not None and time.monotonic() - failed_at < self.retry_interval
+        )
+
+    def _route_config(self, model_name: str) -> ModelConfig:
+        return replace(
+            self.cfg,
+            model_name=model_name,
+            train_name=str(Path(model_name).with_suffix(".txt")),
+            train_names=None,
+        )
+
+    def _load_route(self, language: str) -> SpamModel | None:
+        """Load a routed model, then evict others to fit. Runs in a thread."""
+        cfg = self._route_config(self.routes[language])
+        started = time.perf_counter()
+        try:
+            size = cfg.model_path.stat().st_size
+            model = self._factory(cfg)
+            model.load()
+        except Exception as e:
+            with self._lock:
+                self._stats.setdefault(language, ModelStats()).load_failures += 1
+                # Do not retry on every message; the default model takes over
+                self._unavailable[language] = time.monotonic()
+                del self._loading[language]
+            logger.exception(
+                "Failed to load {} model from {}, using the default: {}",
+                language,
+                cfg.model_path,
+                e,
+            )
+            return None
+        seconds = time.perf_counter() - started
+        with self._lock:
+            # Evict only once the new model works, so a failed load keeps the
+            # loaded ones
+            self._evict(size)
+            self._loaded[language] = (model, size)
+            self._unavailable.pop(language, None)
+            del self._loading[language]
+            stats = self._stats.setdefault(language, ModelStats())
+            stats.loads += 1
+            stats.load_seconds += seconds
+        logger.info(
+            "Loaded {} model from {} in {:.2f}s",
+            language,
+            cfg.model_path,
+            seconds,
+        )
+        return model
+
+    def _evict(self, incoming: int) -> None:
+        if not self.memory_budget:
+            return
+        used = self._default_size + sum(size for _, size in self._loaded.values())
+        while self._loaded and used + incoming > self.memory_budget:
+            language, (_, size) = self._loaded.popitem(last=False)
+            used -= size
+            self._stats[language].evictions += 1
+            logger.info("Evicted {} model to stay within the memory budget", language)
+
+    def _record(self, language: str, route: str, latency: float, count: int) -> None:
+        with self._lock:
+            self.languages[language or "unknown"] += count
+            stats = self._stats.setdefault(route, ModelStats())
+            stats.predictions += count
+            stats.latency_total += latency
+            # Batches count with their per-message latency
+            stats.latency_max = max(stats.latency_max, latency / count)
+
+    def predict_proba(self, text: str) -> float:
+        language = detect_language(text) if self.routes else ""
+        route, model = self._route(language, wait=False)
+        started = time.perf_counter()
+        probability = model.predict_proba(text)
+        self._record(language, route, time.perf_counter() - started, 1)
+        return probability
+
+    def predict_proba_batch(self, texts: list[str]) -> list[float]:
+        """Score texts, one batched call per language.
+
+        Meant for bulk scoring off the event loop: waits for routed models to
+        load instead of falling back to the default model.
+        """
+        groups: dict[str, list[int]] = {}
+        for i, text in enumerate(texts):
+            language = detect_language(text) if self.routes else ""
+            groups.setdefault(language, []).append(i)
+        scores = [0.0] * len(texts)
+        for language, indices in groups.items():
+            route, model = self._route(language, wait=True)
+            started = time.perf_counter()
+            batch_scores = model.predict_proba_batch([texts[i] for i in indices])
+            self._record(language, route, time.perf_counter() - started, len(indices))
+            for i, score in zip(indices, batch_scores, strict=True):
+                scores[i] = score
+        return scores
+
+    def stats(self) -> dict:
+        """Return per-model counters, language mix and memory use."""
+        with self._lock:
+            loaded = {language: size for language, (_, size) in self._loaded.items()}
+            models = {}
+            for route, stats in self._stats.items():
+                models[route] = {
+                    "loaded": route == DEFAULT_ROUTE or route in loaded,
+                    "loads": stats.loads,
+                    "load_failures": stats.load_failures,
+                    "evictions": stats.evictions,
+                    "load_seconds": stats.load_seconds,
+                    "predictions": stats.predictions,
+                    "avg_latency": (
+                        stats.latency_total / stats.predictions
+                        if stats.predictions
+                        else 0.0
+                    ),
+                    "max_latency": stats.latency_max,
+                }
+        return {
+            "models": models,
+            "routes": dict(self.routes),
+            "languages": dict(self.languages.most_common()),
+            "memory_used": self._default_size + sum(loaded.values()),
+            "memory_budget": self.memory_budget,
+        }
+
+
+def _file_size(cfg: ModelConfig) -> int:
+    try:
+        return cfg.model_path.stat().st_size
+    except OSError:
+        return 0
@@ -0,0 +1,160 @@
+"""Per-chat moderation policies cached in memory."""
+
+from collections.abc import Callable
+from dataclasses import dataclass
+
+from .core.base_storage import BotStorage
+from .core.records import AllowedChatRecord
+
+# Probability subtracted for multi-line messages and for long messages
+HEURISTIC_PENALTY = 0.1
+
+
+@dataclass(frozen=True, slots=True)
+class ChatPolicy:
+    """Effective moderation settings for a single chat."""
+
+    spam_threshold: float
+    min_word_count: int
+    dry_run: bool = False
+    heuristics_enabled: bool = True
+
+
+def heuristic_penalty(text_content: str, policy: ChatPolicy) -> float:
+    """Return how much the chat's heuristics lower the spam probability."""
+    if not policy.heuristics_enabled:
+        return 0.0
+    penalty = 0.0
+    if "\n" in text_content:
+        penalty += HEURISTIC_PENALTY
+    if len(text_content.split()) > policy.min_word_count:
+        penalty += HEURISTIC_PENALTY
+    return penalty
+
+
+class PolicyTable:
+    """In-memory table of policies for allowed chats.
+
+    The table mirrors `allowed_chats` so the message handler can check both
+    whether a chat is moderated and how, with a single dict lookup. Chat rows
+    store NULL for threshold/min words to follow the global defaults.
+    """
+
+    def __init__(self, default_threshold: float, default_min_word_count: int) -> None:
+        self.default = ChatPolicy(
+            spam_threshold=default_threshold,
+            min_word_count=default_min_word_count,
+        )
+        self._policies: dict[int, ChatPolicy] = {}
+
+    def policy_from_row(self, row: AllowedChatRecord) -> ChatPolicy:
+        """Build an effective policy from an `allowed_chats` row."""
+        threshold = row.spam_threshold
+        min_word_count = row.min_word_count
+        return ChatPolicy(
+            spam_threshold=(
+                self.default.spam_threshold if threshold is None else threshold
+            ),
+            min_word_count=(
+                self.default.min_word_count
+                if min_word_count is None
+                else min_word_count
+            ),
+            dry_run=row.dry_run,
+            heuristics_enabled=row.heuristics_enabled,
+        )
+
+    async def load(self, db: BotStorage) -> None:
+        """Replace the cached table with the current database contents."""
+        rows = await db.list_allowed_chats()
+        self._policies = {row.chat_id: self.policy_from_row(row) for row in rows}
+
+    async def refresh(self, db: BotStorage, chat_id: int) -> ChatPolicy | None:
+        """Reload a single chat from the database after a write."""
+        row = await db.get_allowed_chat(chat_id)
+        if row is None:
+            self._policies.pop(chat_id, None)
+            return None
+        policy = self.policy_from_row(row)
+        self._policies[chat_id] = policy
+        return policy
+
+    def get(self, chat_id: int) -> ChatPolicy | None:
+        """Return the policy of an allowed chat, or None if not moderated."""
+        return self._policies.get(chat_id)
+
+    def __len__(self) -> int:
+        return len(self._policies)
+
+
+# Admin-facing setting names mapped to `allowed_chats` columns
+POLICY_SETTINGS = {
+    "threshold": "spam_threshold",
+    "min_words": "min_word_count",
+    "dry_run": "dry_run",
+    "heuristics": "heuristics_enabled",
+}
+_TRUE_VALUES = {"on", "true", "yes", "1"}
+_FALSE_VALUES = {"off", "false", "no", "0"}
+
+
+def _parse_threshold(value: str) -> float | None:
+    if value == "default":
+        return None
+    try:
+        threshold = float(value)
+    except ValueError:
+        threshold = -1.0
+    if not 0.0 <= threshold <= 1.0:
+        msg = "must be a number between 0 and 1"
+        raise ValueError(msg)
+    return threshold
+
+
+def _parse_min_words(value: str) -> int | None:
+    if value == "default":
+        return None
+    try:
+        min_word_count = int(value)
+    except ValueError:
+        min_word_count = -1
+    if min_word_count < 0:
+        msg = "must be a non-negative integer"
+        raise ValueError(msg)
+    return min_word_count
+
+
+def _parse_flag(value: str) -> bool:
+    if value in _TRUE_VALUES:
+        return True
+    if value in _FALSE_VALUES:
+        return False
+    msg = "must be on or off"
+    raise ValueError(msg)
+
+
+# Parser of each `allowed_chats` column. Errors name the problem but not the
+# setting, which the caller prepends
+_SETTING_PARSERS: dict[str, Callable[[str], float | bool | None]] = {
+    "spam_threshold": _parse_threshold,
+    "min_word_count": _parse_min_words,
+    "dry_run": _parse_flag,
+    "heuristics_enabled": _parse_flag,
+}
+
+
+def parse_policy_setting(key: str, raw_value: str) -> tuple[str, float | bool | None]:
+    """Parse an admin `/policy` setting into a column name and value.
+
+    `threshold` and `min_words` accept "default" to follow the global value.
+    Raises ValueError with a user-facing message on invalid input.
+    """
+    column = POLICY_SETTINGS.get(key)
+    if column is None:
+        msg = f"Unknown setting {key!r}. Use one of: {', '.join(POLICY_SETTINGS)}"
+        raise ValueError(msg)
+    try:
+        return column, _SETTING_PARSERS[column](raw_value.strip().lower())
+    except ValueError as e:
+        msg = f"{key} {e}"
+        raise ValueError(msg) from None
@@ -0,0 +1,114 @@
+"""Per-handler timing and on-demand profiling."""
+
+import asyncio
+import cProfile
+import io
+import marshal
+import pstats
+import time
+from collections import deque
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+from aiogram import BaseMiddleware
+from aiogram.types import TelegramObject
+
+
+class HandlerTimingMiddleware(BaseMiddleware):
+    """Inner middleware that records wall and CPU time per handler.
+
+    CPU time is measured on the event loop thread, so while handlers overlap
+    it also includes CPU spent by the ones interleaved with it. Wall times of
+    the last `sample_size` calls per handler are kept for percentiles.
+    """
+
+    def __init__(self, sample_size: int = 1000) -> None:
+        self.sample_size = sample_size
+        self._timings: dict[str, dict] = {}
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: dict[str, Any],
+    ) -> Any:  # noqa: ANN401
+        handler_object = data.get("handler")
+        name = getattr(getattr(handler_object, "callback", None), "__name__", "unknown")
+        wall_started = time.perf_counter()
+        cpu_started = time.thread_time()
+        try:
+            return await handler(event, data)
+        finally:
+            wall = time.perf_counter() - wall_started
+            cpu = time.thread_time() - cpu_started
+            timing = self._timings.get(name)
+            if timing is None:
+                timing = self._timings[name] = {
+                    "count": 0,
+                    "wall_total": 0.0,
+                    "cpu_total": 0.0,
+                    "wall_max": 0.0,
+                    "recent": deque(maxlen=self.sample_size),
+                }
+            timing["count"] += 1
+            timing["wall_total"] += wall
+            timing["cpu_total"] += cpu
+            timing["wall_max"] = max(timing["wall_max"], wall)
+            timing["recent"].append(wall)
+
+    def stats(self) -> dict[str, dict]:
+        """Return timing summaries per handler, busiest first."""
+        result = {}
+        for name, timing in sorted(
+            self._timings.items(),
+            key=lambda item: item[1]["wall_total"],
+            reverse=True,
+        ):
+            recent = sorted(timing["recent"])
+            count = timing["count"]
+            result[name] = {
+                "count": count,
+                "avg_wall": timing["wall_total"] / count,
+                "avg_cpu": timing["cpu_total"] / count,
+                "max_wall": timing["wall_max"],
+                "p50_wall": recent[len(recent) // 2],
+                "p99_wall": recent[min(len(recent) - 1, int(len(recent) * 0.99))],
+            }
+        return result
+
+
+class ProfilingSession:
+    """Runs cProfile over the whole event loop for a limited time.
+
+    Only one session can run at a time.
+    """
+
+    def __init__(self) -> None:
+        self.active = False
+
+    async def run(self, seconds: float, top: int = 30) -> tuple[str, bytes]:
+        """Profile for `seconds` and return a text summary and raw pstats data.
+
+        The raw data can be loaded with `pstats.Stats` or snakeviz after being
+        saved to a file.
+        """
+        if self.active:
+            msg = "A profiling session is already running"
+            raise RuntimeError(msg)
+        self.active = True
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+            try:
+                await asyncio.sleep(seconds)
+            finally:
+                profiler.disable()
+        finally:
+            self.active = False
+
+        stream = io.StringIO()
+        stats = pstats.Stats(profiler, stream=stream)
+        stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(top)
+        stats.sort_stats(pstats.SortKey.TIME).print_stats(top)
+        profiler.create_stats()
+        return stream.getvalue(), marshal.dumps(profiler.stats)
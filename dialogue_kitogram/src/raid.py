@@ -0,0 +1,233 @@
+"""Raid and flood detection with bounded sliding-window counters."""
+
+import time
+from collections import OrderedDict, deque
+from dataclasses import dataclass
+
+from loguru import logger
+
+from .config import get_env_float, get_env_int
+
+
+@dataclass(frozen=True, slots=True)
+class RaidSettings:
+    """Thresholds and limits for raid detection."""
+
+    window_seconds: float = 10.0
+    message_burst: int = 30
+    join_burst: int = 10
+    repeat_burst: int = 4
+    user_burst: int = 6
+    new_member_seconds: float = 300.0
+    raid_duration_seconds: float = 600.0
+    raid_spam_threshold: float = 0.7
+    message_capacity: int = 200
+    join_capacity: int = 100
+    max_chats: int = 1000
+
+    @classmethod
+    def from_env(cls) -> "RaidSettings":
+        """Build settings from `RAID_*` environment variables."""
+        defaults = cls()
+        return cls(
+            window_seconds=get_env_float(
+                "RAID_WINDOW_SECONDS",
+                defaults.window_seconds,
+            ),
+            message_burst=get_env_int("RAID_MESSAGE_BURST", defaults.message_burst),
+            join_burst=get_env_int("RAID_JOIN_BURST", defaults.join_burst),
+            repeat_burst=get_env_int("RAID_REPEAT_BURST", defaults.repeat_burst),
+            user_burst=get_env_int("RAID_USER_BURST", defaults.user_burst),
+            new_member_seconds=get_env_float(
+                "RAID_NEW_MEMBER_SECONDS",
+                defaults.new_member_seconds,
+            ),
+            raid_duration_seconds=get_env_float(
+                "RAID_DURATION_SECONDS",
+                defaults.raid_duration_seconds,
+            ),
+            raid_spam_threshold=get_env_float(
+                "RAID_SPAM_THRESHOLD",
+                defaults.raid_spam_threshold,
+            ),
+            max_chats=get_env_int("RAID_MAX_CHATS", defaults.max_chats),
+        )
+
+
+@dataclass(slots=True)
+class _RecentMessage:
+    timestamp: float
+    user_id: int
+    message_id: int
+    text_key: int
+    spam_probability: float
+
+
+@dataclass(slots=True)
+class _ChatWindow:
+    """Fixed-size ring buffers of recent activity in one chat."""
+
+    messages: deque[_RecentMessage]
+    joins: deque[tuple[float, int]]
+    raid_until: float = 0.0
+
+
+def _text_key(text: str) -> int:
+    # Case and whitespace changes should not hide repeated texts
+    return hash(" ".join(text.lower().split()))
+
+
+class RaidDetector:
+    """Track per-chat and per-user message rates to detect raids and floods.
+
+    Each chat keeps fixed-size ring buffers of recent messages and joins, and
+    at most `max_chats` chats are tracked (least recently active are evicted),
+    so memory stays bounded regardless of how many chats the bot sees.
+
+    A chat enters raid mode when, within the sliding window, there are too
+    many messages, joins or copies of the same text. While raid mode is
+    active the spam threshold is lowered, and messages in the burst from
+    newcomers or with borderline scores are returned for bulk deletion;
+    established members repeating a short reply like "+1" are left alone.
+    Raid mode expires automatically. Callers should not record messages of
+    chat admins.
+    """
+
+    def __init__(self, settings: RaidSettings | None = None) -> None:
+        self.settings = settings or RaidSettings()
+        self._chats: OrderedDict[int, _ChatWindow] = OrderedDict()
+
+    def _window(self, chat_id: int) -> _ChatWindow:
+        window = self._chats.get(chat_id)
+        if window is None:
+            window = _ChatWindow(
+                messages=deque(maxlen=self.settings.message_capacity),
+                joins=deque(maxlen=self.settings.join_capacity),
+            )
+            self._chats[chat_id] = window
+            if len(self._chats) > self.settings.max_chats:
+                self._chats.popitem(last=False)
+        else:
+            self._chats.move_to_end(chat_id)
+        return window
+
+    def is_raid(self, chat_id: int, now: float | None = None) -> bool:
+        """Return True if the chat is currently in raid mode."""
+        window = self._chats.get(chat_id)
+        if window is None or not window.raid_until:
+            return False
+        now = time.monotonic() if now is None else now
+        if now < window.raid_until:
+            return True
+        window.raid_until = 0.0
+        logger.info("Raid mode expired in chat {}", chat_id)
+        return False
+
+    def threshold_for(
+        self,
+        chat_id: int,
+        spam_threshold: float,
+        now: float | None = None,
+    ) -> float:
+        """Return the effective spam threshold, lowered during raid mode."""
+        if self.is_raid(chat_id, now):
+            return min(spam_threshold, self.settings.raid_spam_threshold)
+        return spam_threshold
+
+    def set_raid(self, chat_id: int, *, active: bool, now: float | None = None) -> None:
+        """Manually start or end raid mode in a chat."""
+        window = self._window(chat_id)
+        now = time.monotonic() if now is None else now
+        window.raid_until = now + self.settings.raid_duration_seconds if active else 0.0
+
+    def _start_raid(
+        self,
+        chat_id: int,
+        window: _ChatWindow,
+        now: float,
+        reason: str,
+    ) -> None:
+        if not window.raid_until or now >= window.raid_until:
+            logger.warning("Raid mode started in chat {}: {}", chat_id, reason)
+        window.raid_until = now + self.settings.raid_duration_seconds
+
+    def _recent_newcomers(self, window: _ChatWindow, now: float) -> set[int]:
+        since = now - self.settings.new_member_seconds
+        return {user_id for ts, user_id in window.joins if ts >= since}
+
+    def record_join(self, chat_id: int, user_id: int, now: float | None = None) -> bool:
+        """Record a new chat member. Returns True if this triggered raid mode."""
+        now = time.monotonic() if now is None else now
+        window = self._window(chat_id)
+        window.joins.append((now, user_id))
+        since = now - self.settings.window_seconds
+        joins_in_window = sum(1 for ts, _ in window.joins if ts >= since)
+        if joins_in_window >= self.settings.join_burst:
+            already_active = self.is_raid(chat_id, now)
+            self._start_raid(chat_id, window, now, f"{joins_in_window} joins")
+            return not already_active
+        return False
+
+    def record_message(  # noqa: PLR0913
+        self,
+        *,
+        chat_id: int,
+        user_id: int,
+        message_id: int,
+        text: str,
+        spam_probability: float,
+        now: float | None = None,
+    ) -> list[int]:
+        """Record a scored message and return message ids to bulk delete.
+
+        The returned ids may include the recorded message itself. Returned
+        messages are dropped from the window so they are reported only once.
+        """
+        now = time.monotonic() if now is None else now
+        window = self._window(chat_id)
+        key = _text_key(text)
+        window.messages.append(
+            _RecentMessage(now, user_id, message_id, key, spam_probability),
+        )
+
+        since = now - self.settings.window_seconds
+        in_window = [m for m in window.messages if m.timestamp >= since]
+        repeats = sum(1 for m in in_window if m.text_key == key)
+        user_messages = [m for m in in_window if m.user_id == user_id]
+
+        if len(in_window) >= self.settings.message_burst:
+            self._start_raid(chat_id, window, now, f"{len(in_window)} messages")
+        if repeats >= self.settings.repeat_burst:
+            self._start_raid(chat_id, window, now, f"{repeats} repeated texts")
+
+        burst: list[_RecentMessage] = []
+        if self.is_raid(chat_id, now):
+            newcomers = self._recent_newcomers(window, now)
+            burst = [
+                m
+                for m in in_window
+                if m.user_id in newcomers
+                or m.spam_probability > self.settings.raid_spam_threshold
+            ]
+        elif len(user_messages) >= self.settings.user_burst:
+            # A single user flooding the chat: remove their burst only
+            logger.warning("Flood from user {} in chat {}", user_id, chat_id)
+            burst = user_messages
+
+        if not burst:
+            return []
+        burst_ids = {m.message_id for m in burst}
+        remaining = [m for m in window.messages if m.message_id not in burst_ids]
+        window.messages.clear()
+        window.messages.extend(remaining)
+        return [m.message_id for m in burst]
+
+    def stats(self) -> dict:
+        """Return the number of tracked chats and chats in raid mode."""
+        now = time.monotonic()
+        return {
+            "tracked_chats": len(self._chats),
+            "raid_chats": sum(
+                1 for chat_id in list(self._chats) if self.is_raid(chat_id, now)
+            ),
+        }
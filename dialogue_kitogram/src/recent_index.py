@@ -0,0 +1,90 @@
+"""Bounded in-memory index of recent messages per user across chats."""
+
+import time
+from collections import OrderedDict, deque
+from dataclasses import dataclass
+
+from .config import get_env_bool, get_env_float, get_env_int
+
+
+@dataclass(frozen=True, slots=True)
+class PurgeSettings:
+    """Limits of the recent-message index and purge behaviour."""
+
+    per_user: int = 20
+    max_users: int = 10000
+    max_age_seconds: float = 3600.0
+    ban: bool = False
+
+    @classmethod
+    def from_env(cls) -> "PurgeSettings":
+        """Build settings from `PURGE_*` environment variables."""
+        defaults = cls()
+        return cls(
+            per_user=get_env_int("PURGE_RECENT_MESSAGES", defaults.per_user),
+            max_users=get_env_int("PURGE_MAX_USERS", defaults.max_users),
+            max_age_seconds=get_env_float(
+                "PURGE_MAX_AGE_SECONDS",
+                defaults.max_age_seconds,
+            ),
+            ban=get_env_bool("PURGE_BAN_USERS", default=defaults.ban),
+        )
+
+
+class RecentMessageIndex:
+    """Ring buffer of each user's last messages in moderated chats.
+
+    Every user keeps at most `per_user` (timestamp, chat_id, message_id)
+    entries, and at most `max_users` users are tracked (least recently active
+    are evicted), so a spammer's recent messages can be found without
+    scanning the database.
+    """
+
+    def __init__(self, settings: PurgeSettings | None = None) -> None:
+        self.settings = settings or PurgeSettings()
+        self._users: OrderedDict[int, deque[tuple[float, int, int]]] = OrderedDict()
+
+    @property
+    def enabled(self) -> bool:
+        return self.settings.per_user > 0
+
+    def record(
+        self,
+        user_id: int,
+        chat_id: int,
+        message_id: int,
+        now: float | None = None,
+    ) -> None:
+        """Remember a message posted by a user."""
+        if not self.enabled:
+            return
+        now = time.monotonic() if now is None else now
+        messages = self._users.get(user_id)
+        if messages is None:
+            messages = deque(maxlen=self.settings.per_user)
+            self._users[user_id] = messages
+            if len(self._users) > self.settings.max_users:
+                self._users.popitem(last=False)
+        else:
+            self._users.move_to_end(user_id)
+        messages.append((now, chat_id, message_id))
+
+    def pop_user(self, user_id: int, now: float | None = None) -> dict[int, list[int]]:
+        """Forget a user and return their recent message ids grouped by chat."""
+        messages = self._users.pop(user_id, None)
+        if not messages:
+            return {}
+        now = time.monotonic() if now is None else now
+        since = now - self.settings.max_age_seconds
+        by_chat: dict[int, list[int]] = {}
+        for timestamp, chat_id, message_id in messages:
+            if timestamp >= since:
+                by_chat.setdefault(chat_id, []).append(message_id)
+        return by_chat
+
+    def stats(self) -> dict:
+        """Return the number of tracked users and messages."""
+        return {
+            "tracked_users": len(self._users),
+            "tracked_messages": sum(len(m) for m in self._users.values()),
+        }
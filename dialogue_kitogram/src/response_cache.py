@@ -0,0 +1,149 @@
+"""Cache of formatted admin command responses."""
+
+import asyncio
+import time
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+
+from .config import get_env_float, get_env_int
+
+# A command name and the chat it is scoped to (None = all chats)
+CacheKey = tuple[str, int | None]
+
+
+@dataclass(frozen=True, slots=True)
+class ResponseCacheSettings:
+    """Freshness limits and size of the response cache."""
+
+    ttl: float = 60.0
+    refresh_interval: float = 2.0
+    max_entries: int = 1000
+
+    @classmethod
+    def from_env(cls) -> "ResponseCacheSettings":
+        """Build settings from `RESPONSE_CACHE_*` environment variables."""
+        defaults = cls()
+        return cls(
+            ttl=get_env_float("RESPONSE_CACHE_TTL", defaults.ttl),
+            refresh_interval=get_env_float(
+                "RESPONSE_CACHE_REFRESH_INTERVAL",
+                defaults.refresh_interval,
+            ),
+            max_entries=get_env_int(
+                "RESPONSE_CACHE_MAX_ENTRIES",
+                defaults.max_entries,
+            ),
+        )
+
+
+@dataclass(slots=True)
+class _Entry:
+    value: str
+    built_at: float
+    stale: bool = False
+
+
+class ResponseCache:
+    """Formatted responses per command and chat, rebuilt only after writes.
+
+    An entry is served until `ttl` seconds old, which bounds staleness from
+    writes the bot does not see (other processes on the same database). Writes
+    seen by the bot mark the affected entries stale; a stale entry is rebuilt
+    on the next request, but at most once per `refresh_interval` seconds, so a
+    spam wave writing many detections does not turn every repeated command
+    into a query. Concurrent requests for an entry being built share that one
+    build. A `ttl` of 0 disables caching.
+    """
+
+    def __init__(self, settings: ResponseCacheSettings | None = None) -> None:
+        self.settings = settings or ResponseCacheSettings()
+        # Least recently used first
+        self._entries: OrderedDict[CacheKey, _Entry] = OrderedDict()
+        self._building: dict[CacheKey, asyncio.Task[str]] = {}
+        # Keys invalidated while being built; their result is stored stale
+        self._invalidated_while_building: set[CacheKey] = set()
+        # Keys cleared while being built; their result is not stored
+        self._cleared_while_building: set[CacheKey] = set()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def _servable(self, entry: _Entry, now: float) -> bool:
+        age = now - entry.built_at
+        if entry.stale:
+            return age < self.settings.refresh_interval
+        return age < self.settings.ttl
+
+    async def get(
+        self,
+        command: str,
+        chat_id: int | None,
+        build: Callable[[], Awaitable[str]],
+    ) -> str:
+        """Return the cached response, calling `build` if there is none."""
+        if self.settings.ttl <= 0:
+            return await build()
+        key = (command, chat_id)
+        entry = self._entries.get(key)
+        if entry is not None and self._servable(entry, time.monotonic()):
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry.value
+        task = self._building.get(key)
+        if task is None:
+            self.misses += 1
+            task = asyncio.create_task(self._build(key, build))
+            self._building[key] = task
+        else:
+            self.hits += 1
+        # A cancelled request must not cancel the build others wait for
+        return await asyncio.shield(task)
+
+    async def _build(self, key: CacheKey, build: Callable[[], Awaitable[str]]) -> str:
+        started = time.monotonic()
+        try:
+            value = await build()
+        finally:
+            del self._building[key]
+            stale = key in self._invalidated_while_building
+            self._invalidated_while_building.discard(key)
+            cleared = key in self._cleared_while_building
+            self._cleared_while_building.discard(key)
+        if cleared:
+            return value
+        self._entries[key] = _Entry(value, started, stale=stale)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.settings.max_entries:
+            self._entries.popitem(last=False)
+        return value
+
+    def invalidate(self, command: str, chat_id: int | None = None) -> None:
+        """Mark responses of `command` for `chat_id` and for all chats stale."""
+        self.invalidations += 1
+        for key in {(command, chat_id), (command, None)}:
+            entry = self._entries.get(key)
+            if entry is not None:
+                entry.stale = True
+            if key in self._building:
+                self._invalidated_while_building.add(key)
+
+    def clear(self, command: str) -> None:
+        """Drop every response of `command`, so the next request rebuilds it."""
+        self.invalidations += 1
+        for key in [key for key in self._entries if key[0] == command]:
+            del self._entries[key]
+        for key in self._building:
+            if key[0] == command:
+                self._cleared_while_building.add(key)
+
+    def stats(self) -> dict:
+        """Return hit and invalidation counters."""
+        requests = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / requests if requests else 0.0,
+            "invalidations": self.invalidations,
+        }
@@ -0,0 +1,176 @@
+"""Bounded, prioritized processing of incoming updates."""
+
+import asyncio
+import heapq
+import itertools
+import time
+from collections.abc import Awaitable, Callable
+from enum import IntEnum
+from typing import Any
+
+from aiogram import BaseMiddleware
+from aiogram.enums import ChatType
+from aiogram.types import TelegramObject, Update
+from loguru import logger
+
+
+class UpdatePriority(IntEnum):
+    """Processing priority of an update; lower values run first."""
+
+    HIGH = 0
+    NORMAL = 1
+    LOW = 2
+
+
+class PriorityLimiter:
+    """Concurrency limiter that admits waiters in priority order.
+
+    At most `max_concurrency` holders run at once. When all slots are busy,
+    waiters queue by (priority, arrival). Low-priority waiters beyond
+    `max_pending_low` and normal-priority waiters beyond `max_pending_normal`
+    are shed instead of queued, so a flood of routine work or DMs cannot grow
+    the queue without bound. High-priority waiters are never shed.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int,
+        max_pending_low: int,
+        max_pending_normal: int,
+    ) -> None:
+        self.max_concurrency = max_concurrency
+        self.max_pending = {
+            UpdatePriority.NORMAL: max_pending_normal,
+            UpdatePriority.LOW: max_pending_low,
+        }
+        self.active = 0
+        self._waiters: list[tuple[int, int, asyncio.Future[None]]] = []
+        self._pending = dict.fromkeys(UpdatePriority, 0)
+        self._counter = itertools.count()
+
+    def pending(self, priority: UpdatePriority) -> int:
+        """Return the number of queued waiters with the given priority."""
+        return self._pending[priority]
+
+    async def acquire(self, priority: UpdatePriority) -> bool:
+        """Wait for a slot. Returns False if the request was shed."""
+        if self.active < self.max_concurrency and not self._waiters:
+            self.active += 1
+            return True
+        limit = self.max_pending.get(priority)
+        if limit is not None and self._pending[priority] >= limit:
+            return False
+
+        future: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+        entry = (int(priority), next(self._counter), future)
+        heapq.heappush(self._waiters, entry)
+        self._pending[priority] += 1
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # Slot was handed over right before cancellation; pass it on
+                self.release()
+            elif entry in self._waiters:
+                self._waiters.remove(entry)
+                heapq.heapify(self._waiters)
+            raise
+        finally:
+            self._pending[priority] -= 1
+        return True
+
+    def release(self) -> None:
+        """Release a slot and hand it to the highest-priority waiter."""
+        self.active -= 1
+        while self._waiters:
+            _, _, future = heapq.heappop(self._waiters)
+            if not future.done():
+                self.active += 1
+                future.set_result(None)
+                return
+
+
+class UpdateScheduler(BaseMiddleware):
+    """Outer update middleware that caps and prioritizes handler execution.
+
+    Admin traffic is admitted first, then commands and DMs of other users,
+    then routine group messages; only admin traffic is never shed, so a
+    flood of slash messages cannot grow the queue without bound. Queue wait
+    time is recorded per priority.
+    """
+
+    def __init__(
+        self,
+        admin_ids: set[int],
+        max_concurrency: int = 32,
+        max_pending_low: int = 1000,
+        max_pending_normal: int = 1000,
+    ) -> None:
+        self.admin_ids = admin_ids
+        self.limiter = PriorityLimiter(
+            max_concurrency,
+            max_pending_low,
+            max_pending_normal,
+        )
+        self.shed = 0
+        self._waits = {
+            priority: {"count": 0, "total": 0.0, "max": 0.0}
+            for priority in UpdatePriority
+        }
+
+    def classify(self, update: Update) -> UpdatePriority:
+        """Return the processing priority of an update."""
+        message = update.message or update.edited_message
+        if message is None:
+            return UpdatePriority.NORMAL
+        if message.from_user and message.from_user.id in self.admin_ids:
+            return UpdatePriority.HIGH
+        text = message.text or message.caption or ""
+        if text.startswith("/") or message.chat.type == ChatType.PRIVATE:
+            return UpdatePriority.NORMAL
+        return UpdatePriority.LOW
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: dict[str, Any],
+    ) -> Any:  # noqa: ANN401
+        priority = (
+            self.classify(event) if isinstance(event, Update) else UpdatePriority.NORMAL
+        )
+        queued_at = time.perf_counter()
+        if not await self.limiter.acquire(priority):
+            self.shed += 1
+            if self.shed % 100 == 1:
+                logger.warning("Overloaded: shed {} updates", self.shed)
+            return None
+
+        wait = time.perf_counter() - queued_at
+        waits = self._waits[priority]
+        waits["count"] += 1
+        waits["total"] += wait
+        waits["max"] = max(waits["max"], wait)
+        try:
+            return await handler(event, data)
+        finally:
+            self.limiter.release()
+
+    def stats(self) -> dict:
+        """Return current load and queue wait statistics."""
+        return {
+            "active": self.limiter.active,
+            "max_concurrency": self.limiter.max_concurrency,
+            "shed": self.shed,
+            "priorities": {
+                priority.name.lower(): {
+                    "pending": self.limiter.pending(priority),
+                    "processed": waits["count"],
+                    "avg_wait": waits["total"] / waits["count"]
+                    if waits["count"]
+                    else 0.0,
+                    "max_wait": waits["max"],
+                }
+                for priority, waits in self._waits.items()
+            },
+        }
@@ -0,0 +1,199 @@
+"""Tuned and instrumented HTTP session for outgoing Bot API calls."""
+
+import asyncio
+import random
+import time
+from collections import deque
+from dataclasses import dataclass
+
+from aiogram import Bot
+from aiogram.client.session.aiohttp import AiohttpSession
+from aiogram.client.telegram import PRODUCTION, TelegramAPIServer
+from aiogram.exceptions import (
+    TelegramNetworkError,
+    TelegramRetryAfter,
+    TelegramServerError,
+)
+from aiogram.methods import TelegramMethod
+from aiogram.methods.base import TelegramType
+from aiohttp import ClientTimeout
+
+from .config import get_env_float, get_env_int
+
+# Methods safe to repeat: a duplicate call has the same effect as one call.
+# Sending messages is not, and getUpdates is retried by the dispatcher itself.
+IDEMPOTENT_METHODS = frozenset(
+    {
+        "getMe",
+        "getChat",
+        "getChatMember",
+        "getChatAdministrators",
+        "deleteMessage",
+        "deleteMessages",
+        "banChatMember",
+    },
+)
+
+
+@dataclass(frozen=True, slots=True)
+class SessionSettings:
+    """Connection pool, timeout and retry settings of the Bot API session."""
+
+    pool_size: int = 100
+    pool_per_host: int = 0
+    keepalive_seconds: float = 30.0
+    dns_cache_seconds: int = 3600
+    timeout: float = 60.0
+    connect_timeout: float = 10.0
+    retries: int = 2
+    retry_backoff: float = 0.5
+    max_retry_after: float = 5.0
+
+    @classmethod
+    def from_env(cls) -> "SessionSettings":
+        """Build settings from `TELEGRAM_HTTP_*` environment variables."""
+        defaults = cls()
+        return cls(
+            pool_size=get_env_int("TELEGRAM_HTTP_POOL_SIZE", defaults.pool_size),
+            pool_per_host=get_env_int(
+                "TELEGRAM_HTTP_POOL_PER_HOST",
+                defaults.pool_per_host,
+            ),
+            keepalive_seconds=get_env_float(
+                "TELEGRAM_HTTP_KEEPALIVE_SECONDS",
+                defaults.keepalive_seconds,
+            ),
+            dns_cache_seconds=get_env_int(
+                "TELEGRAM_HTTP_DNS_CACHE_SECONDS",
+                defaults.dns_cache_seconds,
+            ),
+            timeout=get_env_float("TELEGRAM_HTTP_TIMEOUT", defaults.timeout),
+            connect_timeout=get_env_float(
+                "TELEGRAM_HTTP_CONNECT_TIMEOUT",
+                defaults.connect_timeout,
+            ),
+            retries=get_env_int("TELEGRAM_HTTP_RETRIES", defaults.retries),
+            retry_backoff=get_env_float(
+                "TELEGRAM_HTTP_RETRY_BACKOFF",
+                defaults.retry_backoff,
+            ),
+            max_retry_after=get_env_float(
+                "TELEGRAM_HTTP_MAX_RETRY_AFTER",
+                defaults.max_retry_after,
+            ),
+        )
+
+
+class InstrumentedAiohttpSession(AiohttpSession):
+    """aiohttp session with a tuned connection pool, retries and metrics.
+
+    Idempotent methods are retried on network errors, 5xx responses and
+    short flood waits (429 with `retry_after` up to `max_retry_after`), with
+    jittered exponential backoff. Latency of every attempt and errors by type
+    are recorded per method; the last `sample_size` latencies per method are
+    kept for percentiles.
+    """
+
+    def __init__(
+        self,
+        settings: SessionSettings | None = None,
+        sample_size: int = 1000,
+        api: TelegramAPIServer = PRODUCTION,
+    ) -> None:
+        self.settings = settings or SessionSettings()
+        super().__init__(
+            limit=self.settings.pool_size,
+            api=api,
+            timeout=self.settings.timeout,
+        )
+        self._connector_init.update(
+            limit_per_host=self.settings.pool_per_host,
+            keepalive_timeout=self.settings.keepalive_seconds,
+            ttl_dns_cache=self.settings.dns_cache_seconds,
+        )
+        self.sample_size = sample_size
+        self._metrics: dict[str, dict] = {}
+
+    def _method_metrics(self, name: str) -> dict:
+        metrics = self._metrics.get(name)
+        if metrics is None:
+            metrics = self._metrics[name] = {
+                "count": 0,
+                "errors": {},
+                "retries": 0,
+                "latency_total": 0.0,
+                "latency_max": 0.0,
+                "recent": deque(maxlen=self.sample_size),
+            }
+        return metrics
+
+    def _record(self, name: str, latency: float, error: Exception | None) -> None:
+        metrics = self._method_metrics(name)
+        metrics["count"] += 1
+        metrics["latency_total"] += latency
+        metrics["latency_max"] = max(metrics["latency_max"], latency)
+        metrics["recent"].append(latency)
+        if error is not None:
+            error_name = type(error).__name__
+            metrics["errors"][error_name] = metrics["errors"].get(error_name, 0) + 1
+
+    def _retry_delay(self, error: Exception, attempt: int) -> float | None:
+        """Return how long to wait before retrying, or None if not retryable."""
+        if isinstance(error, TelegramRetryAfter):
+            if error.retry_after > self.settings.max_retry_after:
+                return None
+            return float(error.retry_after)
+        if isinstance(error, TelegramNetworkError | TelegramServerError):
+            backoff = self.settings.retry_backoff * 2**attempt
+            return random.uniform(backoff / 2, backoff)  # noqa: S311
+        return None
+
+    async def make_request(
+        self,
+        bot: Bot,
+        method: TelegramMethod[TelegramType],
+        timeout: int | None = None,  # noqa: ASYNC109
+    ) -> TelegramType:
+        name = method.__api_method__
+        retries = self.settings.retries if name in IDEMPOTENT_METHODS else 0
+        client_timeout = ClientTimeout(
+            total=self.timeout if timeout is None else timeout,
+            sock_connect=self.settings.connect_timeout,
+        )
+        attempt = 0
+        while True:
+            started = time.perf_counter()
+            try:
+                result = await super().make_request(bot, method, client_timeout)
+            except Exception as e:
+                self._record(name, time.perf_counter() - started, e)
+                delay = self._retry_delay(e, attempt)
+                if delay is None or attempt >= retries:
+                    raise
+                self._metrics[name]["retries"] += 1
+                attempt += 1
+                await asyncio.sleep(delay)
+            else:
+                self._record(name, time.perf_counter() - started, None)
+                return result
+
+    def stats(self) -> dict[str, dict]:
+        """Return latency and error summaries per API method, busiest first."""
+        result = {}
+        for name, metrics in sorted(
+            self._metrics.items(),
+            key=lambda item: item[1]["count"],
+            reverse=True,
+        ):
+            recent = sorted(metrics["recent"])
+            count = metrics["count"]
+            result[name] = {
+                "count": count,
+                "errors": dict(metrics["errors"]),
+                "retries": metrics["retries"],
+                "avg": metrics["latency_total"] / count,
+                "max": metrics["latency_max"],
+                "p50": recent[len(recent) // 2],
+                "p99": recent[min(len(recent) - 1, int(len(recent) * 0.99))],
+            }
+        return result
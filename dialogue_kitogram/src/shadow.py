@@ -0,0 +1,132 @@
+"""Shadow-mode evaluation of a candidate spam model on live traffic."""
+
+import asyncio
+import contextlib
+from collections import deque
+from dataclasses import dataclass
+
+from loguru import logger
+
+from .core.base_model import SpamModel
+from .core.base_storage import BotStorage
+
+# Keep the disagreement table compact: only a prefix of the text is stored
+TEXT_PREVIEW_LENGTH = 200
+
+
+@dataclass(slots=True)
+class ShadowSample:
+    """A message already scored by the primary model, queued for the shadow."""
+
+    chat_id: int
+    message_id: int
+    text: str
+    primary_probability: float
+    adjustment: float
+    threshold: float
+
+
+class ShadowEvaluator:
+    """Score messages with a shadow model in the background.
+
+    Samples are pushed into a bounded queue by the hot path and scored by a
+    single worker task. When the queue is full, new samples are dropped so
+    the primary moderation flow never waits on the shadow model.
+    """
+
+    def __init__(
+        self,
+        model: SpamModel,
+        db: BotStorage,
+        queue_size: int = 1000,
+        recent_size: int = 10,
+    ) -> None:
+        self.model = model
+        self.db = db
+        self._queue: asyncio.Queue[ShadowSample] = asyncio.Queue(maxsize=queue_size)
+        self._task: asyncio.Task | None = None
+        self.scored = 0
+        self.agreed = 0
+        self.shadow_only_spam = 0
+        self.primary_only_spam = 0
+        self.dropped = 0
+        self.errors = 0
+        self.recent_disagreements: deque[tuple[ShadowSample, float]] = deque(
+            maxlen=recent_size,
+        )
+
+    def submit(self, sample: ShadowSample) -> bool:
+        """Queue a sample for shadow scoring. Returns False if it was dropped."""
+        try:
+            self._queue.put_nowait(sample)
+        except asyncio.QueueFull:
+            self.dropped += 1
+            return False
+        return True
+
+    def start(self) -> None:
+        """Start the background scoring worker."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(), name="shadow-evaluator")
+
+    async def stop(self) -> None:
+        """Stop the background worker, discarding pending samples."""
+        if self._task is None:
+            return
+        self._task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await self._task
+        self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            sample = await self._queue.get()
+            try:
+                await self._evaluate(sample)
+            except Exception as e:
+                self.errors += 1
+                logger.exception("Shadow evaluation failed: {}", e)
+            finally:
+                self._queue.task_done()
+
+    async def _evaluate(self, sample: ShadowSample) -> None:
+        # Inference runs in a worker thread to keep the event loop responsive
+        raw_probability = await asyncio.to_thread(
+            self.model.predict_proba,
+            sample.text,
+        )
+        shadow_probability = raw_probability + sample.adjustment
+        primary_is_spam = sample.primary_probability > sample.threshold
+        shadow_is_spam = shadow_probability > sample.threshold
+
+        self.scored += 1
+        if primary_is_spam == shadow_is_spam:
+            self.agreed += 1
+            return
+
+        if shadow_is_spam:
+            self.shadow_only_spam += 1
+        else:
+            self.primary_only_spam += 1
+        self.recent_disagreements.append((sample, shadow_probability))
+        await self.db.record_shadow_disagreement(
+            chat_id=sample.chat_id,
+            message_id=sample.message_id,
+            primary_probability=sample.primary_probability,
+            shadow_probability=shadow_probability,
+            threshold=sample.threshold,
+            text_preview=sample.text[:TEXT_PREVIEW_LENGTH],
+        )
+
+    def stats(self) -> dict:
+        """Return agreement statistics since the evaluator was started."""
+        return {
+            "scored": self.scored,
+            "agreed": self.agreed,
+            "agreement_rate": self.agreed / self.scored if self.scored else 0.0,
+            "shadow_only_spam": self.shadow_only_spam,
+            "primary_only_spam": self.primary_only_spam,
+            "dropped": self.dropped,
+            "errors": self.errors,
+            "queue_depth": self._queue.qsize(),
+        }
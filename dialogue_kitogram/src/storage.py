@@ -0,0 +1,23 @@
+"""Storage backend selection."""
+
+from .bot_database import BotMessageDatabase
+from .config import get_memory_storage_capacity, get_storage_backend
+from .core.base_storage import BotStorage
+from .memory_storage import MemoryBotStorage
+
+STORAGE_BACKENDS = ("sqlite", "memory")
+
+
+def create_storage(backend: str | None = None, bot_id: int = 0) -> BotStorage:
+    """Create the storage backend named by `backend` or `STORAGE_BACKEND`.
+
+    `bot_id` scopes the data of one bot in a database shared by several bots.
+    Memory storage is never shared, so every instance is isolated already.
+    """
+    backend = (backend or get_storage_backend()).lower()
+    if backend == "sqlite":
+        return BotMessageDatabase(bot_id=bot_id)
+    if backend == "memory":
+        return MemoryBotStorage(capacity=get_memory_storage_capacity())
+    msg = f"Unknown storage backend {backend!r}, expected one of {STORAGE_BACKENDS}"
+    raise ValueError(msg)
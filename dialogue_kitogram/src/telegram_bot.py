@@ -1,41 +1,135 @@
 """Telegram bot for detecting and deleting bot messages using spam detection."""
 
 import asyncio
+import contextlib
+from collections.abc import Awaitable, Callable
 
 from aiogram import Bot, Dispatcher, F
+from aiogram.client.telegram import TelegramAPIServer
 from aiogram.enums import ChatType
 from aiogram.filters import Command
 from aiogram.types import Message
+from aiogram.utils.token import extract_bot_id
 from loguru import logger
 
 from dialogue_kitogram.src.fastspam.ft_model import FastTextSpamModel, ModelConfig
 
-from .bot_database import BotMessageDatabase
-from .config import get_admin_user_ids, get_spam_threshold, get_telegram_token
-
-# TODO: make configurable via env
-MIN_WORD_COUNT_FOR_SPAM_CHECK = 5
+from .admin_commands import AdminCommands, require_admin_dm
+from .config import (
+    get_admin_user_ids,
+    get_extra_telegram_tokens,
+    get_max_concurrent_updates,
+    get_max_pending_low_priority,
+    get_max_pending_normal_priority,
+    get_min_word_count,
+    get_shadow_model_path,
+    get_shadow_queue_size,
+    get_spam_threshold,
+    get_telegram_api_url,
+    get_telegram_token,
+)
+from .core.base_model import SpamModel
+from .core.base_storage import BotStorage
+from .log_config import should_log_ham
+from .model_registry import ModelRegistry
+from .policy import ChatPolicy, PolicyTable, heuristic_penalty
+from .profiling import HandlerTimingMiddleware, ProfilingSession
+from .raid import RaidDetector, RaidSettings
+from .recent_index import PurgeSettings, RecentMessageIndex
+from .response_cache import ResponseCache, ResponseCacheSettings
+from .scheduler import UpdateScheduler
+from .session import InstrumentedAiohttpSession, SessionSettings
+from .shadow import ShadowEvaluator, ShadowSample
+from .storage import create_storage
+from .watchdog import LoopWatchdog, WatchdogSettings
+
+# Telegram accepts at most this many message ids per deleteMessages call
+DELETE_MESSAGES_BATCH_SIZE = 100
 
 
 class SpamDetectionBot:
     """Telegram bot that detects and removes spam/bot messages."""
 
-    def __init__(self, token: str, spam_threshold: float = 0.95) -> None:
-        self.bot = Bot(token=token)
+    def __init__(  # noqa: PLR0913
+        self,
+        token: str,
+        spam_threshold: float = 0.95,
+        *,
+        shadow_model_path: str | None = None,
+        storage: BotStorage | None = None,
+        api_url: str | None = None,
+        spam_model: SpamModel | None = None,
+        shadow_model: SpamModel | None = None,
+        watchdog: LoopWatchdog | None = None,
+        profiling: ProfilingSession | None = None,
+    ) -> None:
+        """Create a bot.
+
+        Pass `spam_model` (and `shadow_model`) to share already loaded models
+        between several bots in one process instead of loading new copies,
+        `watchdog` to measure their shared event loop only once, and
+        `profiling` to share the process-wide profiler between them.
+        """
+        # Tuned connection pool, retries and per-method metrics for API calls
+        self.http = InstrumentedAiohttpSession(SessionSettings.from_env())
+        if api_url:
+            self.http.api = TelegramAPIServer.from_base(api_url)
+        self.bot = Bot(token=token, session=self.http)
         self.dp = Dispatcher()
         self.spam_threshold = spam_threshold
-        self.db = BotMessageDatabase()
+        self.db = storage or create_storage()
+        self.policies = PolicyTable(
+            default_threshold=spam_threshold,
+            default_min_word_count=get_min_word_count(),
+        )
+        self.raid = RaidDetector(RaidSettings.from_env())
+        # Recent messages per user, to purge a caught spammer everywhere
+        self.recent = RecentMessageIndex(PurgeSettings.from_env())
+
+        # Initialize spam detection model, routed per language if configured
+        if spam_model is None:
+            spam_model = ModelRegistry.from_env()
+            spam_model.load()
+        self.spam_model = spam_model
+
+        # Optional candidate model scored off the hot path for comparison
+        self.shadow: ShadowEvaluator | None = None
+        if shadow_model is None and shadow_model_path:
+            shadow_model = FastTextSpamModel(ModelConfig(model_name=shadow_model_path))
+            shadow_model.load()
+            logger.info("Shadow model loaded from {}", shadow_model.cfg.model_path)
+        if shadow_model is not None:
+            self.shadow = ShadowEvaluator(
+                shadow_model,
+                self.db,
+                queue_size=get_shadow_queue_size(),
+            )
 
-        # Initialize spam detection model
-        cfg = ModelConfig()
-        self.spam_model = FastTextSpamModel(cfg)
-        self.spam_model.load()
+        # Cap concurrent handlers and run admin traffic first
+        self.scheduler = UpdateScheduler(
+            set(get_admin_user_ids()),
+            max_concurrency=get_max_concurrent_updates(),
+            max_pending_low=get_max_pending_low_priority(),
+            max_pending_normal=get_max_pending_normal_priority(),
+        )
+        self.dp.update.outer_middleware(self.scheduler)
+
+        self.timings = HandlerTimingMiddleware()
+        # cProfile covers the whole process, so bots in one process share it
+        self.profiling = profiling or ProfilingSession()
+        # Formatted /stats, /recent and /allowed, rebuilt only after writes
+        self.responses = ResponseCache(ResponseCacheSettings.from_env())
+        self.watchdog = watchdog or LoopWatchdog(WatchdogSettings.from_env())
+        self.admin_commands = AdminCommands(self)
 
         # Setup handlers
         self._setup_handlers()
 
     def _setup_handlers(self) -> None:
         """Setup message and command handlers."""
+        # Time every message handler, including commands
+        self.dp.message.middleware(self.timings)
+        self.admin_commands.register(self.dp)
 
         @self.dp.message(Command("start"))
         async def start_command(message: Message) -> None:
@@ -71,6 +165,8 @@ async def allow_command(message: Message) -> None:
                     title=title,
                     added_by_admin_id=message.from_user.id,
                 )
+                await self.policies.refresh(self.db, target_chat_id)
+                self.responses.clear("allowed")
                 await message.reply(f"Allowed chat {target_chat_id}.")
             else:
                 # In a group/supergroup context, allow current chat
@@ -82,6 +178,8 @@ async def allow_command(message: Message) -> None:
                     title=getattr(message.chat, "title", None),
                     added_by_admin_id=message.from_user.id,
                 )
+                await self.policies.refresh(self.db, message.chat.id)
+                self.responses.clear("allowed")
                 await message.reply("This chat is now allowed.")
 
         @self.dp.message(Command("disallow"))
@@ -108,6 +206,8 @@ async def disallow_command(message: Message) -> None:
             else:
                 target_chat_id = message.chat.id
             removed = await self.db.remove_allowed_chat(target_chat_id)
+            await self.policies.refresh(self.db, target_chat_id)
+            self.responses.clear("allowed")
             if removed:
                 await message.reply(f"Disallowed chat {target_chat_id}.")
             else:
@@ -116,55 +216,29 @@ async def disallow_command(message: Message) -> None:
         @self.dp.message(Command("allowed"))
         async def allowed_command(message: Message) -> None:
             """List allowed chats. Only admins via DM."""
-            admin_ids = set(get_admin_user_ids())
-            if (
-                message.chat.type != ChatType.PRIVATE
-                or message.from_user.id not in admin_ids
-            ):
-                await message.reply("Not authorized.")
-                return
-            rows = await self.db.list_allowed_chats()
-            if not rows:
-                await message.reply("No allowed chats.")
+            if not await require_admin_dm(message):
                 return
-            lines = [
-                f"{row['chat_id']} — {row.get('title') or ''} (by {row.get('added_by_admin_id')})"
-                for row in rows
-            ]
-            await message.reply("Allowed chats:\n" + "\n".join(lines))
+            await message.reply(
+                await self.responses.get("allowed", None, self._format_allowed),
+            )
 
         @self.dp.message(Command("stats"))
         async def stats_command(message: Message) -> None:
-            """Handle /stats command to show detection statistics."""
-            stats = await self.db.get_stats()
-            response = (
-                f"📊 Detection Statistics:\n"
-                f"Total detections: {stats['total_detections']}\n"
-                f"Messages deleted: {stats['deleted_messages']}\n"
-                f"Average spam probability: {stats['avg_spam_probability']:.2%}\n"
-                f"Max spam probability: {stats['max_spam_probability']:.2%}"
-            )
-            await message.reply(response)
+            """Handle /stats command to show detection statistics.
+
+            Usage: /stats [chat_id] (all chats by default; one chat only for
+            admins via DM)
+            """
+            await self._reply_scoped(message, "stats", self._format_stats)
 
         @self.dp.message(Command("recent"))
         async def recent_command(message: Message) -> None:
-            """Handle /recent command to show recent detections."""
-            recent = await self.db.get_recent_detections(limit=5)
-            if not recent:
-                await message.reply("No recent detections found.")
-                return
+            """Handle /recent command to show recent detections.
 
-            response = "🔍 Recent detections:\n\n"
-            for detection in recent:
-                response += (
-                    f"User: {detection['username'] or 'Unknown'}\n"
-                    f"Probability: {detection['spam_probability']:.2%}\n"
-                    f"Text: {detection['text_content'][:50]}...\n"
-                    f"Deleted: {'✅' if detection['was_deleted'] else '❌'}\n"
-                    f"Manual: {'✅' if detection.get('was_manual') else '❌'}\n"
-                    f"Time: {detection['detection_timestamp']}\n\n"
-                )
-            await message.reply(response)
+            Usage: /recent [chat_id] (all chats by default; one chat only for
+            admins via DM)
+            """
+            await self._reply_scoped(message, "recent", self._format_recent)
 
         @self.dp.message(Command("del"))
         async def delete_by_reply_command(message: Message) -> None:
@@ -187,10 +261,11 @@ async def delete_by_reply_command(message: Message) -> None:
                 await self.bot.delete_message(message.chat.id, replied.message_id)
                 # Compute original spam probability for the replied message
                 replied_text = replied.text or replied.caption or ""
+                policy = self.policies.get(message.chat.id) or self.policies.default
                 replied_spam_probability = (
                     self.spam_model.predict_proba(replied_text)
                     if "\n" in replied_text.strip()
-                    or len(replied_text.strip().split()) > MIN_WORD_COUNT_FOR_SPAM_CHECK
+                    or len(replied_text.strip().split()) > policy.min_word_count
                     else 0.0
                 )
                 # Record manual deletion in the database
@@ -212,6 +287,13 @@ async def delete_by_reply_command(message: Message) -> None:
                     was_deleted=True,
                     was_manual=True,
                 )
+                self._detections_changed(message.chat.id)
+                if replied.from_user:
+                    await self._purge_user(
+                        replied.from_user.id,
+                        chat_id=message.chat.id,
+                        skip_ids=[replied.message_id],
+                    )
                 # Try to remove the /del command message to keep chat clean (best-effort)
                 try:
                     await self.bot.delete_message(message.chat.id, message.message_id)
@@ -225,9 +307,12 @@ async def delete_by_reply_command(message: Message) -> None:
         async def process_text_message(message: Message) -> None:
             """Process incoming text messages for spam detection."""
             # Enforce allowed chats for group/supergroup channels; allow DMs for admins
+            policy = self.policies.default
             if message.chat.type in {ChatType.GROUP, ChatType.SUPERGROUP}:
-                if not await self.db.is_chat_allowed(message.chat.id):
+                chat_policy = self.policies.get(message.chat.id)
+                if chat_policy is None:
                     return
+                policy = chat_policy
             elif message.chat.type == ChatType.PRIVATE:
                 # Only respond to admins in DM; others get a short notice
                 if message.from_user.id not in set(get_admin_user_ids()):
@@ -235,7 +320,12 @@ async def process_text_message(message: Message) -> None:
                         "Hi! Ask an admin to add your group via /allow.",
                     )
                     return
-            await self._check_and_handle_message(message)
+            await self._check_and_handle_message(message, policy)
+
+        @self.dp.message(F.new_chat_members)
+        async def process_new_members(message: Message) -> None:
+            """Track joins in allowed chats for raid detection."""
+            self._record_joins(message)
 
         @self.dp.message()
         async def process_other_messages(message: Message) -> None:
@@ -247,7 +337,11 @@ async def process_other_messages(message: Message) -> None:
                 message.chat.type,
             )
 
-    async def _check_and_handle_message(self, message: Message) -> None:
+    async def _check_and_handle_message(
+        self,
+        message: Message,
+        policy: ChatPolicy,
+    ) -> None:
         """Check message for spam and handle accordingly."""
         try:
             # Skip messages from bot itself and commands
@@ -261,49 +355,303 @@ async def _check_and_handle_message(self, message: Message) -> None:
                 return
 
             # Get spam probability
-            spam_probability = self.spam_model.predict_proba(text_content)
-            if "\n" in text_content:
-                spam_probability -= 0.1
-            if len(text_content.split()) > MIN_WORD_COUNT_FOR_SPAM_CHECK:
-                spam_probability -= 0.1
+            raw_spam_probability = self.spam_model.predict_proba(text_content)
+            spam_probability = raw_spam_probability - heuristic_penalty(
+                text_content,
+                policy,
+            )
 
-            logger.info(
-                f"Message from {message.from_user.username}: "
-                f"spam_probability={spam_probability:.3f}, "
-                f"threshold={self.spam_threshold}",
+            threshold, burst_ids = self._record_rates(
+                message,
+                text_content,
+                spam_probability,
+                policy.spam_threshold,
             )
 
+            if self.shadow is not None:
+                self.shadow.submit(
+                    ShadowSample(
+                        chat_id=message.chat.id,
+                        message_id=message.message_id,
+                        text=text_content,
+                        primary_probability=spam_probability,
+                        adjustment=spam_probability - raw_spam_probability,
+                        threshold=policy.spam_threshold,
+                    ),
+                )
+
+            is_spam = spam_probability > threshold
+            # Detections are always logged; ham is sampled to keep logging cheap
+            if is_spam or should_log_ham():
+                logger.info(
+                    "Message from {}: spam_probability={:.3f}, threshold={}",
+                    message.from_user.username,
+                    spam_probability,
+                    threshold,
+                )
+
+            # A burst is a rate-limit deletion in one batched call: it is not
+            # recorded as a detection and does not purge or ban the authors
+            other_burst_ids = [
+                i for i in burst_ids if not is_spam or i != message.message_id
+            ]
+            if other_burst_ids:
+                await self._delete_burst(message.chat.id, other_burst_ids, policy)
+
             # If probability is above threshold, delete message and record it
-            if spam_probability > self.spam_threshold:
-                was_deleted = False
-                try:
-                    await self.bot.delete_message(message.chat.id, message.message_id)
-                    was_deleted = True
-                    logger.info(
-                        f"Deleted bot message from {message.from_user.username} "
-                        f"with probability {spam_probability:.3f}",
+            if is_spam:
+                await self._delete_spam(message, text_content, spam_probability, policy)
+                if not policy.dry_run and message.chat.type != ChatType.PRIVATE:
+                    await self._purge_user(
+                        message.from_user.id,
+                        chat_id=message.chat.id,
+                        skip_ids=[message.message_id, *burst_ids],
                     )
-                except Exception as e:
-                    logger.exception("Failed to delete message: {}", e)
 
-                # Record in database
-                await self.db.record_bot_message(
-                    message_id=message.message_id,
-                    chat_id=message.chat.id,
-                    user_id=message.from_user.id,
-                    username=message.from_user.username,
-                    text_content=text_content,
-                    spam_probability=spam_probability,
-                    was_deleted=was_deleted,
+        except Exception as e:
+            logger.exception("Error processing message: {}", e)
+
+    def _record_joins(self, message: Message) -> None:
+        if self.policies.get(message.chat.id) is None:
+            return
+        for member in message.new_chat_members:
+            if self.raid.record_join(message.chat.id, member.id):
+                logger.warning(
+                    "Join burst in chat {}, raid mode enabled",
+                    message.chat.id,
+                )
+
+    def _record_rates(
+        self,
+        message: Message,
+        text_content: str,
+        spam_probability: float,
+        threshold: float,
+    ) -> tuple[float, list[int]]:
+        """Track chat/user rates of a group message.
+
+        Returns the threshold, lowered during a raid, and the ids of a
+        message burst to delete.
+        """
+        if message.chat.type == ChatType.PRIVATE:
+            return threshold, []
+        self.recent.record(
+            message.from_user.id,
+            message.chat.id,
+            message.message_id,
+        )
+        # Admins are never rate limited
+        if message.from_user.id in get_admin_user_ids():
+            return threshold, []
+        burst_ids = self.raid.record_message(
+            chat_id=message.chat.id,
+            user_id=message.from_user.id,
+            message_id=message.message_id,
+            text=text_content,
+            spam_probability=spam_probability,
+        )
+        return self.raid.threshold_for(message.chat.id, threshold), burst_ids
+
+    async def _delete_burst(
+        self,
+        chat_id: int,
+        message_ids: list[int],
+        policy: ChatPolicy,
+    ) -> None:
+        if policy.dry_run:
+            logger.info(
+                "Dry run: would delete {} burst messages in chat {}",
+                len(message_ids),
+                chat_id,
+            )
+            return
+        await self._delete_messages(chat_id, message_ids)
+
+    async def _delete_spam(
+        self,
+        message: Message,
+        text_content: str,
+        spam_probability: float,
+        policy: ChatPolicy,
+    ) -> None:
+        """Delete a detected message, unless in dry run, and record it."""
+        was_deleted = False
+        if policy.dry_run:
+            logger.info(
+                "Dry run: would delete message {} in chat {}",
+                message.message_id,
+                message.chat.id,
+            )
+        else:
+            try:
+                await self.bot.delete_message(
+                    message.chat.id,
+                    message.message_id,
+                )
+                was_deleted = True
+                logger.info(
+                    "Deleted bot message from {} with probability {:.3f}",
+                    message.from_user.username,
+                    spam_probability,
                 )
+            except Exception as e:
+                logger.exception("Failed to delete message: {}", e)
+
+        # Record in database
+        await self.db.record_bot_message(
+            message_id=message.message_id,
+            chat_id=message.chat.id,
+            user_id=message.from_user.id,
+            username=message.from_user.username,
+            text_content=text_content,
+            spam_probability=spam_probability,
+            was_deleted=was_deleted,
+        )
+        self._detections_changed(message.chat.id)
+
+    async def _purge_user(
+        self,
+        user_id: int,
+        *,
+        chat_id: int,
+        skip_ids: list[int],
+    ) -> int:
+        """Delete a caught spammer's recent messages in all moderated chats.
+
+        Uses the in-memory recent-message index, one bulk delete per chat.
+        `skip_ids` in `chat_id` are already handled by the caller. With
+        PURGE_BAN_USERS the user is also banned in those chats. Chats in dry
+        run mode are left alone. Returns the number of ids submitted.
+        """
+        if not self.recent.enabled or user_id in set(get_admin_user_ids()):
+            return 0
+        by_chat = self.recent.pop_user(user_id)
+        by_chat.setdefault(chat_id, [])
+        skipped = set(skip_ids)
+
+        deletions = []
+        chats = []
+        for target_chat_id, message_ids in by_chat.items():
+            policy = self.policies.get(target_chat_id)
+            if policy is None or policy.dry_run:
+                continue
+            chats.append(target_chat_id)
+            ids = [
+                i for i in message_ids if target_chat_id != chat_id or i not in skipped
+            ]
+            if ids:
+                deletions.append(self._delete_messages(target_chat_id, ids))
+        deleted = sum(await asyncio.gather(*deletions))
 
+        if self.recent.settings.ban:
+            await asyncio.gather(
+                *(self._ban_user(target_chat_id, user_id) for target_chat_id in chats),
+            )
+        if deleted:
+            logger.info(
+                "Purged {} recent messages of user {} across {} chats",
+                deleted,
+                user_id,
+                len(deletions),
+            )
+        return deleted
+
+    async def _ban_user(self, chat_id: int, user_id: int) -> None:
+        try:
+            await self.bot.ban_chat_member(chat_id, user_id)
+            logger.info("Banned user {} in chat {}", user_id, chat_id)
         except Exception as e:
-            logger.exception("Error processing message: {}", e)
+            logger.exception(
+                "Failed to ban user {} in chat {}: {}",
+                user_id,
+                chat_id,
+                e,
+            )
+
+    def _detections_changed(self, chat_id: int) -> None:
+        """Mark cached /stats and /recent of the chat and of all chats stale."""
+        self.responses.invalidate("stats", chat_id)
+        self.responses.invalidate("recent", chat_id)
+
+    async def _reply_scoped(
+        self,
+        message: Message,
+        command: str,
+        build: Callable[[int | None], Awaitable[str]],
+    ) -> None:
+        """Reply with the cached response of all chats or of the given chat."""
+        args = (message.text or "").split()[1:]
+        if args and not await require_admin_dm(message):
+            return
+        try:
+            chat_id = int(args[0]) if args else None
+        except ValueError:
+            await message.reply("chat_id must be an integer")
+            return
+        await message.reply(
+            await self.responses.get(command, chat_id, lambda: build(chat_id)),
+        )
+
+    async def _format_stats(self, chat_id: int | None) -> str:
+        stats = await self.db.get_stats(chat_id=chat_id)
+        scope = f" in chat {chat_id}" if chat_id is not None else ""
+        return (
+            f"📊 Detection Statistics{scope}:\n"
+            f"Total detections: {stats['total_detections']}\n"
+            f"Messages deleted: {stats['deleted_messages']}\n"
+            f"Average spam probability: {stats['avg_spam_probability']:.2%}\n"
+            f"Max spam probability: {stats['max_spam_probability']:.2%}"
+        )
+
+    async def _format_recent(self, chat_id: int | None) -> str:
+        recent = await self.db.get_recent_detections(limit=5, chat_id=chat_id)
+        if not recent:
+            return "No recent detections found."
+        scope = f" in chat {chat_id}" if chat_id is not None else ""
+        response = f"🔍 Recent detections{scope}:\n\n"
+        for detection in recent:
+            response += (
+                f"User: {detection.username or 'Unknown'}\n"
+                f"Probability: {detection.spam_probability:.2%}\n"
+                f"Text: {(detection.text_content or '')[:50]}...\n"
+                f"Deleted: {'✅' if detection.was_deleted else '❌'}\n"
+                f"Manual: {'✅' if detection.was_manual else '❌'}\n"
+                f"Time: {detection.detection_timestamp}\n\n"
+            )
+        return response
+
+    async def _format_allowed(self) -> str:
+        rows = await self.db.list_allowed_chats()
+        if not rows:
+            return "No allowed chats."
+        lines = [
+            f"{row.chat_id} — {row.title or ''} (by {row.added_by_admin_id})"
+            for row in rows
+        ]
+        return "Allowed chats:\n" + "\n".join(lines)
+
+    async def _delete_messages(self, chat_id: int, message_ids: list[int]) -> int:
+        """Bulk delete messages in a chat. Returns the number of ids submitted."""
+        deleted = 0
+        for i in range(0, len(message_ids), DELETE_MESSAGES_BATCH_SIZE):
+            batch = message_ids[i : i + DELETE_MESSAGES_BATCH_SIZE]
+            try:
+                await self.bot.delete_messages(chat_id, batch)
+                deleted += len(batch)
+            except Exception as e:
+                logger.exception("Failed to bulk delete messages: {}", e)
+        logger.info("Bulk deleted {} messages in chat {}", deleted, chat_id)
+        return deleted
 
     async def start(self) -> None:
         """Start the bot."""
         await self.db.init_database()
         logger.info("Bot database initialized")
+        await self.policies.load(self.db)
+        logger.info("Loaded policies for {} allowed chats", len(self.policies))
+        if self.shadow is not None:
+            self.shadow.start()
+        self.watchdog.start()
 
         logger.info("Starting bot...")
         await self.dp.start_polling(self.bot)
@@ -311,6 +659,11 @@ async def start(self) -> None:
     async def stop(self) -> None:
         """Stop the bot."""
         logger.info("Stopping bot...")
+        if self.shadow is not None:
+            await self.shadow.stop()
+        await self.watchdog.stop()
+        # Flush enqueued log records before shutdown
+        await logger.complete()
         await self.bot.session.close()
 
 
@@ -325,14 +678,63 @@ async def main() -> None:
 
     # Create and start bot
     spam_threshold = get_spam_threshold()
-    bot = SpamDetectionBot(token, spam_threshold=spam_threshold)
+    api_url = get_telegram_api_url()
+    bot = SpamDetectionBot(
+        token,
+        spam_threshold=spam_threshold,
+        shadow_model_path=get_shadow_model_path(),
+        api_url=api_url,
+    )
+
+    # Additional bots share the loaded models and the database file, with
+    # their chats and detections scoped by bot id
+    bots = [bot]
+    bots.extend(
+        SpamDetectionBot(
+            extra_token,
+            spam_threshold=spam_threshold,
+            storage=create_storage(bot_id=extract_bot_id(extra_token)),
+            api_url=api_url,
+            spam_model=bot.spam_model,
+            shadow_model=bot.shadow.model if bot.shadow else None,
+            watchdog=bot.watchdog,
+            profiling=bot.profiling,
+        )
+        for extra_token in get_extra_telegram_tokens()
+    )
 
     try:
-        await bot.start()
+        if len(bots) == 1:
+            await bot.start()
+        else:
+            await run_bots(bots)
     except KeyboardInterrupt:
         logger.info("Bot stopped by user")
     finally:
-        await bot.stop()
+        for running_bot in bots:
+            await running_bot.stop()
+
+
+async def run_bots(bots: list[SpamDetectionBot]) -> None:
+    """Poll several bots on one event loop until any of them stops.
+
+    Each bot keeps its own Dispatcher rather than one `start_polling(*bots)`:
+    the handlers are closures and methods over one bot's storage scope,
+    policies, response cache and admin state, so a shared dispatcher would
+    route every bot's updates into the first bot's state.
+    """
+    # Migrate the shared schema once before the bots initialize concurrently
+    await bots[0].db.init_database()
+    logger.info("Running {} bots", len(bots))
+    tasks = [asyncio.create_task(bot.start()) for bot in bots]
+    # Only the last dispatcher receives stop signals, so stop the rest with it
+    done, pending = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+    for bot in bots:
+        with contextlib.suppress(RuntimeError):
+            await bot.dp.stop_polling()
+    await asyncio.gather(*pending, return_exceptions=True)
+    for task in done:
+        task.result()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,161 @@
+"""Content-addressed, compressed storage of message texts.
+
+Texts are stored once per distinct content, keyed by a hash, and compressed
+with zlib using a preset dictionary trained on previously seen spam. Spam is
+highly repetitive, so both deduplication and the shared dictionary cut the
+database size considerably.
+
+Usage:
+    python -m dialogue_kitogram.src.text_store --train-dictionary --migrate --vacuum
+"""
+
+import argparse
+import asyncio
+import hashlib
+import zlib
+from collections import Counter
+from collections.abc import Iterable
+from pathlib import Path
+
+# zlib only uses the last 32 KiB of a preset dictionary
+MAX_DICTIONARY_SIZE = 32 * 1024
+COMPRESSION_LEVEL = 9
+
+
+def text_hash(text: str) -> bytes:
+    """Return the content key of a text."""
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
+
+
+def compress_text(text: str, dictionary: bytes | None = None) -> bytes:
+    """Compress a text, optionally with a preset dictionary."""
+    if dictionary:
+        compressor = zlib.compressobj(COMPRESSION_LEVEL, zdict=dictionary)
+    else:
+        compressor = zlib.compressobj(COMPRESSION_LEVEL)
+    return compressor.compress(text.encode("utf-8")) + compressor.flush()
+
+
+def decompress_text(data: bytes, dictionary: bytes | None = None) -> str:
+    """Decompress a text produced by `compress_text` with the same dictionary."""
+    if dictionary:
+        decompressor = zlib.decompressobj(zdict=dictionary)
+    else:
+        decompressor = zlib.decompressobj()
+    return (decompressor.decompress(data) + decompressor.flush()).decode("utf-8")
+
+
+def train_dictionary(
+    texts: Iterable[str],
+    size: int = MAX_DICTIONARY_SIZE,
+    max_ngram: int = 3,
+) -> bytes:
+    """Build a zlib preset dictionary from sample texts.
+
+    Word n-grams are ranked by how many bytes they would save (frequency times
+    length). The best ones are concatenated with the most valuable at the end,
+    where zlib can reference them with the shortest distances.
+    """
+    counts: Counter[str] = Counter()
+    for text in texts:
+        words = text.split()
+        for n in range(1, max_ngram + 1):
+            for i in range(len(words) - n + 1):
+                counts[" ".join(words[i : i + n])] += 1
+
+    scored = sorted(
+        (
+            (count * len(ngram.encode("utf-8")), ngram)
+            for ngram, count in counts.items()
+            if count > 1
+        ),
+        reverse=True,
+    )
+    selected: list[bytes] = []
+    used = 0
+    for _, ngram in scored:
+        encoded = ngram.encode("utf-8") + b" "
+        if used + len(encoded) > size:
+            continue
+        selected.append(encoded)
+        used += len(encoded)
+    return b"".join(reversed(selected))
+
+
+def _read_fasttext_spam(path: Path) -> list[str]:
+    with path.open("r", encoding="utf-8") as f:
+        return [
+            line.removeprefix("__label__spam").strip()
+            for line in f
+            if line.startswith("__label__spam")
+        ]
+
+
+async def _run(args: argparse.Namespace) -> None:
+    from .bot_database import BotMessageDatabase  # noqa: PLC0415
+
+    db = BotMessageDatabase(args.db)
+    await db.init_database()
+    # Keep file system calls off the event loop, like the database's own I/O
+    before = (await asyncio.to_thread(Path(db.db_path).stat)).st_size
+
+    if args.train_dictionary:
+        extra = [
+            text
+            for path in args.train_from
+            for text in await asyncio.to_thread(_read_fasttext_spam, path)
+        ]
+        dictionary_id = await db.train_text_dictionary(
+            sample_size=args.sample_size,
+            extra_texts=extra,
+        )
+        print(f"Trained compression dictionary #{dictionary_id}")
+    if args.migrate:
+        migrated = await db.migrate_text_content(batch_size=args.batch_size)
+        print(f"Moved {migrated} texts into the content table")
+    if args.vacuum:
+        await db.vacuum()
+
+    report = await db.get_text_storage_report()
+    after = (await asyncio.to_thread(Path(db.db_path).stat)).st_size
+    raw = report["raw_bytes"]
+    stored = report["stored_bytes"]
+    print(
+        f"Messages: {report['messages']}\n"
+        f"Distinct texts: {report['distinct_texts']}\n"
+        f"Raw text size: {raw} bytes\n"
+        f"Stored text size: {stored} bytes"
+        + (f" ({stored / raw:.1%} of raw)" if raw else "")
+        + f"\nDatabase file: {before} -> {after} bytes",
+    )
+
+
+def main() -> None:
+    """Command-line entry point."""
+    parser = argparse.ArgumentParser(description="Manage compressed text storage.")
+    parser.add_argument("--db", help="Database path (default: DB_PATH)")
+    parser.add_argument(
+        "--train-dictionary",
+        action="store_true",
+        help="Train a new compression dictionary from stored spam texts",
+    )
+    parser.add_argument(
+        "--train-from",
+        type=Path,
+        action="append",
+        default=[],
+        help="Extra FastText-format file whose __label__spam lines are used",
+    )
+    parser.add_argument("--sample-size", type=int, default=20000)
+    parser.add_argument(
+        "--migrate",
+        action="store_true",
+        help="Move inline text_content of existing rows into the content table",
+    )
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--vacuum", action="store_true", help="Reclaim free space")
+    asyncio.run(_run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,186 @@
+"""Event-loop lag measurement and capture of the code that blocks the loop."""
+
+import asyncio
+import contextlib
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from dataclasses import dataclass
+
+from loguru import logger
+
+from .config import get_env_float
+
+
+@dataclass(frozen=True, slots=True)
+class WatchdogSettings:
+    """Sampling interval and stall thresholds of the event-loop watchdog."""
+
+    interval: float = 0.1
+    stall_threshold: float = 0.5
+    capture_interval: float = 60.0
+
+    @classmethod
+    def from_env(cls) -> "WatchdogSettings":
+        """Build settings from `WATCHDOG_*` environment variables."""
+        defaults = cls()
+        return cls(
+            interval=get_env_float("WATCHDOG_INTERVAL", defaults.interval),
+            stall_threshold=get_env_float(
+                "WATCHDOG_STALL_THRESHOLD",
+                defaults.stall_threshold,
+            ),
+            capture_interval=get_env_float(
+                "WATCHDOG_CAPTURE_INTERVAL",
+                defaults.capture_interval,
+            ),
+        )
+
+
+class LoopWatchdog:
+    """Measure event-loop lag and log the stack of code that blocks the loop.
+
+    A task on the loop sleeps for `interval` and records how late it wakes
+    up; the last `sample_size` lags are kept for percentiles. A helper thread
+    checks that the task keeps waking up. Once the loop has been blocked for
+    `stall_threshold` seconds, the thread captures the loop thread's stack
+    while the blocking call is still running and logs it, at most once per
+    stall and once per `capture_interval` seconds. Stalls seen by the task
+    are counted, with a warning at most once per `capture_interval` seconds.
+    An interval of 0 disables the watchdog.
+    """
+
+    def __init__(
+        self,
+        settings: WatchdogSettings | None = None,
+        sample_size: int = 1000,
+    ) -> None:
+        self.settings = settings or WatchdogSettings()
+        self._task: asyncio.Task | None = None
+        self._thread: threading.Thread | None = None
+        self._stopping = threading.Event()
+        self._loop_thread_id: int | None = None
+        # Monotonic time of the last wake-up, written by the loop thread only
+        self._heartbeat = 0.0
+        self._captured_heartbeat = 0.0
+        self._last_capture = float("-inf")
+        self._last_warning = float("-inf")
+        self._recent: deque[float] = deque(maxlen=sample_size)
+        self.ticks = 0
+        self.lag_total = 0.0
+        self.lag_max = 0.0
+        self.stalls = 0
+        self.captures = 0
+        self.suppressed = 0
+        self.last_stack: str | None = None
+        self.last_stack_blocked = 0.0
+
+    def start(self) -> None:
+        """Start measuring on the running loop. Does nothing if already started."""
+        if self._task is not None or self.settings.interval <= 0:
+            return
+        self._loop_thread_id = threading.get_ident()
+        self._heartbeat = time.monotonic()
+        self._stopping.clear()
+        self._task = asyncio.create_task(self._run(), name="loop-watchdog")
+        self._thread = threading.Thread(
+            target=self._watch,
+            name="loop-watchdog",
+            daemon=True,
+        )
+        self._thread.start()
+
+    async def stop(self) -> None:
+        """Stop the measuring task and the helper thread."""
+        if self._task is None:
+            return
+        self._task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await self._task
+        self._task = None
+        self._stopping.set()
+        if self._thread is not None:
+            await asyncio.to_thread(self._thread.join)
+            self._thread = None
+
+    async def _run(self) -> None:
+        interval = self.settings.interval
+        while True:
+            expected = time.monotonic() + interval
+            await asyncio.sleep(interval)
+            now = time.monotonic()
+            self._heartbeat = now
+            lag = max(0.0, now - expected)
+            self.ticks += 1
+            self.lag_total += lag
+            self.lag_max = max(self.lag_max, lag)
+            self._recent.append(lag)
+            if lag < self.settings.stall_threshold:
+                continue
+            self.stalls += 1
+            # Every stall is counted, but warned about at most once per
+            # capture interval so a struggling loop does not flood the log
+            if now - self._last_warning < self.settings.capture_interval:
+                logger.debug("Event loop was blocked for {:.0f} ms", lag * 1000)
+                continue
+            logger.warning(
+                "Event loop was blocked for {:.0f} ms, stalls so far: {}",
+                lag * 1000,
+                self.stalls,
+            )
+            self._last_warning = now
+
+    def _watch(self) -> None:
+        """Capture the loop thread's stack during stalls. Runs in a thread."""
+        interval = self.settings.interval
+        while not self._stopping.wait(interval):
+            heartbeat = self._heartbeat
+            blocked = time.monotonic() - heartbeat - interval
+            if (
+                blocked < self.settings.stall_threshold
+                or heartbeat == self._captured_heartbeat
+            ):
+                continue
+            # One capture per stall, however long it lasts
+            self._captured_heartbeat = heartbeat
+            now = time.monotonic()
+            if now - self._last_capture < self.settings.capture_interval:
+                self.suppressed += 1
+                continue
+            frame = sys._current_frames().get(self._loop_thread_id)  # noqa: SLF001
+            if frame is None:
+                continue
+            self._last_capture = now
+            stack = "".join(traceback.format_stack(frame))
+            # Frames keep their locals alive, so do not hold on to it
+            del frame
+            self.captures += 1
+            self.last_stack = stack
+            self.last_stack_blocked = blocked
+            logger.warning(
+                "Event loop blocked for {:.0f} ms so far, "
+                "stack of the loop thread:\n{}",
+                blocked * 1000,
+                stack,
+            )
+
+    def stats(self) -> dict:
+        """Return lag percentiles, stall counts and the last captured stack."""
+        recent = sorted(self._recent)
+        return {
+            "running": self._task is not None,
+            "ticks": self.ticks,
+            "avg": self.lag_total / self.ticks if self.ticks else 0.0,
+            "p50": recent[len(recent) // 2] if recent else 0.0,
+            "p99": (
+                recent[min(len(recent) - 1, int(len(recent) * 0.99))] if recent else 0.0
+            ),
+            "max": self.lag_max,
+            "stalls": self.stalls,
+            "captures": self.captures,
+            "suppressed": self.suppressed,
+            "last_stack": self.last_stack,
+            "last_stack_blocked": self.last_stack_blocked,
+        }
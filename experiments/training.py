@@ -8,12 +8,14 @@
 def _():
     import marimo as mo
     import pandas as pd
+
     return mo, pd
 
 
 @app.cell
 def _():
     from dialogue_kitogram.src.fastspam.ft_model import FastTextSpamModel, ModelConfig
+
     return FastTextSpamModel, ModelConfig
 
 
@@ -39,6 +41,7 @@ def predict(text: str):
                 },
             ).to_html(index=False),
         )
+
     return (predict,)
 
 
@@ -50,33 +53,14 @@ def _(predict):
 
 
 @app.cell
-def _(pd):
-    df = pd.read_parquet(
-        "hf://datasets/alt-gnome/telegram-spam/data/train-00000-of-00001.parquet",
-    )
-
-    df["text"] = df.apply(
-        lambda row: "__label_ham " + row["text"]
-        if row["label"] == 0
-        else "__label_spam " + row["text"],
-        axis=1,
-    )
-    return (df,)
-
-
-@app.cell
-def _(df):
-    df
-    return
-
+def _():
+    from dialogue_kitogram.src.importer import import_dataset
 
-@app.cell
-def _(df):
-    df["text"].to_csv(
-        "./dialogue_kitogram/data/labeled_dataset_from_hf.txt",
-        index=False,
-        header=False,
+    import_stats = import_dataset(
+        "hf://datasets/alt-gnome/telegram-spam/data/train-00000-of-00001.parquet",
+        "labeled_dataset_from_hf.txt",
     )
+    import_stats
     return
 
 
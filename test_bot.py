@@ -1,14 +1,61 @@
 """Test script for the spam detection functionality."""
 
 import asyncio
+import contextlib
+import csv
+import json
+import os
+import random
 import tempfile
+import threading
+import time
+from datetime import UTC, datetime
 from pathlib import Path
 
+import aiosqlite
+import fasttext
+import numpy as np
+from aiogram import Bot
+from aiogram.client.telegram import TelegramAPIServer
+from aiogram.dispatcher.event.handler import HandlerObject
+from aiogram.enums import ChatType
+from aiogram.exceptions import TelegramServerError
+from aiogram.types import Chat, Message, TelegramObject, Update, User
 from loguru import logger
 
-from dialogue_kitogram.src import log_config  # noqa: F401
+from benchmarks.fake_bot_api import FakeBotAPI, FaultSettings
+from dialogue_kitogram.src import log_config
+from dialogue_kitogram.src.admin_commands import format_shadow
+from dialogue_kitogram.src.backfill import backfill
 from dialogue_kitogram.src.bot_database import BotMessageDatabase
+from dialogue_kitogram.src.core.base_model import SpamModel
+from dialogue_kitogram.src.core.base_storage import BotStorage
+from dialogue_kitogram.src.core.records import DetectionRecord
+from dialogue_kitogram.src.evaluate import best_f1, compute_curves, metrics_at
+from dialogue_kitogram.src.export import _parse_datetime, export_detections
 from dialogue_kitogram.src.fastspam.ft_model import FastTextSpamModel, ModelConfig
+from dialogue_kitogram.src.importer import convert_batch, import_dataset
+from dialogue_kitogram.src.memory_storage import MemoryBotStorage
+from dialogue_kitogram.src.model_registry import ModelRegistry, detect_language
+from dialogue_kitogram.src.policy import (
+    HEURISTIC_PENALTY,
+    ChatPolicy,
+    PolicyTable,
+    parse_policy_setting,
+)
+from dialogue_kitogram.src.profiling import HandlerTimingMiddleware, ProfilingSession
+from dialogue_kitogram.src.raid import RaidDetector, RaidSettings
+from dialogue_kitogram.src.recent_index import PurgeSettings, RecentMessageIndex
+from dialogue_kitogram.src.response_cache import ResponseCache, ResponseCacheSettings
+from dialogue_kitogram.src.scheduler import (
+    PriorityLimiter,
+    UpdatePriority,
+    UpdateScheduler,
+)
+from dialogue_kitogram.src.session import InstrumentedAiohttpSession, SessionSettings
+from dialogue_kitogram.src.shadow import ShadowEvaluator, ShadowSample
+from dialogue_kitogram.src.telegram_bot import SpamDetectionBot
+from dialogue_kitogram.src.watchdog import LoopWatchdog, WatchdogSettings
 
 # Constants
 SPAM_THRESHOLD = 0.95
@@ -89,25 +136,1213 @@ async def test_database() -> bool:
         Path(test_db_path).unlink(missing_ok=True)
 
 
+async def test_logging_setup() -> bool:
+    """Test ham log sampling and the JSON, queued file sink."""
+    logger.info("Testing logging setup...")
+
+    settings = {"LOG_HAM_SAMPLE_RATE": "0.25", "LOG_JSON": "true", "LOG_ENQUEUE": "1"}
+    saved = {name: os.environ.get(name) for name in [*settings, "LOG_FILE_PATH"]}
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        log_path = Path(tmp_dir) / "bot.log"
+        os.environ.update(settings, LOG_FILE_PATH=str(log_path))
+        try:
+            log_config.setup_logging()
+            random.seed(0)
+            kept = sum(log_config.should_log_ham() for _ in range(10_000))
+            assert 2300 < kept < 2700  # noqa: PLR2004
+            # Sinks write through a queue, from a background thread
+            assert any(
+                thread.name.startswith("loguru-writer")
+                for thread in threading.enumerate()
+            )
+            logger.info("JSON sink check")
+            await logger.complete()
+            records = [
+                json.loads(line)["record"]
+                for line in log_path.read_text(encoding="utf-8").splitlines()
+            ]
+            assert records[-1]["message"] == "JSON sink check"
+        finally:
+            for name, value in saved.items():
+                if value is None:
+                    os.environ.pop(name, None)
+                else:
+                    os.environ[name] = value
+            log_config.setup_logging()
+    # Sampling is off by default
+    assert all(log_config.should_log_ham() for _ in range(100))
+    logger.success("Logging setup test passed")
+    return True
+
+
+async def test_chat_policies() -> bool:
+    """Test per-chat policies stored in the database and cached in memory."""
+    logger.info("Testing chat policies...")
+
+    with tempfile.NamedTemporaryFile(suffix=".db", delete=False) as tmp:
+        test_db_path = tmp.name
+
+    try:
+        db = BotMessageDatabase(test_db_path)
+        await db.init_database()
+        await db.add_allowed_chat(chat_id=-100, title="test", added_by_admin_id=1)
+
+        policies = PolicyTable(
+            default_threshold=SPAM_THRESHOLD,
+            default_min_word_count=5,
+        )
+        await policies.load(db)
+        policy = policies.get(-100)
+        assert policy is not None
+        assert policy.spam_threshold == SPAM_THRESHOLD
+        assert not policy.dry_run
+        assert policies.get(-200) is None
+
+        column, value = parse_policy_setting("threshold", "0.8")
+        await db.update_chat_policy(-100, column, value=value)
+        column, value = parse_policy_setting("dry_run", "on")
+        await db.update_chat_policy(-100, column, value=value)
+        assert parse_policy_setting("min_words", "default") == ("min_word_count", None)
+        for key, raw_value in [("threshold", "2"), ("heuristics", "maybe")]:
+            try:
+                parse_policy_setting(key, raw_value)
+            except ValueError as e:
+                assert str(e).startswith(key)  # noqa: PT017
+            else:
+                raise AssertionError(key)
+        policy = await policies.refresh(db, -100)
+        assert policy is not None
+        assert policy.spam_threshold == 0.8  # noqa: PLR2004
+        assert policy.dry_run
+
+        await db.remove_allowed_chat(-100)
+        assert await policies.refresh(db, -100) is None
+        assert policies.get(-100) is None
+        logger.success("Chat policies work as expected")
+
+        return True
+
+    finally:
+        await asyncio.to_thread(Path(test_db_path).unlink, missing_ok=True)
+
+
+async def test_raid_detection() -> bool:
+    """Test raid mode triggering, burst deletion and expiry."""
+    logger.info("Testing raid detection...")
+
+    settings = RaidSettings(repeat_burst=3, raid_duration_seconds=60.0)
+    detector = RaidDetector(settings)
+    chat_id = -100
+
+    # Normal traffic does not trigger anything
+    assert not detector.record_message(
+        chat_id=chat_id,
+        user_id=1,
+        message_id=1,
+        text="hello there",
+        spam_probability=0.1,
+        now=0.0,
+    )
+
+    # Newcomers posting the same text within the window trigger raid mode
+    burst: list[int] = []
+    for i, user_id in enumerate((10, 11, 12)):
+        detector.record_join(chat_id, user_id, now=1.0)
+        burst = detector.record_message(
+            chat_id=chat_id,
+            user_id=user_id,
+            message_id=100 + i,
+            text="Earn  MONEY fast",
+            spam_probability=0.5,
+            now=2.0 + i,
+        )
+    assert sorted(burst) == [100, 101, 102]
+    assert 1 not in burst
+
+    # Established members repeating a short reply are not part of the burst
+    for i, user_id in enumerate((1, 2)):
+        burst = detector.record_message(
+            chat_id=chat_id,
+            user_id=user_id,
+            message_id=200 + i,
+            text="+1",
+            spam_probability=0.1,
+            now=4.0,
+        )
+    assert burst == []
+    assert detector.is_raid(chat_id, now=5.0)
+    assert detector.threshold_for(chat_id, SPAM_THRESHOLD, now=5.0) < SPAM_THRESHOLD
+
+    # Raid mode expires automatically
+    assert not detector.is_raid(chat_id, now=100.0)
+    assert detector.threshold_for(chat_id, SPAM_THRESHOLD, now=100.0) == SPAM_THRESHOLD
+
+    # Tracked chats are bounded
+    small = RaidDetector(RaidSettings(max_chats=2))
+    for i in range(5):
+        small.record_join(i, 1, now=0.0)
+    assert small.stats()["tracked_chats"] == 2  # noqa: PLR2004
+    logger.success("Raid detection works as expected")
+
+    return True
+
+
+class HamModel(SpamModel):
+    """Model that scores every message as ham, for tests of bot handlers."""
+
+    def fit(self) -> None: ...
+
+    def load(self) -> None: ...
+
+    def predict_proba(self, text: str) -> float:  # noqa: ARG002
+        return 0.01
+
+
+async def test_flood_handling() -> bool:
+    """Test that a flood burst is rate limited, not recorded or purged."""
+    logger.info("Testing flood handling...")
+
+    api = FakeBotAPI()
+    storage = MemoryBotStorage()
+    bot = SpamDetectionBot(
+        "123456:test",
+        storage=storage,
+        api_url=await api.start(port=8094),
+        spam_model=HamModel(ModelConfig()),
+    )
+    policy = ChatPolicy(spam_threshold=SPAM_THRESHOLD, min_word_count=100)
+    chat = Chat(id=-1, type=ChatType.SUPERGROUP)
+    admin_ids = os.environ.get("ADMIN_USER_IDS")
+    os.environ["ADMIN_USER_IDS"] = "7"
+    try:
+        for user_id in (5, 7):
+            for i in range(bot.raid.settings.user_burst):
+                await bot._check_and_handle_message(  # noqa: SLF001
+                    Message(
+                        message_id=user_id * 100 + i,
+                        date=datetime.now(tz=UTC),
+                        chat=chat,
+                        from_user=User(id=user_id, is_bot=False, first_name="u"),
+                        text=f"message {i}",
+                    ),
+                    policy,
+                )
+        # The flooding member's burst is deleted in one call; the admin's is not
+        assert api.method_calls["deleteMessages"] == 1
+        assert api.method_calls["deleteMessage"] == 0
+        assert api.method_calls["banChatMember"] == 0
+        assert (await storage.get_stats())["total_detections"] == 0
+        logger.success("Flood handling test passed")
+        return True
+    finally:
+        if admin_ids is None:
+            os.environ.pop("ADMIN_USER_IDS")
+        else:
+            os.environ["ADMIN_USER_IDS"] = admin_ids
+        await bot.http.close()
+        await api.stop()
+
+
+async def test_shadow_evaluation() -> bool:
+    """Test shadow scoring, disagreement records and queue overflow."""
+    logger.info("Testing shadow evaluation...")
+
+    class ShadowModel(SpamModel):
+        def fit(self) -> None: ...
+
+        def load(self) -> None: ...
+
+        def predict_proba(self, text: str) -> float:
+            return 0.97 if "work" in text else 0.01
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db = BotMessageDatabase(str(Path(tmp_dir) / "shadow.db"))
+        await db.init_database()
+        shadow = ShadowEvaluator(ShadowModel(ModelConfig()), db, queue_size=2)
+        samples = [
+            # Both models call it ham
+            ("hello there", 0.01),
+            # Only the shadow model calls it spam
+            ("easy work from home", 0.2),
+            # The queue is full, so this one is dropped
+            ("another message", 0.01),
+        ]
+        submitted = [
+            shadow.submit(
+                ShadowSample(
+                    chat_id=-1,
+                    message_id=message_id,
+                    text=text,
+                    primary_probability=probability,
+                    adjustment=0.0,
+                    threshold=SPAM_THRESHOLD,
+                ),
+            )
+            for message_id, (text, probability) in enumerate(samples)
+        ]
+        assert submitted == [True, True, False]
+        shadow.start()
+        try:
+            await asyncio.wait_for(shadow._queue.join(), 5)  # noqa: SLF001
+        finally:
+            await shadow.stop()
+
+        stats = shadow.stats()
+        assert (stats["scored"], stats["agreed"], stats["dropped"]) == (2, 1, 1)
+        assert (stats["shadow_only_spam"], stats["primary_only_spam"]) == (1, 0)
+        # As shown by /shadow
+        report = format_shadow(shadow)
+        assert "Agreement: 50.00%" in report
+        assert "Dropped (overload): 1" in report
+        assert "20.00% → 97.00%: easy work from home" in report
+
+        async with (
+            aiosqlite.connect(db.db_path) as conn,
+            conn.execute(
+                "SELECT message_id, shadow_probability, text_preview "
+                "FROM shadow_disagreements",
+            ) as cursor,
+        ):
+            assert await cursor.fetchall() == [(1, 0.97, "easy work from home")]
+    logger.success("Shadow evaluation test passed")
+    return True
+
+
+async def test_scoped_stats_access() -> bool:
+    """Test that only admins via DM can read the stats of a single chat."""
+    logger.info("Testing scoped stats access...")
+
+    api = FakeBotAPI()
+    bot = SpamDetectionBot(
+        "123456:test",
+        storage=MemoryBotStorage(),
+        api_url=await api.start(port=8095),
+        spam_model=HamModel(ModelConfig()),
+    )
+    admin_ids = os.environ.get("ADMIN_USER_IDS")
+    os.environ["ADMIN_USER_IDS"] = "7"
+
+    async def reply_to(text: str, user_id: int, chat: Chat) -> str:
+        await bot.dp.feed_update(
+            bot.bot,
+            Update(
+                update_id=1,
+                message=Message(
+                    message_id=1,
+                    date=datetime.now(tz=UTC),
+                    chat=chat,
+                    from_user=User(id=user_id, is_bot=False, first_name="u"),
+                    text=text,
+                ),
+            ),
+        )
+        return api.sent_texts[-1]
+
+    group = Chat(id=-1, type=ChatType.SUPERGROUP)
+    try:
+        assert await reply_to("/stats -1", 5, group) == "Not authorized."
+        assert await reply_to("/recent -1", 5, group) == "Not authorized."
+        # Admins need a DM too
+        assert await reply_to("/stats -1", 7, group) == "Not authorized."
+        assert (await reply_to("/stats", 5, group)).startswith("📊")
+        dm = Chat(id=7, type=ChatType.PRIVATE)
+        assert "in chat -1" in await reply_to("/stats -1", 7, dm)
+        assert await reply_to("/recent -1", 7, dm) == "No recent detections found."
+    finally:
+        if admin_ids is None:
+            os.environ.pop("ADMIN_USER_IDS")
+        else:
+            os.environ["ADMIN_USER_IDS"] = admin_ids
+        await bot.http.close()
+        await api.stop()
+    logger.success("Scoped stats access test passed")
+    return True
+
+
+async def test_update_scheduler() -> bool:
+    """Test priority admission, shedding and cancellation of queued updates."""
+    logger.info("Testing update scheduler...")
+
+    limiter = PriorityLimiter(1, max_pending_low=1, max_pending_normal=1)
+    admitted: list[str] = []
+
+    async def run(name: str, priority: UpdatePriority) -> bool:
+        if not await limiter.acquire(priority):
+            return False
+        admitted.append(name)
+        await asyncio.sleep(0)
+        limiter.release()
+        return True
+
+    assert await limiter.acquire(UpdatePriority.HIGH)
+    tasks = [
+        asyncio.create_task(run(name, priority))
+        for name, priority in [
+            ("low", UpdatePriority.LOW),
+            ("normal", UpdatePriority.NORMAL),
+            ("high", UpdatePriority.HIGH),
+            ("cancelled", UpdatePriority.HIGH),
+            ("low shed", UpdatePriority.LOW),
+            ("normal shed", UpdatePriority.NORMAL),
+            ("high queued", UpdatePriority.HIGH),
+        ]
+    ]
+    await asyncio.sleep(0)
+    # Only LOW and NORMAL queues are bounded
+    assert limiter.pending(UpdatePriority.LOW) == 1
+    assert limiter.pending(UpdatePriority.NORMAL) == 1
+    assert limiter.pending(UpdatePriority.HIGH) == 3  # noqa: PLR2004
+    tasks[3].cancel()
+    await asyncio.sleep(0)
+    assert limiter.pending(UpdatePriority.HIGH) == 2  # noqa: PLR2004
+    limiter.release()
+    results = await asyncio.gather(*tasks, return_exceptions=True)
+    assert isinstance(results[3], asyncio.CancelledError)
+    assert results[4:6] == [False, False]
+    assert admitted == ["high", "high queued", "normal", "low"]
+    # The cancelled waiter did not keep a slot
+    assert limiter.active == 0
+
+    # A waiter cancelled right after being handed the slot passes it on
+    assert await limiter.acquire(UpdatePriority.HIGH)
+    waiter = asyncio.create_task(limiter.acquire(UpdatePriority.LOW))
+    follower = asyncio.create_task(limiter.acquire(UpdatePriority.NORMAL))
+    await asyncio.sleep(0)
+    limiter.release()
+    waiter.cancel()
+    assert await follower
+    assert waiter.cancelled()
+    assert limiter.active == 1
+    limiter.release()
+
+    scheduler = UpdateScheduler({7}, max_concurrency=1, max_pending_low=0)
+    group = Chat(id=-1, type=ChatType.SUPERGROUP)
+
+    def update(text: str, user_id: int = 5, chat: Chat = group) -> Update:
+        return Update(
+            update_id=1,
+            message=Message(
+                message_id=1,
+                date=datetime.now(tz=UTC),
+                chat=chat,
+                from_user=User(id=user_id, is_bot=False, first_name="u"),
+                text=text,
+            ),
+        )
+
+    assert scheduler.classify(update("/stats", user_id=7)) == UpdatePriority.HIGH
+    assert scheduler.classify(update("hi", user_id=7)) == UpdatePriority.HIGH
+    assert scheduler.classify(update("/stats")) == UpdatePriority.NORMAL
+    assert (
+        scheduler.classify(update("hi", chat=Chat(id=5, type=ChatType.PRIVATE)))
+        == UpdatePriority.NORMAL
+    )
+    assert scheduler.classify(update("hi")) == UpdatePriority.LOW
+
+    async def handler(event: TelegramObject, data: dict) -> str:  # noqa: ARG001
+        return "handled"
+
+    assert await scheduler(handler, update("hi"), {}) == "handled"
+    # With the only slot busy, group messages beyond the queue limit are shed
+    assert await scheduler.limiter.acquire(UpdatePriority.HIGH)
+    assert await scheduler(handler, update("hi"), {}) is None
+    assert scheduler.shed == 1
+    scheduler.limiter.release()
+    assert scheduler.stats()["priorities"]["low"]["processed"] == 1
+
+    logger.success("Update scheduler test passed")
+    return True
+
+
+async def test_command_flood() -> bool:
+    """Test that slash messages of non-admins are shed under load."""
+    logger.info("Testing command flood shedding...")
+
+    scheduler = UpdateScheduler({7}, max_concurrency=1, max_pending_normal=2)
+
+    def update(text: str, user_id: int = 5) -> Update:
+        return Update(
+            update_id=1,
+            message=Message(
+                message_id=1,
+                date=datetime.now(tz=UTC),
+                chat=Chat(id=-1, type=ChatType.SUPERGROUP),
+                from_user=User(id=user_id, is_bot=False, first_name="u"),
+                text=text,
+            ),
+        )
+
+    async def handler(event: TelegramObject, data: dict) -> str:  # noqa: ARG001
+        return "handled"
+
+    # With the only slot busy, admin commands queue and the rest is bounded
+    assert await scheduler.limiter.acquire(UpdatePriority.HIGH)
+    flood = [
+        asyncio.create_task(scheduler(handler, update("/x"), {})) for _ in range(10)
+    ]
+    admin = asyncio.create_task(scheduler(handler, update("/x", user_id=7), {}))
+    await asyncio.sleep(0)
+    assert scheduler.limiter.pending(UpdatePriority.NORMAL) == 2  # noqa: PLR2004
+    assert scheduler.shed == 8  # noqa: PLR2004
+    scheduler.limiter.release()
+    assert await admin == "handled"
+    assert [await task for task in flood].count("handled") == 2  # noqa: PLR2004
+
+    logger.success("Command flood test passed")
+    return True
+
+
+async def check_storage_conformance(storage: BotStorage) -> None:
+    """Exercise the storage interface shared by all backends."""
+    await storage.init_database()
+
+    stats = await storage.get_stats()
+    assert stats["total_detections"] == 0
+    assert await storage.get_recent_detections() == []
+
+    for i in range(3):
+        await storage.record_bot_message(
+            message_id=i,
+            chat_id=-1 if i < 2 else -2,  # noqa: PLR2004
+            user_id=100 + i,
+            username=f"user{i}",
+            text_content=f"spam text {i}",
+            spam_probability=0.96 + i / 100,
+            was_deleted=i != 1,
+        )
+    await storage.record_bot_message(
+        message_id=10,
+        chat_id=-1,
+        user_id=None,
+        username=None,
+        text_content="manual",
+        spam_probability=0.5,
+        was_manual=True,
+    )
+
+    # Stats only cover automatic detections
+    stats = await storage.get_stats()
+    assert stats["total_detections"] == 3  # noqa: PLR2004
+    assert stats["deleted_messages"] == 2  # noqa: PLR2004
+    assert abs(stats["avg_spam_probability"] - 0.97) < 1e-9  # noqa: PLR2004
+    assert abs(stats["max_spam_probability"] - 0.98) < 1e-9  # noqa: PLR2004
+
+    recent = await storage.get_recent_detections(limit=2)
+    assert [row.message_id for row in recent] == [10, 2]
+    # Per-chat scope
+    chat_stats = await storage.get_stats(chat_id=-2)
+    assert chat_stats["total_detections"] == 1
+    assert abs(chat_stats["max_spam_probability"] - 0.98) < 1e-9  # noqa: PLR2004
+    assert (await storage.get_stats(chat_id=-3))["total_detections"] == 0
+    chat_recent = await storage.get_recent_detections(limit=5, chat_id=-1)
+    assert [row.message_id for row in chat_recent] == [10, 1, 0]
+    assert recent[0].was_manual
+    # Both backends return the same typed records
+    assert isinstance(recent[0], DetectionRecord)
+    assert isinstance(recent[0].detection_timestamp, datetime)
+
+    rows = [row async for row in storage.iter_detections(chat_id=-1, chunk_size=1)]
+    assert [row.message_id for row in rows] == [0, 1, 10]
+    rows = [row async for row in storage.iter_detections(manual=True)]
+    assert [row.text_content for row in rows] == ["manual"]
+    assert await storage.get_text_occurrences("spam text 0") == 1
+    assert await storage.get_text_occurrences("never seen") == 0
+
+    await storage.record_shadow_disagreement(
+        chat_id=-1,
+        message_id=1,
+        primary_probability=0.9,
+        shadow_probability=0.99,
+        threshold=0.95,
+        text_preview="spam",
+    )
+    await check_allowed_chat_conformance(storage)
+
+
+async def check_allowed_chat_conformance(storage: BotStorage) -> None:
+    """Exercise the allowed chats and their policies."""
+    assert not await storage.is_chat_allowed(-1)
+    await storage.add_allowed_chat(chat_id=-1, title="one", added_by_admin_id=1)
+    await storage.add_allowed_chat(chat_id=-2, title="two", added_by_admin_id=1)
+    assert await storage.is_chat_allowed(-1)
+    assert await storage.update_chat_policy(-1, "spam_threshold", value=0.8)
+    assert await storage.update_chat_policy(-1, "dry_run", value=True)
+    assert not await storage.update_chat_policy(-3, "dry_run", value=True)
+    chat = await storage.get_allowed_chat(-1)
+    assert chat is not None
+    assert chat.spam_threshold == 0.8  # noqa: PLR2004
+    assert chat.dry_run
+    assert chat.heuristics_enabled
+
+    # Re-allowing keeps the policy
+    await storage.add_allowed_chat(chat_id=-1, title="renamed", added_by_admin_id=2)
+    chat = await storage.get_allowed_chat(-1)
+    assert chat is not None
+    assert chat.title == "renamed"
+    assert chat.spam_threshold == 0.8  # noqa: PLR2004
+
+    chats = await storage.list_allowed_chats()
+    assert {row.chat_id for row in chats} == {-1, -2}
+    assert await storage.remove_allowed_chat(-2)
+    assert not await storage.remove_allowed_chat(-2)
+    assert await storage.get_allowed_chat(-2) is None
+
+
+async def test_storage_conformance() -> bool:
+    """Run the shared storage conformance checks against every backend."""
+    logger.info("Testing storage backends...")
+
+    with tempfile.NamedTemporaryFile(suffix=".db", delete=False) as tmp:
+        test_db_path = tmp.name
+
+    try:
+        await check_storage_conformance(BotMessageDatabase(test_db_path))
+        logger.success("SQLite storage conforms")
+        await check_storage_conformance(MemoryBotStorage())
+        logger.success("Memory storage conforms")
+
+        # The memory backend is bounded but keeps cumulative stats
+        storage = MemoryBotStorage(capacity=2)
+        for i in range(5):
+            await storage.record_bot_message(
+                message_id=i,
+                chat_id=-1,
+                user_id=None,
+                username=None,
+                text_content="spam",
+                spam_probability=0.99,
+            )
+        recent = await storage.get_recent_detections(limit=10)
+        assert [row.message_id for row in recent] == [4, 3]
+        assert (await storage.get_stats())["total_detections"] == 5  # noqa: PLR2004
+
+        # Per-chat counters are kept only for the most recently detected chats
+        for chat_id in (-2, -1, -3):
+            await storage.record_bot_message(
+                message_id=10,
+                chat_id=chat_id,
+                user_id=None,
+                username=None,
+                text_content="spam",
+                spam_probability=0.99,
+            )
+        assert (await storage.get_stats(-1))["total_detections"] == 6  # noqa: PLR2004
+        assert (await storage.get_stats(-2))["total_detections"] == 0
+        assert (await storage.get_stats(-3))["total_detections"] == 1
+
+        return True
+
+    finally:
+        await asyncio.to_thread(Path(test_db_path).unlink, missing_ok=True)
+
+
+async def test_export() -> bool:
+    """Test that detections round-trip through the export formats."""
+    logger.info("Testing export...")
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db = BotMessageDatabase(str(Path(tmp_dir) / "export.db"))
+        await db.init_database()
+        for message_id, text, was_deleted, was_manual in [
+            (1, "Срочно работа, пиши в лс", True, False),
+            (2, "dry run guess", False, False),
+            (3, "reported, by hand", False, True),
+        ]:
+            await db.record_bot_message(
+                message_id=message_id,
+                chat_id=-1,
+                user_id=message_id,
+                username=None,
+                text_content=text,
+                spam_probability=TEST_SPAM_PROBABILITY,
+                was_deleted=was_deleted,
+                was_manual=was_manual,
+            )
+        # Pages are separate reads, so the bot can write during an export
+        rows = []
+        async for row in db.iter_detections(chunk_size=1):
+            rows.append(row)
+            if len(rows) == 1:
+                await db.record_bot_message(
+                    message_id=4,
+                    chat_id=-2,
+                    user_id=4,
+                    username=None,
+                    text_content="written during export",
+                    spam_probability=TEST_SPAM_PROBABILITY,
+                )
+        assert [row.message_id for row in rows] == [1, 2, 3, 4]
+        rows = [row async for row in db.iter_detections(chat_id=-1)]
+
+        output = Path(tmp_dir) / "detections.csv"
+        assert await export_detections(db, output, "csv", chat_id=-1, chunk_size=2) == 3  # noqa: PLR2004
+        with output.open(encoding="utf-8", newline="") as f:
+            exported = list(csv.DictReader(f))
+        assert [row["text_content"] for row in exported] == [
+            row.text_content for row in rows
+        ]
+        assert [row["was_manual"] for row in exported] == ["0", "0", "1"]
+
+        output = Path(tmp_dir) / "detections.jsonl"
+        count = await export_detections(db, output, "jsonl", chat_id=-1, chunk_size=2)
+        assert count == len(rows)
+        with output.open(encoding="utf-8") as f:
+            exported = [json.loads(line) for line in f]
+        assert [row["id"] for row in exported] == [row.id for row in rows]
+        assert exported[0]["spam_probability"] == TEST_SPAM_PROBABILITY
+
+        # The dry-run detection is not a confirmed spam example
+        output = Path(tmp_dir) / "detections.txt"
+        assert await export_detections(db, output, "fasttext", chat_id=-1) == 2  # noqa: PLR2004
+        assert output.read_text(encoding="utf-8") == (
+            "__label__spam срочно работа, пиши в лс\n__label__spam reported, by hand\n"
+        )
+
+    # Offsets are converted to the UTC of the stored timestamps
+    assert _parse_datetime("2025-01-01T03:00:00+03:00") == datetime(
+        2025,
+        1,
+        1,
+        tzinfo=UTC,
+    )
+    assert _parse_datetime("2025-01-01") == datetime(2025, 1, 1, tzinfo=UTC)
+    logger.success("Export test passed")
+    return True
+
+
+async def test_text_storage() -> bool:
+    """Test deduplicated, compressed text storage and legacy migration."""
+    logger.info("Testing text storage...")
+
+    with tempfile.NamedTemporaryFile(suffix=".db", delete=False) as tmp:
+        test_db_path = tmp.name
+
+    try:
+        db = BotMessageDatabase(test_db_path)
+        await db.init_database()
+
+        # Legacy rows kept their text inline
+        async with aiosqlite.connect(test_db_path) as conn:
+            await conn.executemany(
+                """
+                INSERT INTO bot_messages
+                (message_id, chat_id, text_content, spam_probability,
+                 detection_timestamp)
+                VALUES (?, -1, ?, 0.99, '2024-01-01 00:00:00')
+                """,
+                [(i, f"buy cheap crypto now {i % 2}") for i in range(4)],
+            )
+            await conn.commit()
+
+        assert await db.migrate_text_content(batch_size=3) == 4  # noqa: PLR2004
+        assert await db.get_text_occurrences("buy cheap crypto now 0") == 2  # noqa: PLR2004
+
+        await db.train_text_dictionary()
+        text = "buy cheap crypto now and earn fast"
+        await db.record_bot_message(
+            message_id=10,
+            chat_id=-1,
+            user_id=1,
+            username="spammer",
+            text_content=text,
+            spam_probability=0.99,
+        )
+
+        # A fresh instance loads the dictionary from the database
+        rows = [row async for row in BotMessageDatabase(test_db_path).iter_detections()]
+        assert [row.text_content for row in rows[-2:]] == [
+            "buy cheap crypto now 1",
+            text,
+        ]
+        assert not hasattr(rows[0], "text_hash")
+
+        report = await db.get_text_storage_report()
+        assert report["messages"] == 5  # noqa: PLR2004
+        assert report["distinct_texts"] == 3  # noqa: PLR2004
+        logger.success("Text storage test passed")
+        return True
+
+    finally:
+        await asyncio.to_thread(Path(test_db_path).unlink, missing_ok=True)
+
+
+async def test_profiling() -> bool:
+    """Test handler timing and profiling sessions."""
+    logger.info("Testing profiling...")
+
+    async def process_text_message(_event: object, _data: dict) -> str:
+        await asyncio.sleep(0.01)
+        return "handled"
+
+    timings = HandlerTimingMiddleware()
+    data = {"handler": HandlerObject(callback=process_text_message)}
+    for _ in range(3):
+        assert await timings(process_text_message, None, data) == "handled"
+    stats = timings.stats()["process_text_message"]
+    assert stats["count"] == 3  # noqa: PLR2004
+    assert stats["p50_wall"] >= 0.01  # noqa: PLR2004
+    assert stats["avg_cpu"] <= stats["avg_wall"]
+
+    session = ProfilingSession()
+    summary, raw = await session.run(0.05)
+    assert "function calls" in summary
+    assert raw
+    assert not session.active
+    logger.success("Profiling test passed")
+    return True
+
+
+async def test_evaluation_metrics() -> bool:
+    """Test the vectorized threshold sweep against direct counting."""
+    logger.info("Testing evaluation metrics...")
+
+    rng = np.random.default_rng(0)
+    scores = np.round(rng.random(2000), 2)
+    labels = (rng.random(2000) < scores).astype(np.int8)
+    curves = compute_curves(scores, labels)
+
+    # Thresholds equal to a score check the bot's strict comparison
+    for threshold in (0.95, 0.5, 0.123):
+        predicted = scores > threshold
+        true_positives = int((predicted & (labels == 1)).sum())
+        metrics = metrics_at(curves, threshold)
+        assert abs(metrics["precision"] - true_positives / predicted.sum()) < 1e-9  # noqa: PLR2004
+        assert abs(metrics["recall"] - true_positives / labels.sum()) < 1e-9  # noqa: PLR2004
+    assert 0.5 < curves.roc_auc <= 1.0  # noqa: PLR2004
+    best = best_f1(curves)
+    assert best["f1"] == curves.f1.max()
+    predicted = scores > best["threshold"]
+    assert best["recall"] == (predicted & (labels == 1)).sum() / labels.sum()
+    logger.success("Evaluation metrics test passed")
+    return True
+
+
+async def test_dataset_import() -> bool:
+    """Test conversion of labelled rows to FastText lines."""
+    logger.info("Testing dataset import...")
+
+    lines, counts = convert_batch(
+        (
+            ["Срочно\r\nРабота", "привет\nкак дела", "  ", "text"],
+            [1, "ham", 0, "maybe"],
+        ),
+    )
+    assert lines == [
+        "__label__spam срочно\tработа\n",
+        "__label__ham привет\tкак дела\n",
+    ]
+    assert counts["empty"] == 1
+    assert counts["invalid_label"] == 1
+    # Numeric labels from float columns
+    lines, counts = convert_batch((["a", "b", "c"], [1.0, "0.0", 0.5]))
+    assert lines == ["__label__spam a\n", "__label__ham b\n"]
+    assert counts["invalid_label"] == 1
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        sources = {
+            "data.tsv": "text\tlabel\nbuy, now\t1\nhello\t0\n",
+            "data.json": json.dumps(
+                [{"text": "buy, now", "label": 1.0}, {"text": "hello", "label": 0}],
+            ),
+        }
+        for name, content in sources.items():
+            source = Path(tmp_dir) / name
+            source.write_text(content, encoding="utf-8")
+            output = Path(tmp_dir) / f"{name}.txt"
+            stats = import_dataset(str(source), str(output), workers=1)
+            assert (stats.spam, stats.ham, stats.invalid_label) == (1, 1, 0)
+            assert output.read_text(encoding="utf-8") == (
+                "__label__spam buy, now\n__label__ham hello\n"
+            )
+    logger.success("Dataset import test passed")
+    return True
+
+
+async def test_recent_index() -> bool:
+    """Test the per-user recent-message index used for purges."""
+    logger.info("Testing recent-message index...")
+
+    index = RecentMessageIndex(
+        PurgeSettings(per_user=3, max_users=2, max_age_seconds=60),
+    )
+    for i in range(5):
+        index.record(1, -1 if i % 2 else -2, i, now=float(i))
+    index.record(2, -1, 100, now=0.0)
+
+    # Only the last 3 messages are kept, grouped by chat
+    assert index.pop_user(1, now=10.0) == {-2: [2, 4], -1: [3]}
+    assert index.pop_user(1) == {}
+    # Old messages are not purged
+    assert index.pop_user(2, now=100.0) == {}
+
+    # Least recently active users are evicted
+    for user_id in (3, 4, 5):
+        index.record(user_id, -1, user_id, now=0.0)
+    assert index.stats()["tracked_users"] == 2  # noqa: PLR2004
+    assert index.pop_user(3, now=0.0) == {}
+    logger.success("Recent-message index test passed")
+    return True
+
+
+async def test_bot_scopes() -> bool:
+    """Test that bots sharing a database only see their own data."""
+    logger.info("Testing per-bot storage scopes...")
+
+    with tempfile.NamedTemporaryFile(suffix=".db", delete=False) as tmp:
+        test_db_path = tmp.name
+
+    try:
+        # A database from before multi-bot support
+        async with aiosqlite.connect(test_db_path) as conn:
+            await conn.execute("""
+                CREATE TABLE allowed_chats (
+                    chat_id INTEGER PRIMARY KEY,
+                    title TEXT,
+                    added_by_admin_id INTEGER,
+                    added_at DATETIME NOT NULL
+                )
+            """)
+            await conn.execute(
+                "INSERT INTO allowed_chats VALUES (-1, 'old', 1, '2024-01-01')",
+            )
+            await conn.commit()
+
+        primary = BotMessageDatabase(test_db_path)
+        other = BotMessageDatabase(test_db_path, bot_id=42)
+        await primary.init_database()
+        await other.init_database()
+
+        # Existing chats stay with the primary bot
+        assert await primary.is_chat_allowed(-1)
+        assert not await other.is_chat_allowed(-1)
+
+        # The same chat can be moderated by both bots independently
+        await other.add_allowed_chat(chat_id=-1, title="other", added_by_admin_id=2)
+        await other.update_chat_policy(-1, "dry_run", value=True)
+        assert not (await primary.get_allowed_chat(-1)).dry_run
+        assert (await other.get_allowed_chat(-1)).title == "other"
+
+        await other.record_bot_message(
+            message_id=1,
+            chat_id=-1,
+            user_id=1,
+            username=None,
+            text_content="spam",
+            spam_probability=0.99,
+        )
+        assert (await primary.get_stats())["total_detections"] == 0
+        assert (await other.get_stats())["total_detections"] == 1
+        assert await primary.get_recent_detections() == []
+        assert len([row async for row in other.iter_detections()]) == 1
+
+        assert await primary.remove_allowed_chat(-1)
+        assert await other.is_chat_allowed(-1)
+        logger.success("Per-bot storage scope test passed")
+        return True
+
+    finally:
+        await asyncio.to_thread(Path(test_db_path).unlink, missing_ok=True)
+
+
+async def test_http_session() -> bool:
+    """Test retries and metrics of the Bot API session against the fake API."""
+    logger.info("Testing Bot API session...")
+
+    api = FakeBotAPI(FaultSettings(error_rate=1.0))
+    session = InstrumentedAiohttpSession(
+        SessionSettings(retries=2, retry_backoff=0.01),
+        api=TelegramAPIServer.from_base(await api.start(port=8093)),
+    )
+    bot = Bot(token="123456:test", session=session)  # noqa: S106
+    try:
+        # Idempotent calls are retried, sending a message is not
+        with contextlib.suppress(TelegramServerError):
+            await bot.delete_message(-1, 1)
+        with contextlib.suppress(TelegramServerError):
+            await bot.send_message(-1, "hello")
+        api.faults.error_rate = 0.0
+        assert await bot.delete_message(-1, 2)
+
+        stats = session.stats()
+        assert stats["deleteMessage"]["count"] == 4  # noqa: PLR2004
+        assert stats["deleteMessage"]["retries"] == 2  # noqa: PLR2004
+        assert stats["deleteMessage"]["errors"] == {"TelegramServerError": 3}
+        assert stats["sendMessage"]["count"] == 1
+        assert api.method_calls["sendMessage"] == 1
+        logger.success("Bot API session test passed")
+        return True
+    finally:
+        await session.close()
+        await api.stop()
+
+
+async def test_model_registry() -> bool:
+    """Test language routing, lazy loading and eviction of models."""
+    logger.info("Testing model registry...")
+
+    assert detect_language("Срочно работа! Писать в лс") == "ru"
+    assert detect_language("Терміново потрібні працівники, пишіть у приват") == "uk"
+    assert detect_language("Earn 1000$ a week, DM me") == "en"
+    assert detect_language("12345 !!!") == ""
+
+    trained: list[tuple[str, str]] = []
+
+    class NamedModel(SpamModel):
+        def fit(self) -> None:
+            trained.append((self.cfg.model_name, self.cfg.train_paths()[0].name))
+
+        def load(self) -> None:
+            if not self.cfg.model_path.exists():
+                raise FileNotFoundError(self.cfg.model_path)
+
+        def predict_proba(self, text: str) -> float:  # noqa: ARG002
+            return {
+                "default.bin": 0.1,
+                "uk.bin": 0.2,
+                "en.bin": 0.3,
+                "missing.bin": 0.4,
+            }[self.cfg.model_name]
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for name in ("default.bin", "uk.bin", "en.bin"):
+            (Path(tmp_dir) / name).write_bytes(b"x" * 100)
+        registry = ModelRegistry(
+            ModelConfig(
+                project_root=Path(tmp_dir),
+                data_subdir="",
+                model_name="default.bin",
+            ),
+            routes={"uk": "uk.bin", "en": "en.bin", "ru": "missing.bin"},
+            # Room for the default model and one routed model
+            memory_budget=250,
+            model_factory=NamedModel,
+        )
+        registry.load()
+
+        # The default model scores while a routed model loads in the background
+        assert registry.predict_proba("Пишіть у приват, є робота") == 0.1  # noqa: PLR2004
+        # Batches wait for the load
+        assert registry.predict_proba_batch(["Пишіть у приват"]) == [0.2]
+        assert registry.predict_proba("Пишіть у приват, є робота") == 0.2  # noqa: PLR2004
+        assert registry.predict_proba_batch(["Earn money fast"]) == [0.3]
+        # A model that cannot be loaded falls back to the default and does not
+        # evict the loaded ones
+        assert registry.predict_proba_batch(["Срочно работа"]) == [0.1]
+        assert registry.stats()["models"]["en"]["loaded"]
+        assert registry.predict_proba_batch(
+            ["Пишіть у приват", "12345", "Earn money"],
+        ) == [0.2, 0.1, 0.3]
+
+        models = registry.stats()["models"]
+        # Only one routed model fits, so uk and en keep evicting each other
+        assert models["uk"]["loads"] == 2  # noqa: PLR2004
+        assert models["uk"]["evictions"] == 2  # noqa: PLR2004
+        assert not models["uk"]["loaded"]
+        assert models["en"]["loaded"]
+        assert models["ru"]["load_failures"] == 1
+        assert models["default"]["predictions"] == 3  # noqa: PLR2004
+
+        # A failed model is loaded again only after the retry interval
+        (Path(tmp_dir) / "missing.bin").write_bytes(b"x" * 100)
+        assert registry.predict_proba_batch(["Срочно работа"]) == [0.1]
+        registry.retry_interval = 0.0
+        assert registry.predict_proba_batch(["Срочно работа"]) == [0.4]
+
+        registry.fit()
+        assert trained == [
+            ("default.bin", "train_data.txt"),
+            ("uk.bin", "uk.txt"),
+            ("en.bin", "en.txt"),
+            ("missing.bin", "missing.txt"),
+        ]
+        assert not registry.stats()["models"]["ru"]["loaded"]
+    logger.success("Model registry test passed")
+    return True
+
+
+async def test_backfill() -> bool:
+    """Test re-scoring detections with a resumable backfill."""
+    logger.info("Testing backfill...")
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        train_path = Path(tmp_dir) / "train.txt"
+        train_path.write_text(
+            "__label__spam срочно работа пишите в лс\n"
+            "__label__ham привет как дела\n" * 20,
+            encoding="utf-8",
+        )
+        model_path = Path(tmp_dir) / "rescore.bin"
+        fasttext.train_supervised(input=str(train_path), epoch=5, thread=1).save_model(
+            str(model_path),
+        )
+
+        db = BotMessageDatabase(str(Path(tmp_dir) / "backfill.db"))
+        await db.init_database()
+        texts = ["срочно работа", "привет", "", "пишите\nв лс", "как дела"]
+        for i, text in enumerate(texts):
+            await db.record_bot_message(
+                message_id=i,
+                chat_id=-1,
+                user_id=i,
+                username=None,
+                text_content=text,
+                spam_probability=TEST_SPAM_PROBABILITY,
+            )
+
+        # An interrupted run leaves a checkpoint after the last written chunk
+        first = await backfill(db, model_path, chunk_size=2, workers=1, limit=3)
+        assert first.rows == 3  # noqa: PLR2004
+        assert first.scored == 2  # noqa: PLR2004
+        assert first.empty == 1
+        assert await db.get_backfill_checkpoint(first.model_version) == (3, 2)
+
+        second = await backfill(db, model_path, chunk_size=2, workers=1)
+        assert second.model_version == first.model_version
+        assert second.resumed_from == 3  # noqa: PLR2004
+        assert second.scored == 2  # noqa: PLR2004
+
+        summary = await db.get_rescore_summary(first.model_version, 0.5)
+        assert summary["rescored"] == 4  # noqa: PLR2004
+        assert summary["avg_recorded_probability"] == TEST_SPAM_PROBABILITY
+
+        # Stored scores carry the bot's penalty for the multi-line message
+        model = FastTextSpamModel(ModelConfig(model_name=str(model_path)))
+        model.load()
+        raw = model.predict_proba_batch([text for text in texts if text])
+        expected = (sum(raw) - HEURISTIC_PENALTY) / len(raw)
+        assert abs(summary["avg_new_probability"] - expected) < 1e-6  # noqa: PLR2004
+        assert (await backfill(db, model_path, workers=1)).rows == 0
+    logger.success("Backfill test passed")
+    return True
+
+
+async def test_loop_watchdog() -> bool:
+    """Test lag measurement and stack capture of a blocked event loop."""
+    logger.info("Testing event loop watchdog...")
+
+    def blocking_call() -> None:
+        time.sleep(0.3)
+
+    watchdog = LoopWatchdog(
+        WatchdogSettings(interval=0.01, stall_threshold=0.1, capture_interval=60),
+    )
+    warnings: list[str] = []
+    sink_id = logger.add(
+        lambda message: warnings.append(message.record["message"]),
+        level="WARNING",
+        filter=lambda record: "was blocked" in record["message"],
+    )
+    watchdog.start()
+    try:
+        await asyncio.sleep(0.05)
+        blocking_call()
+        await asyncio.sleep(0.05)
+        stats = watchdog.stats()
+        assert stats["max"] >= 0.2  # noqa: PLR2004
+        assert stats["stalls"] == 1
+        assert stats["captures"] == 1
+        # The stack was captured while the blocking call was running
+        assert "blocking_call" in stats["last_stack"]
+
+        # A second stall within the capture interval is only counted
+        blocking_call()
+        await asyncio.sleep(0.05)
+        stats = watchdog.stats()
+        assert stats["stalls"] == 2  # noqa: PLR2004
+        assert stats["captures"] == 1
+        assert stats["suppressed"] == 1
+        # and not warned about again
+        assert len(warnings) == 1
+    finally:
+        logger.remove(sink_id)
+        await watchdog.stop()
+    assert not watchdog.stats()["running"]
+    logger.success("Event loop watchdog test passed")
+    return True
+
+
+async def test_response_cache() -> bool:
+    """Test caching, invalidation and coalescing of command responses."""
+    logger.info("Testing response cache...")
+
+    builds = 0
+
+    async def build() -> str:
+        nonlocal builds
+        builds += 1
+        await asyncio.sleep(0.01)
+        return f"response {builds}"
+
+    cache = ResponseCache(ResponseCacheSettings(ttl=60, refresh_interval=0))
+    assert await cache.get("stats", None, build) == "response 1"
+    assert await cache.get("stats", None, build) == "response 1"
+    # Concurrent requests share one build
+    responses = await asyncio.gather(*(cache.get("stats", -1, build) for _ in range(5)))
+    assert set(responses) == {"response 2"}
+    assert builds == 2  # noqa: PLR2004
+
+    # A write in chat -2 leaves chat -1 cached but refreshes the global view
+    cache.invalidate("stats", -2)
+    assert await cache.get("stats", -1, build) == "response 2"
+    assert await cache.get("stats", None, build) == "response 3"
+    cache.clear("stats")
+    assert await cache.get("stats", -1, build) == "response 4"
+    assert cache.stats()["misses"] == 4  # noqa: PLR2004
+
+    # Under a stream of writes, stale entries are rebuilt at most once per interval
+    throttled = ResponseCache(ResponseCacheSettings(ttl=60, refresh_interval=60))
+    await throttled.get("recent", None, build)
+    for _ in range(10):
+        throttled.invalidate("recent", -1)
+        await throttled.get("recent", None, build)
+    assert builds == 5  # noqa: PLR2004
+
+    disabled = ResponseCache(ResponseCacheSettings(ttl=0))
+    await disabled.get("allowed", None, build)
+    await disabled.get("allowed", None, build)
+    assert builds == 7  # noqa: PLR2004
+    logger.success("Response cache test passed")
+    return True
+
+
 async def main() -> None:
     """Run all tests."""
     logger.info("🧪 Running tests for Telegram Admin Bot")
 
     success = True
 
-    try:
-        if not await test_spam_detection():
-            success = False
-    except Exception as e:
-        logger.error(f"Spam detection test failed: {e}")
-        success = False
-
-    try:
-        if not await test_database():
+    tests = [
+        ("Spam detection", test_spam_detection),
+        ("Database", test_database),
+        ("Logging setup", test_logging_setup),
+        ("Chat policies", test_chat_policies),
+        ("Raid detection", test_raid_detection),
+        ("Flood handling", test_flood_handling),
+        ("Shadow evaluation", test_shadow_evaluation),
+        ("Scoped stats access", test_scoped_stats_access),
+        ("Update scheduler", test_update_scheduler),
+        ("Command flood", test_command_flood),
+        ("Storage conformance", test_storage_conformance),
+        ("Export", test_export),
+        ("Text storage", test_text_storage),
+        ("Profiling", test_profiling),
+        ("Evaluation metrics", test_evaluation_metrics),
+        ("Dataset import", test_dataset_import),
+        ("Recent-message index", test_recent_index),
+        ("Bot scopes", test_bot_scopes),
+        ("Bot API session", test_http_session),
+        ("Model registry", test_model_registry),
+        ("Backfill", test_backfill),
+        ("Event loop watchdog", test_loop_watchdog),
+        ("Response cache", test_response_cache),
+    ]
+    for name, test in tests:
+        try:
+            if not await test():
+                success = False
+        except Exception as e:
+            logger.error(f"{name} test failed: {e}")
             success = False
-    except Exception as e:
-        logger.error(f"Database test failed: {e}")
-        success = False
 
     if success:
         logger.success("All tests passed!")